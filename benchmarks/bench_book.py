@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Compare the order book ladders with a naive dict book, under depth stream churn.
+
+Run it with: python benchmarks/bench_book.py
+
+The updates are random changes and deletes around the top of a book of LEVELS
+levels per side, each followed by a read of the TOP best levels. The memory is
+the one allocated for the levels of one book (both sides).
+"""
+
+import random
+import sys
+import time
+
+from binance_fix_connector.order_book import BookSide, DenseBookSide
+
+LEVELS = 1000
+UPDATES = 200000
+TOP = 10
+MID = 6385400  # fixed-point price, 2 decimals
+TICK = 1
+
+
+class DictBookSide:
+    """Naive book side: a dict of float prices, sorted on every read."""
+
+    def __init__(self, descending: bool) -> None:
+        self.descending = descending
+        self.levels: dict[float, float] = {}
+
+    def set(self, price: float, qty: float) -> None:
+        if qty:
+            self.levels[price] = qty
+        else:
+            self.levels.pop(price, None)
+
+    def delete(self, price: float) -> None:
+        self.levels.pop(price, None)
+
+    def top(self, depth: int) -> list[tuple[float, float]]:
+        prices = sorted(self.levels, reverse=self.descending)[:depth]
+        return [(price, self.levels[price]) for price in prices]
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.levels) + sum(
+            sys.getsizeof(price) + sys.getsizeof(qty)
+            for price, qty in self.levels.items()
+        )
+
+
+def updates(seed: int = 1) -> list[tuple[int, int, int]]:
+    """Return (side, price, qty) updates, mostly near the top of the book."""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(UPDATES):
+        side = rng.randrange(2)
+        distance = int(rng.expovariate(1 / 20)) % LEVELS
+        price = MID - distance - 1 if side == 0 else MID + distance + 1
+        qty = 0 if rng.random() < 0.3 else rng.randrange(1, 100000)
+        result.append((side, price, qty))
+    return result
+
+
+def fill(sides, scale: float | None) -> None:
+    for i in range(LEVELS):
+        bid, ask = MID - i - 1, MID + i + 1
+        if scale is None:
+            sides[0].set(bid, 1000)
+            sides[1].set(ask, 1000)
+        else:
+            sides[0].set(bid * scale, 10.0)
+            sides[1].set(ask * scale, 10.0)
+
+
+def bench(name: str, sides, scale: float | None, stream) -> None:
+    fill(sides, scale)
+    if scale is not None:
+        stream = [(side, price * scale, qty * 0.001) for side, price, qty in stream]
+    start = time.perf_counter()
+    for side, price, qty in stream:
+        sides[side].set(price, qty)
+        sides[side].top(TOP)
+    elapsed = time.perf_counter() - start
+    memory = sides[0].nbytes() + sides[1].nbytes()
+    print(
+        f"{name:<34} {elapsed / len(stream) * 1e6:8.2f} us/update"
+        f" {memory / 1024:10.1f} KiB/symbol"
+    )
+
+
+def main() -> None:
+    stream = updates()
+    print(f"{LEVELS} levels per side, {UPDATES} updates, top {TOP} read after each")
+    bench("dict of floats", (DictBookSide(True), DictBookSide(False)), 0.01, stream)
+    bench("BookSide, float arrays", (BookSide(True), BookSide(False)), 0.01, stream)
+    bench(
+        "BookSide, fixed-point arrays",
+        (BookSide(True, "q"), BookSide(False, "q")),
+        None,
+        stream,
+    )
+    bench(
+        "DenseBookSide, tick-indexed",
+        (DenseBookSide(True, TICK), DenseBookSide(False, TICK)),
+        None,
+        stream,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Measure the cost of encoding a NewOrderSingle (D), and of building and encoding it.
+
+Run it with: python benchmarks/bench_encode.py
+"""
+
+import timeit
+
+from simplefix import FixMessage
+
+from binance_fix_connector.fix_connector import BinanceFixConnector
+
+NUMBER = 20000
+
+
+def new_order_single(client: BinanceFixConnector) -> FixMessage:
+    msg = client.create_fix_message_with_basic_header("D", recv_window=100)
+    msg.append_pair(38, 1)
+    msg.append_pair(40, 2)
+    msg.append_pair(11, "1740758400000001000")
+    msg.append_pair(44, 730)
+    msg.append_pair(54, 2)
+    msg.append_pair(55, "BNBUSDT")
+    msg.append_pair(59, 1)
+    return msg
+
+
+def reference_encode(client: BinanceFixConnector) -> bytes:
+    """Build the message pair by pair and encode it with simplefix."""
+    msg = FixMessage()
+    msg.append_pair(8, client.fix_version, header=True)
+    msg.append_pair(35, "D", header=True)
+    msg.append_pair(49, client.sender_comp_id, header=True)
+    msg.append_pair(56, client.target_comp_id, header=True)
+    msg.append_pair(34, client.get_next_seq_num(), header=True)
+    msg.append_pair(52, client.current_utc_time(), header=True)
+    msg.append_pair(25000, 100, header=True)
+    msg.append_pair(38, 1)
+    msg.append_pair(40, 2)
+    msg.append_pair(11, "1740758400000001000")
+    msg.append_pair(44, 730)
+    msg.append_pair(54, 2)
+    msg.append_pair(55, "BNBUSDT")
+    msg.append_pair(59, 1)
+    return msg.encode()
+
+
+def connector_encode(client: BinanceFixConnector) -> bytes:
+    """Build the message with the connector and encode it as send_message does."""
+    return client.encode_message(new_order_single(client))
+
+
+def bench(name: str, function, *args) -> float:
+    seconds = min(timeit.repeat(lambda: function(*args), number=NUMBER, repeat=5))
+    per_message = seconds / NUMBER * 1e6
+    print(f"{name:<40} {per_message:8.2f} us/message")
+    return per_message
+
+
+def main() -> None:
+    client = BinanceFixConnector(
+        endpoint="tcp+tls://localhost:9000",
+        api_key="API_KEY",
+        private_key="PRIVATE_KEY",
+        sender_comp_id="BOETRADE",
+    )
+    msg = new_order_single(client)
+    assert FixMessage.encode(msg) == client.encode_message(msg)
+
+    print("encode only")
+    reference = bench("simplefix FixMessage.encode", FixMessage.encode, msg)
+    connector = bench("BinanceFixConnector.encode_message", client.encode_message, msg)
+    print(f"speedup: {reference / connector:.1f}x")
+
+    print("build and encode")
+    reference = bench("simplefix FixMessage", reference_encode, client)
+    connector = bench("BinanceFixConnector", connector_encode, client)
+    print(f"speedup: {reference / connector:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
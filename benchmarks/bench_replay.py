@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Replay a capture through the receive pipeline of the connector and report messages/s.
+
+Run it with: python benchmarks/bench_replay.py [capture file written by WireCapture]
+
+Without a capture file, a synthetic depth stream is replayed.
+"""
+
+import logging
+import sys
+
+from simplefix import FixMessage
+
+from binance_fix_connector.capture import INBOUND, CaptureRecord
+from binance_fix_connector.fix_connector import WIRE_LOGGER_NAME, BinanceFixConnector
+from binance_fix_connector.replay import CaptureReplay
+
+MESSAGES = 20000
+LEVELS = 10
+
+
+def depth_update(seq_num: int) -> bytes:
+    msg = FixMessage()
+    msg.append_pair(8, "FIX.4.4", header=True)
+    msg.append_pair(35, "X", header=True)
+    msg.append_pair(49, "SPOT", header=True)
+    msg.append_pair(56, "BMDWATCH", header=True)
+    msg.append_pair(34, seq_num, header=True)
+    msg.append_pair(52, "20250301-01:00:00.001000", header=True)
+    msg.append_pair(262, "DEPTH_STREAM")
+    msg.append_pair(268, LEVELS)
+    for level in range(LEVELS):
+        msg.append_pair(279, 1)
+        msg.append_pair(269, level % 2)
+        msg.append_pair(270, f"{600 + seq_num % 50 + level}.{level:02d}000000")
+        msg.append_pair(271, f"{level + 1}.50000000")
+        if level == 0:
+            msg.append_pair(55, "BNBUSDT")
+            msg.append_pair(25043, seq_num * 10)
+            msg.append_pair(25044, seq_num * 10 + 9)
+    return msg.encode()
+
+
+def synthetic_records() -> list[CaptureRecord]:
+    return [
+        CaptureRecord(INBOUND, seq_num * 100_000, "BMDWATCH", depth_update(seq_num))
+        for seq_num in range(2, MESSAGES + 2)
+    ]
+
+
+def main() -> None:
+    logging.getLogger(WIRE_LOGGER_NAME).setLevel(logging.WARNING)
+    if len(sys.argv) > 1:
+        replay = CaptureReplay.from_file(sys.argv[1])
+    else:
+        replay = CaptureReplay(synthetic_records())
+
+    for name, chunk_size in (
+        ("one frame per read", None),
+        ("4096 bytes reads", 4096),
+        ("random 1-1500 bytes reads", (1, 1500)),
+    ):
+        client = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key="PRIVATE_KEY",
+            sender_comp_id="BMDWATCH",
+        )
+        print(name)
+        print(replay.run(client, chunk_size=chunk_size))
+
+
+if __name__ == "__main__":
+    main()
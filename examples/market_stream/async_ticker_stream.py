@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+from binance_fix_connector.async_connector import AsyncBinanceFixConnector, run
+from binance_fix_connector.market_data import decode_md_entries
+from binance_fix_connector.utils import get_api_key, get_private_key
+from constants import path, FIX_MD_URL, INSTRUMENT, UPDATE, TIMEOUT_SECONDS
+
+# Credentials
+API_KEY, PATH_TO_PRIVATE_KEY_PEM_FILE = get_api_key(path)
+
+
+def book_ticker_message(client: AsyncBinanceFixConnector, subscription_type: int):
+    msg = client.create_fix_message_with_basic_header("V")
+    msg.append_pair(262, "BOOK_TICKER_STREAM")  # md req id
+    msg.append_pair(263, subscription_type)  # Subscription type
+    msg.append_pair(264, 1)  # market depth
+    msg.append_pair(266, "Y")  # aggregated book
+    msg.append_pair(146, 1)  # NoSymbols
+    msg.append_pair(55, INSTRUMENT)  # Symbol
+    msg.append_pair(267, 2)  # NoMDEntries
+    msg.append_pair(269, 0)  # MDEntry
+    msg.append_pair(269, 1)  # MDEntry
+    return msg
+
+
+async def show_book_ticker_stream(client: AsyncBinanceFixConnector) -> None:
+    async for msg in client:
+        if msg.message_type == b"X":
+            entries = decode_md_entries(msg)
+            for update_type, price, qty in zip(
+                entries.side, entries.price, entries.qty
+            ):
+                update_type = str(update_type)
+                client.logger.info(
+                    f"Update type: {UPDATE.get(update_type, update_type)} | Price: {price} | Qty: {qty}"
+                )
+
+
+async def main() -> None:
+    client_md = AsyncBinanceFixConnector(
+        endpoint=FIX_MD_URL,
+        api_key=API_KEY,
+        private_key=get_private_key(PATH_TO_PRIVATE_KEY_PEM_FILE),
+        sender_comp_id="BMDWATCH",
+        reset_seq_num_flag="Y",
+    )
+    await client_md.connect()
+    await client_md.logon(recv_window=100)
+
+    example = "This example shows how to subscribe to a book ticker stream with the asyncio connector."
+    client_md.logger.info(example)
+
+    snapshot = await client_md.request(
+        book_ticker_message(client_md, 1), md_req_id="BOOK_TICKER_STREAM", timeout=10
+    )
+    client_md.logger.info(f"Snapshot received: {snapshot}")
+
+    try:
+        await asyncio.wait_for(show_book_ticker_stream(client_md), TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+
+    client_md.send_message(book_ticker_message(client_md, 2))
+
+    # LOGOUT
+    client_md.logger.info("LOGOUT (5)")
+    client_md.logout()
+    await client_md.wait_for(message_type="5", timeout=10)
+    await client_md.close()
+
+
+run(main())
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import math
 import time
 from datetime import datetime, timedelta
 
@@ -8,6 +9,8 @@ from binance_fix_connector.fix_connector import (
     BinanceFixConnector,
     create_market_data_session,
 )
+from binance_fix_connector.market_data import decode_md_entries
+from binance_fix_connector.order_book import OrderBookEngine
 from binance_fix_connector.utils import get_api_key, get_private_key
 from constants import path, ACTION, FIX_MD_URL, INSTRUMENT, UPDATE, TIMEOUT_SECONDS
 
@@ -66,37 +69,31 @@ def show_rendered_market_depth_stream(client: BinanceFixConnector) -> None:
             )
             header = f"Subscription: {subscription_id} -> {updates} updates received for Symbol: {symbol} between FirstBookId: {first_book_id} and LastBookId: {last_book_id}"
             client.logger.info(header)
-            qty_index = 0
-            for i in range(updates):
-                action = (
-                    None
-                    if not msg.get(279, i + 1)
-                    else msg.get(279, i + 1).decode("utf-8")
-                )
-                update_type = (
-                    None
-                    if not msg.get(269, i + 1)
-                    else msg.get(269, i + 1).decode("utf-8")
-                )
-                price = (
-                    None
-                    if not msg.get(270, i + 1)
-                    else msg.get(270, i + 1).decode("utf-8")
-                )
-                qty = (
-                    None
-                    if not msg.get(271, i + 1 - qty_index)
-                    else msg.get(271, i + 1 - qty_index).decode("utf-8")
-                )
-                qty_str = f"| Qty: {qty}"
-                if action == "2":
-                    qty_str = ""
-                    qty_index += 1
-
+            entries = decode_md_entries(msg)
+            for action, update_type, price, qty in zip(
+                entries.action, entries.side, entries.price, entries.qty
+            ):
+                action = str(action)
+                update_type = str(update_type)
+                qty_str = "" if math.isnan(qty) else f"| Qty: {qty}"
                 body = f"Action: {ACTION.get(action, action)} | Update: {UPDATE.get(update_type,update_type)} | Price: {price} {qty_str}"
                 client.logger.info(body)
 
 
+def show_order_book(client: BinanceFixConnector, books: OrderBookEngine) -> None:
+    """Show the best levels of the book maintained from the stream."""
+    book = books.get(INSTRUMENT)
+    if book is None or not book.synced:
+        client.logger.info(f"No book received for {INSTRUMENT}")
+        return
+    bids, asks = book.top(5)
+    client.logger.info(f"Book of {INSTRUMENT} at LastBookId: {book.last_update_id}")
+    for price, qty in reversed(asks):
+        client.logger.info(f"Ask | Price: {price} | Qty: {qty}")
+    for price, qty in bids:
+        client.logger.info(f"Bid | Price: {price} | Qty: {qty}")
+
+
 client_md = create_market_data_session(
     api_key=API_KEY,
     private_key=get_private_key(PATH_TO_PRIVATE_KEY_PEM_FILE),
@@ -123,6 +120,8 @@ msg.append_pair(269, 1)  # MDEntry
 client_md.logger.info("*" * 50)
 client_md.logger.info("MARKET_DATA_REQUEST (V): SUBSCRIBING")
 client_md.logger.info("*" * 50)
+# The book is built from the snapshot and the diffs of the subscription.
+order_books = client_md.add_order_book("DEPTH_STREAM")
 client_md.send_message(msg)
 client_md.logger.info(
     f"Subscribed to the Depth stream, showing stream for {TIMEOUT_SECONDS} seconds."
@@ -133,6 +132,7 @@ timeout = datetime.now() + timedelta(seconds=TIMEOUT_SECONDS)
 while datetime.now() < timeout:
     time.sleep(0.01)
     show_rendered_market_depth_stream(client_md)
+show_order_book(client_md, order_books)
 
 msg = client_md.create_fix_message_with_basic_header("V")
 msg.append_pair(262, "DEPTH_STREAM")  # md req id
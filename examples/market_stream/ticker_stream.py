@@ -7,6 +7,7 @@ from binance_fix_connector.fix_connector import (
     BinanceFixConnector,
     create_market_data_session,
 )
+from binance_fix_connector.market_data import decode_md_entries
 from binance_fix_connector.utils import get_api_key, get_private_key
 from constants import path, ACTION, FIX_MD_URL, INSTRUMENT, UPDATE, TIMEOUT_SECONDS
 
@@ -59,30 +60,14 @@ def show_rendered_market_book_ticker_stream(client: BinanceFixConnector) -> None
             symbol = None if not msg.get(55) else msg.get(55).decode("utf-8")
             header = f"Subscription: {subscription_id} -> {updates} updates received for Symbol: {symbol}"
             client.logger.info(header)
-            for i in range(updates):
-                update_type = (
-                    None
-                    if not msg.get(269, i + 1)
-                    else msg.get(269, i + 1).decode("utf-8")
-                )
+            entries = decode_md_entries(msg)
+            for update_type, price, qty, last_book_id in zip(
+                entries.side, entries.price, entries.qty, entries.last_book_id
+            ):
+                update_type = str(update_type)
                 update_type = f"Update type: {UPDATE.get(update_type,update_type)}"
-                price = (
-                    None
-                    if not msg.get(270, i + 1)
-                    else msg.get(270, i + 1).decode("utf-8")
-                )
-                qty = (
-                    None
-                    if not msg.get(271, i + 1)
-                    else msg.get(271, i + 1).decode("utf-8")
-                )
-                last_book_id = (
-                    None
-                    if not msg.get(25044, i + 1)
-                    else msg.get(25044, i + 1).decode("utf-8")
-                )
                 last_book_id_str = (
-                    "" if not last_book_id else f"| Last Book ID: {last_book_id}"
+                    "" if last_book_id < 0 else f"| Last Book ID: {last_book_id}"
                 )
                 body = f"{update_type} | Price: {price} | Qty: {qty} {last_book_id_str}"
                 client.logger.info(body)
@@ -115,6 +100,8 @@ msg.append_pair(269, 1)  # MDEntry
 client_md.logger.info("*" * 50)
 client_md.logger.info("MARKET_DATA_REQUEST (V): SUBSCRIBING")
 client_md.logger.info("*" * 50)
+# Latest best bid and ask, readable from any thread without draining the queue.
+book_tickers = client_md.add_book_ticker("BOOK_TICKER_STREAM")
 client_md.send_message(msg)
 client_md.logger.info(
     f"Subscribed to the Book Ticker stream, showing stream for {TIMEOUT_SECONDS} seconds."
@@ -125,6 +112,7 @@ timeout = datetime.now() + timedelta(seconds=TIMEOUT_SECONDS)
 while datetime.now() < timeout:
     time.sleep(0.01)
     show_rendered_market_book_ticker_stream(client_md)
+client_md.logger.info(f"Latest book ticker: {book_tickers.get(INSTRUMENT)}")
 
 msg = client_md.create_fix_message_with_basic_header("V")
 msg.append_pair(262, "BOOK_TICKER_STREAM")  # md req id
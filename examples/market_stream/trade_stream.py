@@ -3,6 +3,7 @@
 import time
 from datetime import datetime, timedelta
 
+from binance_fix_connector.bars import Bar
 from binance_fix_connector.fix_connector import (
     BinanceFixConnector,
     create_market_data_session,
@@ -69,6 +70,15 @@ def show_rendered_market_trade_stream(client: BinanceFixConnector) -> None:
                 client.logger.info(body)
 
 
+def show_bar(bar: Bar) -> None:
+    """Show a bar closed by the bar builder."""
+    client_md.logger.info(
+        f"{bar.interval}s bar of {bar.symbol} | Open: {bar.open} | High: {bar.high} | "
+        f"Low: {bar.low} | Close: {bar.close} | Volume: {bar.volume} | VWAP: {bar.vwap} | "
+        f"Trades: {bar.trades} | Buy volume: {bar.buy_volume} | Sell volume: {bar.sell_volume}"
+    )
+
+
 client_md = create_market_data_session(
     api_key=API_KEY,
     private_key=get_private_key(PATH_TO_PRIVATE_KEY_PEM_FILE),
@@ -94,6 +104,8 @@ msg.append_pair(269, 2)  # MDEntry
 client_md.logger.info("*" * 50)
 client_md.logger.info("MARKET_DATA_REQUEST (V): SUBSCRIBING")
 client_md.logger.info("*" * 50)
+# 1s and 1m bars built from the trades of the subscription.
+bar_builder = client_md.add_bar_builder("TRADE_STREAM", (1, 60), on_bar=show_bar)
 client_md.send_message(msg)
 
 
@@ -104,6 +116,7 @@ timeout = datetime.now() + timedelta(seconds=TIMEOUT_SECONDS)
 while datetime.now() < timeout:
     time.sleep(0.01)
     show_rendered_market_trade_stream(client_md)
+client_md.logger.info(f"Current 1m bar: {bar_builder.current(INSTRUMENT, 60)}")
 
 client_md.logger.info(
     f"Subscribed to the Trade stream, showing stream for {TIMEOUT_SECONDS} seconds."
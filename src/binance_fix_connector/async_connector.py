@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Coroutine
+from urllib.parse import urlparse
+
+from binance_fix_connector.fix_connector import (
+    BinanceFixConnector,
+    FixMsgTypes,
+)
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional dependency
+    uvloop = None
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from simplefix import FixMessage
+
+    from binance_fix_connector.message import FixMessageView
+
+_CLOSED = None  # pushed to the messages queue when the connection is closed
+
+
+def run(main: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine in a new event loop, using uvloop when it is installed.
+
+    Args:
+    ----
+        main (Coroutine): The coroutine, usually the main function of the program.
+
+    Returns:
+    -------
+        Any: The result of the coroutine.
+
+    """
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
+
+
+class AsyncBinanceFixConnector(BinanceFixConnector):
+    """
+    FIX session running in an asyncio event loop, without any thread.
+
+    The connection is opened with `asyncio.open_connection` and read by a task of the
+    event loop, so any number of sessions can share one loop. The messages received
+    go through the same pipeline as `BinanceFixConnector` (framing, handlers,
+    correlation, TestRequest answers, restart on `NEWS`...), and can be consumed with
+    `async for msg in session` or awaited with `wait_for` and `request`. The
+    heartbeats and liveness checks of `start_liveness` run as callbacks of the loop.
+
+    Messages are sent without blocking: `send_message` and the methods building
+    messages (`logout`, `heartbeat`...) write into the transport buffer, `drain` waits
+    until it is flushed.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.receive_task: asyncio.Task | None = None
+        self.restart_task: asyncio.Task | None = None
+        # Created by connect, in the running event loop.
+        self.messages: asyncio.Queue[FixMessageView | None] | None = None
+
+    async def connect(self) -> None:
+        """Open the TLS connection to the server and start reading from it."""
+        try:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+            if self.messages is None:
+                self.messages = asyncio.Queue()
+            url = urlparse(self.endpoint)
+            start = time.perf_counter()
+            context = self.tls_cache.get_context(self.endpoint)
+            self.reader, self.writer = await asyncio.open_connection(
+                url.hostname, url.port, ssl=context, server_hostname=url.hostname
+            )
+            ssl_object = self.writer.get_extra_info("ssl_object")
+            self.connect_timings = {
+                "total": time.perf_counter() - start,
+                "session_reused": bool(ssl_object and ssl_object.session_reused),
+            }
+            self.sock = self.writer.get_extra_info("socket")
+            if self.socket_profile is not None:
+                self.socket_options = self.socket_profile.apply(self.sock)
+            sockname = self.writer.get_extra_info("sockname") or ("", "")
+            self.logger.info("-" * 100)
+            self.logger.info(
+                "FIX Client (%s:%s): Connected to %s",
+                sockname[0],
+                sockname[1],
+                self.endpoint,
+            )
+            self.logger.info("-" * 100)
+            self.logger.info("LOGIN (A)")
+            self.is_connected = True
+            self.start_liveness()
+            if self.receive_task is None or self.receive_task.done():
+                self.receive_task = asyncio.get_running_loop().create_task(
+                    self._receive_messages()
+                )
+
+        except Exception:
+            self.logger.exception("Error connecting")
+            raise
+
+    async def _receive_messages(self) -> None:
+        """Read the data sent from server and process the messages accordingly."""
+        try:
+            while self.is_connected:
+                try:
+                    data = await self.reader.read(self.framer.min_read_size)
+                except OSError:
+                    break
+                if not data:
+                    break
+                self.framer.feed(data)
+                messages = self.parse_server_response()
+                if messages:
+                    self._process_received(messages)
+        except asyncio.CancelledError:
+            # Cancelled by a restart: the session now belongs to the new connection.
+            raise
+        except Exception:
+            self.logger.exception("Error receiving message")
+            self.disconnect()
+            self.messages.put_nowait(_CLOSED)
+            raise
+        self.is_connected = False
+        self.messages.put_nowait(_CLOSED)
+
+    def _send_data(self, data: bytes) -> None:
+        self.last_sent = time.monotonic()
+        self.writer.write(data)
+
+    def _call_liveness_later(self, delay: float) -> asyncio.TimerHandle:
+        """Run `_check_liveness` in the event loop in `delay` seconds."""
+        return asyncio.get_running_loop().call_later(delay, self._check_liveness)
+
+    def _enqueue_messages(self, messages: list[FixMessageView]) -> None:
+        for msg in messages:
+            if not self._is_conflated(msg):
+                self.messages.put_nowait(msg)
+
+    async def drain(self) -> None:
+        """Wait until the messages sent are flushed to the connection."""
+        if self.writer is not None:
+            await self.writer.drain()
+
+    async def logon(
+        self, recv_window: str | None = None, timeout: float = 10
+    ) -> FixMessageView | None:
+        """
+        Logon method, waiting for the Logon (A) response.
+
+        Args:
+        ----
+            recv_window (str | None, optional): The recv window. Defaults to None.
+            timeout (float, optional): Seconds to wait for the response. Defaults to 10.
+
+        Returns:
+        -------
+            FixMessageView | None: The Logon response, None if not received in time.
+
+        """
+        if self.restart_flag:
+            super().logon(recv_window)
+            return None
+        future = self.expect_response(message_type=FixMsgTypes.LOGON)
+        super().logon(recv_window)
+        return await self._wait_response(future, timeout)
+
+    async def wait_for(
+        self, *, timeout: float | None = None, **key: str
+    ) -> FixMessageView | None:
+        """
+        Wait for the next message matching a key of `expect_response`.
+
+        Args:
+        ----
+            timeout (float | None, optional): Seconds to wait. Defaults to None (forever).
+            **key (str): One of cl_ord_id, orig_cl_ord_id, md_req_id, instrument_req_id, message_type.
+
+        Returns:
+        -------
+            FixMessageView | None: The message, None if the timeout expired.
+
+        """
+        return await self._wait_response(self.expect_response(**key), timeout)
+
+    async def request(
+        self, message: FixMessage, *, timeout: float | None = None, **key: str
+    ) -> FixMessageView | None:
+        """
+        Send a message and wait for its response.
+
+        The response is registered before sending, so it can not be missed.
+
+        Args:
+        ----
+            message (FixMessage): The message.
+            timeout (float | None, optional): Seconds to wait. Defaults to None (forever).
+            **key (str): How to match the response: one of cl_ord_id, orig_cl_ord_id,
+                md_req_id, instrument_req_id, message_type.
+
+        Returns:
+        -------
+            FixMessageView | None: The response, None if the timeout expired.
+
+        """
+        future = self.expect_response(**key)
+        self.send_message(message)
+        return await self._wait_response(future, timeout)
+
+    async def _wait_response(
+        self, future: Future, timeout: float | None
+    ) -> FixMessageView | None:
+        """Flush the messages sent and wait for the future of the response."""
+        try:
+            await self.drain()
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            future.cancel()
+
+    async def retrieve_messages_until(
+        self,
+        message_type: str | list[str],
+        message_cl_ord_id: str | None = None,
+        timeout_seconds: float = 3,
+    ) -> list[FixMessageView]:
+        """Return all the FIX messages received from the server until message of desired type is received."""
+        if isinstance(message_type, str):
+            message_type = [message_type]
+        messages: list[FixMessageView] = []
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return messages
+            try:
+                msg = await asyncio.wait_for(self.messages.get(), remaining)
+            except asyncio.TimeoutError:
+                return messages
+            if msg is _CLOSED:
+                return messages
+            messages.append(msg)
+            if message_cl_ord_id:
+                cl_ord_id = None if not msg.get("11") else msg.get("11").decode("utf-8")
+                if cl_ord_id == message_cl_ord_id:
+                    return messages
+            elif message_type and msg.get("35").decode("utf-8") in message_type:
+                return messages
+
+    def get_all_new_messages_received(self) -> list[FixMessageView]:
+        """
+        Return all the FIX messages received from the server until now.
+        If no new messages received, it returns [].
+
+        Returns
+        -------
+            list[FixMessageView]: The list of fix messages received from server.
+
+        """
+        messages = []
+        while self.messages is not None and not self.messages.empty():
+            msg = self.messages.get_nowait()
+            if msg is not _CLOSED:
+                messages.append(msg)
+        return messages
+
+    def __aiter__(self) -> AsyncBinanceFixConnector:
+        return self
+
+    async def __anext__(self) -> FixMessageView:
+        if self.messages is None:
+            raise StopAsyncIteration
+        msg = await self.messages.get()
+        if msg is _CLOSED:
+            raise StopAsyncIteration
+        return msg
+
+    def disconnect(self) -> None:
+        """Close the connection with the server."""
+        self.is_connected = False
+        if self.liveness_timer is not None:
+            self.liveness_timer.cancel()
+            self.liveness_timer = None
+        if self.writer is not None:
+            self.writer.close()
+
+    async def close(self) -> None:
+        """Close the connection and wait until the reading task is done."""
+        self.disconnect()
+        if self.writer is not None:
+            with contextlib.suppress(OSError):
+                await self.writer.wait_closed()
+        for task in (self.receive_task, self.restart_task):
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await task
+
+    def schedule_restart(self) -> None:
+        """Schedule the session restart in 10 minutes."""
+        if not self.restart_flag:
+            self.restart_flag = True
+            self.restart_time = datetime.now() + timedelta(minutes=10)
+            self.logger.info(f"Session restart scheduled for {self.restart_time}")
+            self.restart_task = asyncio.get_running_loop().create_task(
+                self._restart(10 * 60)
+            )
+
+    async def _restart(self, delay: float) -> None:
+        """
+        Open the new session now, and switch to it when the delay expires.
+
+        Once logged on, the new session delivers its messages to the queue and handlers
+        of this session and subscribes again to its market data streams, as the
+        restart session of `BinanceFixConnector` does.
+        """
+        deadline = time.monotonic() + delay
+        restart_session = AsyncBinanceFixConnector(
+            api_key=self.api_key,
+            private_key=self.private_key,
+            endpoint=self.endpoint,
+            sender_comp_id=self.sender_comp_id,
+            target_comp_id=self.target_comp_id,
+            fix_version=self.fix_version,
+            socket_buffer_size=self.socket_buffer_size,
+            max_buffer_size=self.max_buffer_size,
+            heart_bt_int=self.heart_bt_int,
+            reset_seq_num_flag=self.reset_seq_num_flag,
+            encrypt_method=self.encrypt_method,
+            message_handling=self.message_handling,
+            response_mode=self.response_mode,
+            drop_copy_flag=self.drop_copy_flag,
+            restart=self.restart,
+            wire_capture=self.wire_capture,
+            queue_messages=self.queue_messages,
+            socket_profile=self.socket_profile,
+            tls_cache=self.tls_cache,
+        )
+        self.restart_session = restart_session
+        try:
+            await restart_session.connect()
+            await restart_session.logon()
+        except Exception:
+            self.logger.exception("Error creating the restart session")
+            await restart_session.close()
+            self.restart_session = None
+            self.restart_flag = False
+            self.restart_time = None
+            self.restart_task = None
+            return
+        # Attached once logged on: its Logon response stays in its own queue.
+        restart_session.standby = True
+        restart_session.handlers = self.handlers
+        restart_session.correlation = self.correlation
+        restart_session.instrument_scales = self.instrument_scales
+        restart_session.conflated_md_req_ids = self.conflated_md_req_ids
+        restart_session.messages = self.messages
+        self.start_handoff(restart_session)
+
+        await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+        if self.restart_flag:
+            self.logger.info("Performing scheduled restart...")
+            await self.reconnect()
+
+    async def reconnect(self) -> None:
+        """Switch to the new session, already connected and logged on."""
+        if not self.restart_flag or not self.restart_session:
+            self.logger.warning("No restart scheduled or restart session not created")
+            return
+
+        try:
+            self.logger.info("Disconnecting current session...")
+            receive_task = self.receive_task
+            self.disconnect()
+            if receive_task is not None:
+                receive_task.cancel()
+
+            self.logger.info("Switching to the new session...")
+            restart_session = self.restart_session
+            self.__dict__.update(restart_session.__dict__)
+            # The receive task of the restart session keeps running: share the state
+            # so both objects are the same session.
+            restart_session.__dict__ = self.__dict__
+            self.handoff = None
+            self.standby = False
+
+            self.logger.info("Restart completed successfully")
+            self.restart_flag = False
+            self.restart_time = None
+            self.restart_task = None
+
+        except Exception:
+            self.logger.exception("Error during restart")
+            self.restart_flag = False
+            self.restart_time = None
+            raise
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+from binance_fix_connector.market_data import (
+    MISSING_ID,
+    AggressorSide,
+    MDEntryType,
+    decode_md_entries,
+)
+from binance_fix_connector.scheduler import SessionScheduler, get_scheduler
+
+if TYPE_CHECKING:
+    from binance_fix_connector.market_data import InstrumentScale, InstrumentScales
+    from binance_fix_connector.message import FixMessageView
+
+INCREMENTAL_REFRESH = b"X"
+DEFAULT_INTERVALS = (1, 60)
+# Seconds after the end of a bar before it is closed by the timer, for the trades
+# of the bar still in flight.
+DEFAULT_CLOSE_DELAY = 0.5
+
+
+class Bar:
+    """
+    OHLCV bar of the trades of a symbol over an interval.
+
+    `start` and `end` are microseconds since the epoch (TransactTime 60 of the trades),
+    the bar holds the trades with `start <= time < end`. With fixed-point scales the
+    prices and volumes are integers and `notional` is their product.
+    """
+
+    __slots__ = (
+        "buy_volume",
+        "close",
+        "end",
+        "first_trade_id",
+        "high",
+        "interval",
+        "last_trade_id",
+        "low",
+        "notional",
+        "open",
+        "sell_volume",
+        "start",
+        "symbol",
+        "trades",
+        "volume",
+    )
+
+    def __init__(self, symbol: str, interval: float, start: int, end: int) -> None:
+        self.symbol: str = symbol
+        self.interval: float = interval
+        self.start: int = start
+        self.end: int = end
+        self.open: float = 0
+        self.high: float = 0
+        self.low: float = 0
+        self.close: float = 0
+        self.volume: float = 0
+        self.notional: float = 0
+        self.buy_volume: float = 0
+        self.sell_volume: float = 0
+        self.trades: int = 0
+        self.first_trade_id: int = MISSING_ID
+        self.last_trade_id: int = MISSING_ID
+
+    @property
+    def vwap(self) -> float:
+        """Volume weighted average price, NaN without volume."""
+        return self.notional / self.volume if self.volume else float("nan")
+
+    def add(self, price: float, qty: float, aggressor_side: int, trade_id: int) -> None:
+        """Add a trade to the bar."""
+        if self.trades:
+            if price > self.high:
+                self.high = price
+            elif price < self.low:
+                self.low = price
+        else:
+            self.open = self.high = self.low = price
+            self.first_trade_id = trade_id
+        self.close = price
+        self.volume += qty
+        self.notional += price * qty
+        if aggressor_side == AggressorSide.BUY:
+            self.buy_volume += qty
+        elif aggressor_side == AggressorSide.SELL:
+            self.sell_volume += qty
+        self.trades += 1
+        self.last_trade_id = trade_id
+
+    def copy(self) -> Bar:
+        bar = Bar(self.symbol, self.interval, self.start, self.end)
+        for name in self.__slots__:
+            setattr(bar, name, getattr(self, name))
+        return bar
+
+    def __repr__(self) -> str:
+        return (
+            f"Bar({self.symbol}, {self.interval}s, start={self.start}, "
+            f"O={self.open} H={self.high} L={self.low} C={self.close} "
+            f"V={self.volume} VWAP={self.vwap} trades={self.trades} "
+            f"buy={self.buy_volume} sell={self.sell_volume})"
+        )
+
+
+class BarBuilder:
+    """
+    OHLCV and VWAP bars of the symbols of a trade stream, for several intervals.
+
+    Pass `on_message` the MarketDataIncrementalRefresh (X) messages of a trade stream
+    subscription, e.g. with `BinanceFixConnector.add_bar_builder`. Each trade entry
+    (MDEntryType 269 = 2) updates the open bar of its symbol for every interval, in
+    constant time: open, high, low and close price, volume, notional (for the VWAP),
+    trade count, and buy and sell volume by AggressorSide (2446). The bars are aligned
+    on the TransactTime (60) of the trades.
+
+    A bar is closed and passed to `on_bar` when a trade of a later interval arrives or,
+    with a `close_delay`, by a worker thread of the scheduler `close_delay` seconds after
+    its end, so the bars of quiet symbols are emitted on time without blocking the timer
+    wheel. Trades older than the open bar are
+    counted in `late_trades` and ignored.
+    """
+
+    def __init__(
+        self,
+        intervals: tuple[float, ...] = DEFAULT_INTERVALS,
+        scales: InstrumentScales | InstrumentScale | None = None,
+        on_bar: Callable[[Bar], object] | None = None,
+        scheduler: SessionScheduler | None = None,
+        close_delay: float | None = DEFAULT_CLOSE_DELAY,
+    ) -> None:
+        """
+        Create a builder without bars.
+
+        Args:
+        ----
+            intervals (tuple[float, ...], optional): The bar intervals, in seconds.
+                Defaults to (1, 60).
+            scales (InstrumentScales | InstrumentScale | None, optional): The scales to keep prices and quantities
+                as fixed-point integers. Defaults to None (floats).
+            on_bar (Callable[[Bar], object] | None, optional): Called with every bar closed. Defaults to None.
+            scheduler (SessionScheduler | None, optional): The scheduler closing the bars on time.
+                Defaults to None (the scheduler shared by the process).
+            close_delay (float | None, optional): Seconds after the end of a bar before the timer
+                closes it. Defaults to 0.5, None to only close bars on the next trade or `flush`.
+
+        Raises:
+        ------
+            ValueError: Raised when an interval is not positive.
+
+        """
+        if not intervals or any(interval <= 0 for interval in intervals):
+            msg = f"The intervals must be positive, got {intervals!r}"
+            raise ValueError(msg)
+        self.intervals: tuple[float, ...] = tuple(intervals)
+        self._interval_us: tuple[int, ...] = tuple(
+            round(interval * 1_000_000) for interval in self.intervals
+        )
+        self.scales: InstrumentScales | InstrumentScale | None = scales
+        self.on_bar: Callable[[Bar], object] | None = on_bar
+        self.scheduler: SessionScheduler | None = scheduler
+        self.close_delay: float | None = close_delay
+        self.logger = logging.getLogger("BinanceFixConnector")
+        self.trades: int = 0
+        self.late_trades: int = 0
+        self.bars_closed: int = 0
+        self._lock = threading.Lock()
+        self._open: dict[tuple[str, int], Bar] = {}
+        self._last: dict[tuple[str, int], Bar] = {}
+
+    def current(self, symbol: str, interval: float) -> Bar | None:
+        """Return a copy of the open bar of a symbol, None without trade in the interval."""
+        with self._lock:
+            bar = self._open.get((symbol, round(interval * 1_000_000)))
+            return None if bar is None else bar.copy()
+
+    def last(self, symbol: str, interval: float) -> Bar | None:
+        """Return the last bar closed of a symbol, None if no bar was closed."""
+        return self._last.get((symbol, round(interval * 1_000_000)))
+
+    def stats(self) -> dict[str, int]:
+        """Return the counters of the builder."""
+        return {
+            "open_bars": len(self._open),
+            "trades": self.trades,
+            "late_trades": self.late_trades,
+            "bars_closed": self.bars_closed,
+        }
+
+    def on_message(self, message: FixMessageView) -> None:
+        """
+        Add the trades of a MarketDataIncrementalRefresh (X) to the bars.
+
+        Args:
+        ----
+            message (FixMessageView): The message, other types are ignored.
+
+        """
+        if message.message_type != INCREMENTAL_REFRESH:
+            return
+        entries = decode_md_entries(message, self.scales)
+        closed: list[Bar] = []
+        now_us = None
+        with self._lock:
+            for i in range(len(entries)):
+                if entries.side[i] != MDEntryType.TRADE:
+                    continue
+                symbol = entries.symbol[i]
+                price = entries.price[i]
+                if symbol is None or price != price or price < 0:
+                    continue  # no symbol, or no price (NaN or -1)
+                timestamp = entries.transact_time[i]
+                if timestamp == MISSING_ID:
+                    if now_us is None:
+                        now_us = time.time_ns() // 1000
+                    timestamp = now_us
+                self._add_trade(
+                    symbol,
+                    timestamp,
+                    price,
+                    entries.qty[i],
+                    entries.aggressor_side[i],
+                    entries.trade_id[i],
+                    closed,
+                )
+        self._emit(closed)
+
+    def flush(self, now: float | None = None) -> list[Bar]:
+        """
+        Close the open bars ended at `now`.
+
+        Args:
+        ----
+            now (float | None, optional): Seconds since the epoch. Defaults to None (the current time).
+
+        Returns:
+        -------
+            list[Bar]: The bars closed, also passed to `on_bar`.
+
+        """
+        now_us = time.time_ns() // 1000 if now is None else round(now * 1_000_000)
+        with self._lock:
+            ended = [(key, bar) for key, bar in self._open.items() if bar.end <= now_us]
+            for key, bar in ended:
+                self._close(key, bar)
+        closed = [bar for _, bar in ended]
+        self._emit(closed)
+        return closed
+
+    def _add_trade(
+        self,
+        symbol: str,
+        timestamp: int,
+        price: float,
+        qty: float,
+        aggressor_side: int,
+        trade_id: int,
+        closed: list[Bar],
+    ) -> None:
+        self.trades += 1
+        for interval_us, interval in zip(self._interval_us, self.intervals):
+            key = (symbol, interval_us)
+            bar = self._open.get(key)
+            if bar is None or timestamp >= bar.end:
+                if bar is not None:
+                    self._close(key, bar)
+                    closed.append(bar)
+                start = timestamp - timestamp % interval_us
+                last = self._last.get(key)
+                if last is not None and start < last.end:
+                    self.late_trades += 1
+                    continue
+                bar = Bar(symbol, interval, start, start + interval_us)
+                self._open[key] = bar
+                self._schedule_close(key, bar)
+            elif timestamp < bar.start:
+                self.late_trades += 1
+                continue
+            bar.add(price, qty, aggressor_side, trade_id)
+
+    def _close(self, key: tuple[str, int], bar: Bar) -> None:
+        del self._open[key]
+        self._last[key] = bar
+        self.bars_closed += 1
+
+    def _schedule_close(self, key: tuple[str, int], bar: Bar) -> None:
+        if self.close_delay is None:
+            return
+        if self.scheduler is None:
+            self.scheduler = get_scheduler()
+        delay = (bar.end - time.time_ns() // 1000) / 1_000_000 + self.close_delay
+        self.scheduler.call_later(max(delay, 0), self._close_on_timer, key, bar)
+
+    def _close_on_timer(self, key: tuple[str, int], bar: Bar) -> None:
+        with self._lock:
+            if self._open.get(key) is not bar:
+                return  # closed by a later trade
+            self._close(key, bar)
+        self._emit([bar])
+
+    def _emit(self, bars: list[Bar]) -> None:
+        if self.on_bar is None:
+            return
+        for bar in bars:
+            try:
+                self.on_bar(bar)
+            except Exception:
+                self.logger.exception("Error in the bar handler %r", self.on_bar)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from binance_fix_connector.market_data import (
+    MISSING_FIXED,
+    NAN,
+    MDEntryType,
+    MDUpdateAction,
+    decode_md_entries,
+)
+
+if TYPE_CHECKING:
+    from binance_fix_connector.market_data import (
+        InstrumentScale,
+        InstrumentScales,
+        MDEntries,
+    )
+    from binance_fix_connector.message import FixMessageView
+
+SNAPSHOT = b"W"
+INCREMENTAL_REFRESH = b"X"
+
+
+class BookTicker:
+    """Best bid and ask of a symbol, as read from a `BookTickerCache`."""
+
+    __slots__ = ("ask_price", "ask_qty", "bid_price", "bid_qty", "symbol", "update_id")
+
+    def __init__(
+        self,
+        symbol: str,
+        bid_price: float,
+        bid_qty: float,
+        ask_price: float,
+        ask_qty: float,
+        update_id: int,
+    ) -> None:
+        self.symbol: str = symbol
+        self.bid_price: float = bid_price
+        self.bid_qty: float = bid_qty
+        self.ask_price: float = ask_price
+        self.ask_qty: float = ask_qty
+        self.update_id: int = update_id
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, BookTicker) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"BookTicker({self.symbol}, bid={self.bid_qty}@{self.bid_price}, "
+            f"ask={self.ask_qty}@{self.ask_price}, update_id={self.update_id})"
+        )
+
+
+class _TickerSlot:
+    """Versioned fields of a symbol: the version is odd while they are written."""
+
+    __slots__ = ("ask_price", "ask_qty", "bid_price", "bid_qty", "update_id", "version")
+
+    def __init__(self, missing: float) -> None:
+        self.version: int = 0
+        self.bid_price: float = missing
+        self.bid_qty: float = missing
+        self.ask_price: float = missing
+        self.ask_qty: float = missing
+        self.update_id: int = -1
+
+
+class BookTickerCache:
+    """
+    Latest best bid and ask by symbol, updated from the receive thread.
+
+    Pass `on_message` the snapshots (W) and updates (X) of a book ticker stream, e.g.
+    with `BinanceFixConnector.add_book_ticker`. Each symbol has a slot written as a
+    sequence lock: the writer makes the version odd, updates the fields, then makes it
+    even again; a reader copies the fields between two reads of the version and starts
+    again if they differ or are odd. Any number of threads can read without taking a
+    lock or touching the queue of received messages, and never see a bid of one update
+    with the ask of another. Writers (the receive threads of a session and of its
+    restart session) are serialized with a lock readers never take.
+
+    Missing prices and quantities (a side without level) are NaN, or -1 with scales.
+    """
+
+    def __init__(
+        self, scales: InstrumentScales | InstrumentScale | None = None
+    ) -> None:
+        """
+        Create an empty cache.
+
+        Args:
+        ----
+            scales (InstrumentScales | InstrumentScale | None, optional): The scales to keep prices
+                and quantities as fixed-point integers. Defaults to None (floats).
+
+        """
+        self.scales: InstrumentScales | InstrumentScale | None = scales
+        self.missing: float = NAN if scales is None else MISSING_FIXED
+        self.updates: int = 0
+        self._slots: dict[str, _TickerSlot] = {}
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._slots
+
+    def symbols(self) -> list[str]:
+        return list(self._slots)
+
+    def get(self, symbol: str) -> BookTicker | None:
+        """
+        Return a consistent copy of the best bid and ask of a symbol.
+
+        Args:
+        ----
+            symbol (str): The symbol.
+
+        Returns:
+        -------
+            BookTicker | None: The best bid and ask, None if nothing was received for the symbol.
+
+        """
+        slot = self._slots.get(symbol)
+        if slot is None:
+            return None
+        while True:
+            version = slot.version
+            if version & 1:
+                time.sleep(0)  # being written: let the writer finish
+                continue
+            ticker = BookTicker(
+                symbol,
+                slot.bid_price,
+                slot.bid_qty,
+                slot.ask_price,
+                slot.ask_qty,
+                slot.update_id,
+            )
+            if slot.version == version:
+                return ticker
+
+    def version(self, symbol: str) -> int:
+        """Return the version of a symbol, increased by every update (-1 if unknown)."""
+        slot = self._slots.get(symbol)
+        return -1 if slot is None else slot.version
+
+    def on_message(self, message: FixMessageView) -> None:
+        """
+        Update the slots from a MarketDataSnapshot (W) or MarketDataIncrementalRefresh (X).
+
+        Args:
+        ----
+            message (FixMessageView): The message, other types are ignored.
+
+        """
+        msg_type = message.message_type
+        if msg_type != SNAPSHOT and msg_type != INCREMENTAL_REFRESH:
+            return
+        entries = decode_md_entries(message, self.scales)
+        snapshot = msg_type == SNAPSHOT
+        with self._write_lock:
+            start = 0
+            count = len(entries)
+            while start < count:
+                symbol = entries.symbol[start]
+                stop = start + 1
+                while stop < count and entries.symbol[stop] == symbol:
+                    stop += 1
+                if symbol is not None:
+                    self._write(symbol, entries, start, stop, snapshot)
+                start = stop
+
+    def _write(
+        self, symbol: str, entries: MDEntries, start: int, stop: int, snapshot: bool
+    ) -> None:
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = _TickerSlot(self.missing)
+            self._slots[symbol] = slot
+        update_id = entries.last_book_id[start]
+        if 0 <= update_id < slot.update_id:
+            return  # older than the values cached
+        missing = self.missing
+        bid_price, bid_qty = (
+            (missing, missing) if snapshot else (slot.bid_price, slot.bid_qty)
+        )
+        ask_price, ask_qty = (
+            (missing, missing) if snapshot else (slot.ask_price, slot.ask_qty)
+        )
+        for i in range(start, stop):
+            side = entries.side[i]
+            if entries.action[i] == MDUpdateAction.DELETE:
+                price = qty = missing
+            else:
+                price, qty = entries.price[i], entries.qty[i]
+            if side == MDEntryType.BID:
+                bid_price, bid_qty = price, qty
+            elif side == MDEntryType.OFFER:
+                ask_price, ask_qty = price, qty
+
+        slot.version += 1
+        slot.bid_price = bid_price
+        slot.bid_qty = bid_qty
+        slot.ask_price = ask_price
+        slot.ask_qty = ask_qty
+        slot.update_id = update_id
+        slot.version += 1
+        self.updates += 1
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import struct
+import threading
+import time
+from collections import deque
+from typing import BinaryIO, Iterator
+
+CAPTURE_MAGIC = b"BFIXCAP1"
+INBOUND = 0
+OUTBOUND = 1
+DEFAULT_MAX_PENDING = 65536
+DEFAULT_FLUSH_INTERVAL = 0.05
+
+# direction, monotonic timestamp (ns), session id length, frame length
+_RECORD_HEADER = struct.Struct("<BqHI")
+
+
+class CaptureRecord:
+    """A frame read from a capture file."""
+
+    __slots__ = ("direction", "frame", "session_id", "timestamp_ns")
+
+    def __init__(
+        self, direction: int, timestamp_ns: int, session_id: str, frame: bytes
+    ) -> None:
+        self.direction: int = direction
+        self.timestamp_ns: int = timestamp_ns
+        self.session_id: str = session_id
+        self.frame: bytes = frame
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CaptureRecord):
+            return NotImplemented
+        return (self.direction, self.timestamp_ns, self.session_id, self.frame) == (
+            other.direction,
+            other.timestamp_ns,
+            other.session_id,
+            other.frame,
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        direction = "IN" if self.direction == INBOUND else "OUT"
+        return (
+            f"CaptureRecord({direction}, {self.timestamp_ns}, "
+            f"{self.session_id!r}, {self.frame!r})"
+        )
+
+
+class WireCapture:
+    """
+    Append the raw frames sent and received to a binary capture file.
+
+    `record` only appends the frame to a bounded in-memory queue; a background
+    thread writes the queued records in batches and flushes the file once per batch.
+    When the queue is full the new frames are dropped (and counted in `dropped`)
+    instead of blocking the session.
+
+    The file starts with `CAPTURE_MAGIC`, followed by the records: direction (1 byte),
+    monotonic timestamp in ns (8 bytes), session id length (2 bytes), frame length
+    (4 bytes), all little endian, then the session id (utf-8) and the frame.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        """
+        Open the capture file (appending to it if it already exists) and start the writer.
+
+        Args:
+        ----
+            path (str): The capture file.
+            max_pending (int, optional): The maximum number of records waiting to be written. Defaults to 65536.
+            flush_interval (float, optional): Seconds between two batches. Defaults to 0.05.
+
+        Raises:
+        ------
+            ValueError: Raised when the file is not a capture file
+
+        """
+        if max_pending <= 0:
+            msg = "max_pending must be positive"
+            raise ValueError(msg)
+        self.path: str = path
+        self.max_pending: int = max_pending
+        self.flush_interval: float = flush_interval
+        self.pending: deque[tuple[int, int, bytes, bytes]] = deque()
+        self.dropped: int = 0
+        self.records_written: int = 0
+        self.bytes_written: int = 0
+        self.flushes: int = 0
+        self._session_ids: dict[str, bytes] = {}
+
+        self._file: BinaryIO = open(path, "ab+")  # noqa: SIM115
+        self._file.seek(0)
+        magic = self._file.read(len(CAPTURE_MAGIC))
+        if not magic:
+            self._file.write(CAPTURE_MAGIC)
+            self._file.flush()
+        elif magic != CAPTURE_MAGIC:
+            self._file.close()
+            msg = f"{path} is not a capture file"
+            raise ValueError(msg)
+
+        self._stop = threading.Event()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="WireCapture", daemon=True
+        )
+        self._writer.start()
+
+    def record(
+        self,
+        direction: int,
+        frame: bytes,
+        session_id: str,
+        timestamp_ns: int | None = None,
+    ) -> bool:
+        """
+        Queue a frame to be written.
+
+        Args:
+        ----
+            direction (int): INBOUND or OUTBOUND.
+            frame (bytes): The raw frame.
+            session_id (str): The session the frame belongs to.
+            timestamp_ns (int | None, optional): `time.monotonic_ns()` when the frame was received or sent.
+                Defaults to now.
+
+        Returns:
+        -------
+            bool: False if the frame was dropped because the queue is full.
+
+        """
+        pending = self.pending
+        if len(pending) >= self.max_pending or self._stop.is_set():
+            self.dropped += 1
+            return False
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        pending.append((direction, timestamp_ns, session_id, frame))
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return the counters of the capture.
+
+        Returns
+        -------
+            dict[str, int]: records written, dropped and pending, bytes written and flushes.
+
+        """
+        return {
+            "records_written": self.records_written,
+            "records_dropped": self.dropped,
+            "records_pending": len(self.pending),
+            "bytes_written": self.bytes_written,
+            "flushes": self.flushes,
+        }
+
+    def close(self) -> None:
+        """Write the pending records, stop the writer and close the file."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._writer.join()
+        self._write_pending()
+        self._file.close()
+
+    def __enter__(self) -> WireCapture:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _write_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self._write_pending()
+
+    def _write_pending(self) -> None:
+        """Write every queued record with a single write and flush."""
+        pending = self.pending
+        if not pending:
+            return
+        chunks = []
+        count = 0
+        pack = _RECORD_HEADER.pack
+        session_ids = self._session_ids
+        while pending:
+            direction, timestamp_ns, session_id, frame = pending.popleft()
+            session = session_ids.get(session_id)
+            if session is None:
+                session = session_ids[session_id] = session_id.encode("utf-8")
+            chunks.append(pack(direction, timestamp_ns, len(session), len(frame)))
+            chunks.append(session)
+            chunks.append(frame)
+            count += 1
+        data = b"".join(chunks)
+        self._file.write(data)
+        self._file.flush()
+        self.records_written += count
+        self.bytes_written += len(data)
+        self.flushes += 1
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """
+    Read the records of a capture file written by `WireCapture`.
+
+    Args:
+    ----
+        path (str): The capture file.
+
+    Raises:
+    ------
+        ValueError: Raised when the file is not a capture file
+
+    Returns:
+    -------
+        Iterator[CaptureRecord]: The records in the order they were written. A record
+        truncated at the end of the file (the session was killed while writing) is ignored.
+
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(CAPTURE_MAGIC):
+        msg = f"{path} is not a capture file"
+        raise ValueError(msg)
+    pos = len(CAPTURE_MAGIC)
+    header_size = _RECORD_HEADER.size
+    unpack_from = _RECORD_HEADER.unpack_from
+    while pos + header_size <= len(data):
+        direction, timestamp_ns, session_size, frame_size = unpack_from(data, pos)
+        pos += header_size
+        end = pos + session_size + frame_size
+        if end > len(data):
+            return
+        session_id = data[pos : pos + session_size].decode("utf-8")
+        yield CaptureRecord(
+            direction, timestamp_ns, session_id, data[pos + session_size : end]
+        )
+        pos = end
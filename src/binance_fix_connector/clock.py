@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import time
+
+SENDING_TIME_FORMAT = "%Y%m%d-%H:%M:%S."
+
+
+class SendingTimeClock:
+    """
+    UTC clock returning SendingTime (52) values: YYYYmmdd-HH:MM:SS.ffffff
+
+    The date and time up to the seconds only change once per second, so they are
+    formatted once and cached; each call only formats the microseconds.
+    """
+
+    __slots__ = ("_cache",)
+
+    def __init__(self) -> None:
+        self._cache: tuple[int, str] = (-1, "")
+
+    def now(self) -> str:
+        """
+        Return the current utc time.
+
+        Returns
+        -------
+            str: datetime in string format YYYYmmdd-HH:MM:SS.ffffff
+
+        """
+        return self.format(time.time_ns())
+
+    def format(self, timestamp_ns: int) -> str:
+        """
+        Return a timestamp in SendingTime format.
+
+        Args:
+        ----
+            timestamp_ns (int): Nanoseconds since the epoch, as returned by `time.time_ns()`.
+
+        Returns:
+        -------
+            str: datetime in string format YYYYmmdd-HH:MM:SS.ffffff
+
+        """
+        microseconds = timestamp_ns // 1000
+        second, fraction = divmod(microseconds, 1_000_000)
+        # A single tuple, so threads sharing the clock never see a torn cache.
+        cached_second, prefix = self._cache
+        if second != cached_second:
+            prefix = time.strftime(SENDING_TIME_FORMAT, time.gmtime(second))
+            self._cache = (second, prefix)
+        return f"{prefix}{fraction:06d}"
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Union
+
+from binance_fix_connector.market_data import (
+    MISSING_ID,
+    MDEntries,
+    MDTags,
+    MDUpdateAction,
+    decode_md_entries,
+)
+from binance_fix_connector.order_book import _symbol_ranges
+
+if TYPE_CHECKING:
+    from binance_fix_connector.market_data import InstrumentScale, InstrumentScales
+    from binance_fix_connector.message import FixMessageView
+
+SNAPSHOT = b"W"
+INCREMENTAL_REFRESH = b"X"
+CONFLATION_MODES = ("latest", "depth")
+
+# MDEntryType (269) in "latest" mode, (MDEntryType, MDEntryPx) in "depth" mode.
+EntryKey = Union[int, tuple]
+
+
+class ConflatedUpdate:
+    """
+    The updates of a symbol received since the last delivery, merged into one.
+
+    `entries` maps a key to the latest (action, side, price, qty) of the key: the
+    MDEntryType (269) in "latest" mode, the MDEntryType and MDEntryPx (270) of the
+    level in "depth" mode. When `snapshot` is set, the entries are the full state of
+    the symbol (a snapshot with the updates received after it) and replace the
+    previous one; otherwise they are a delta from the previous delivery, covering the
+    book update ids `first_book_id` to `last_book_id`.
+    """
+
+    __slots__ = (
+        "conflated",
+        "entries",
+        "first_book_id",
+        "last_book_id",
+        "md_req_id",
+        "price_decimals",
+        "qty_decimals",
+        "snapshot",
+        "symbol",
+    )
+
+    def __init__(self, md_req_id: str | None, symbol: str, snapshot: bool) -> None:
+        self.md_req_id: str | None = md_req_id
+        self.symbol: str = symbol
+        self.snapshot: bool = snapshot
+        self.first_book_id: int = MISSING_ID
+        self.last_book_id: int = MISSING_ID
+        self.price_decimals: int | None = None
+        self.qty_decimals: int | None = None
+        self.entries: dict[EntryKey, tuple[int, int, float, float]] = {}
+        self.conflated: int = 0
+
+    def __repr__(self) -> str:
+        kind = "snapshot" if self.snapshot else "delta"
+        return (
+            f"ConflatedUpdate({self.md_req_id}, {self.symbol}, {kind}, "
+            f"{len(self.entries)} entries, ids {self.first_book_id}-{self.last_book_id}, "
+            f"conflated={self.conflated})"
+        )
+
+
+class ConflatingQueue:
+    """
+    Latest-value delivery of the market data of a subscription, for slow consumers.
+
+    Pass `on_message` the MarketDataSnapshot (W) and MarketDataIncrementalRefresh (X)
+    messages of the subscription, e.g. with `BinanceFixConnector.add_conflation`. The
+    queue holds at most one `ConflatedUpdate` per symbol: an update for a symbol
+    already pending is merged into it instead of being queued after it, so the
+    consumer always reads the latest state and the memory is bounded by the symbols
+    (and, in "depth" mode, the price levels changed) rather than by how far the
+    consumer is behind.
+
+    In "latest" mode (tickers, book tickers) the entries of a symbol are kept by
+    MDEntryType, the last value replacing the pending one. In "depth" mode the diffs
+    are folded by price level into a pending delta, from the FirstBookUpdateID (25043)
+    of the first diff to the LastBookUpdateID (25044) of the last one; a snapshot
+    replaces the pending delta.
+    """
+
+    def __init__(
+        self,
+        mode: str = "latest",
+        scales: InstrumentScales | InstrumentScale | None = None,
+    ) -> None:
+        """
+        Create an empty queue.
+
+        Args:
+        ----
+            mode (str, optional): "latest" to keep the last value of each MDEntryType (269),
+                "depth" to fold the diffs by price level. Defaults to "latest".
+            scales (InstrumentScales | InstrumentScale | None, optional): The scales to keep prices and quantities
+                as fixed-point integers. Defaults to None (floats).
+
+        Raises:
+        ------
+            ValueError: Raised when the mode is unknown.
+
+        """
+        if mode not in CONFLATION_MODES:
+            msg = f"Unknown mode {mode!r}, use one of {', '.join(CONFLATION_MODES)}"
+            raise ValueError(msg)
+        self.mode: str = mode
+        self.scales: InstrumentScales | InstrumentScale | None = scales
+        self.updates: int = 0
+        self.conflated: int = 0
+        self.delivered: int = 0
+        self._pending: OrderedDict[str, ConflatedUpdate] = OrderedDict()
+        self._ready = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict[str, int]:
+        """Return the counters of the queue."""
+        with self._ready:
+            return {
+                "pending": len(self._pending),
+                "updates": self.updates,
+                "conflated": self.conflated,
+                "delivered": self.delivered,
+            }
+
+    def get(self, timeout: float | None = None) -> ConflatedUpdate | None:
+        """
+        Remove and return the oldest pending update, waiting for one.
+
+        Args:
+        ----
+            timeout (float | None, optional): Seconds to wait. Defaults to None (no limit).
+
+        Returns:
+        -------
+            ConflatedUpdate | None: The update, None if none arrived before the timeout.
+
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._ready:
+            while not self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._ready.wait(remaining)
+            self.delivered += 1
+            return self._pending.popitem(last=False)[1]
+
+    def poll(self) -> list[ConflatedUpdate]:
+        """Remove and return all the pending updates, oldest first, without waiting."""
+        with self._ready:
+            updates = list(self._pending.values())
+            self._pending.clear()
+            self.delivered += len(updates)
+            return updates
+
+    def on_message(self, message: FixMessageView) -> None:
+        """
+        Merge a MarketDataSnapshot (W) or MarketDataIncrementalRefresh (X) into the pending updates.
+
+        Args:
+        ----
+            message (FixMessageView): The message, other types are ignored.
+
+        """
+        msg_type = message.message_type
+        if msg_type != SNAPSHOT and msg_type != INCREMENTAL_REFRESH:
+            return
+        entries = decode_md_entries(message, self.scales)
+        snapshot = msg_type == SNAPSHOT
+        ranges = [
+            (symbol, start, stop, entries.last_book_id[start])
+            for symbol, start, stop in _symbol_ranges(entries)
+        ]
+        if snapshot and not entries:
+            # Empty book: the symbol and book id are only in the message.
+            symbol = message.get(MDTags.SYMBOL)
+            if symbol is None:
+                return
+            last_book_id = message.get(MDTags.LAST_BOOK_UPDATE_ID)
+            ranges = [
+                (
+                    symbol.decode("utf-8"),
+                    0,
+                    0,
+                    MISSING_ID if last_book_id is None else int(last_book_id),
+                )
+            ]
+        with self._ready:
+            for symbol, start, stop, last_book_id in ranges:
+                self._merge(symbol, entries, start, stop, snapshot, last_book_id)
+            self._ready.notify_all()
+
+    def _merge(
+        self,
+        symbol: str,
+        entries: MDEntries,
+        start: int,
+        stop: int,
+        snapshot: bool,
+        last_book_id: int,
+    ) -> None:
+        self.updates += 1
+        update = self._pending.get(symbol)
+        if update is None:
+            update = ConflatedUpdate(entries.md_req_id, symbol, snapshot)
+            update.price_decimals = entries.price_decimals
+            update.qty_decimals = entries.qty_decimals
+            self._pending[symbol] = update
+        else:
+            update.conflated += 1
+            self.conflated += 1
+            if snapshot:
+                update.snapshot = True
+                update.entries.clear()
+
+        if snapshot:
+            update.first_book_id = MISSING_ID
+        elif update.first_book_id == MISSING_ID and not update.snapshot:
+            update.first_book_id = entries.first_book_id[start]
+        update.last_book_id = last_book_id
+
+        depth = self.mode == "depth"
+        pending = update.entries
+        actions, sides, prices, qtys = (
+            entries.action,
+            entries.side,
+            entries.price,
+            entries.qty,
+        )
+        for i in range(start, stop):
+            side = sides[i]
+            key = (side, prices[i]) if depth else side
+            if actions[i] == MDUpdateAction.DELETE and update.snapshot:
+                pending.pop(key, None)  # not in the state delivered
+            else:
+                pending[key] = (actions[i], side, prices[i], qtys[i])
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import contextlib
+import threading
+from concurrent.futures import Future, InvalidStateError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from binance_fix_connector.message import FixMessageView, fix_tag_key
+from binance_fix_connector.timer_wheel import TimerWheel, get_timer_wheel
+
+
+class CorrelationTags:
+    CL_ORD_ID = b"11"
+    ORIG_CL_ORD_ID = b"41"
+    MD_REQ_ID = b"262"
+    INSTRUMENT_REQ_ID = b"320"
+    MSG_TYPE = b"35"
+
+
+class CorrelationEngine:
+    """
+    Complete `Future` handles with the first message received with a given tag value.
+
+    A waiter registers the value it expects (ClOrdID (11), MDReqID (262), MsgType
+    (35)...) with `expect` before sending its request, and blocks on the returned
+    future. The receive thread calls `dispatch` with every message received: the
+    futures waiting for one of its values are completed right away with the message,
+    so the waiter wakes up as soon as the frame is parsed. The futures expected with a
+    timeout fail with `TimeoutError` when no message matched in time.
+    """
+
+    def __init__(self, timer_wheel: TimerWheel | None = None) -> None:
+        self.timer_wheel: TimerWheel | None = timer_wheel
+        self._lock = threading.Lock()
+        self._waiters: dict[tuple[bytes, bytes], list[Future]] = {}
+        # tag -> number of futures waiting for a value of this tag
+        self._tags: dict[bytes, int] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(self._tags.values())
+
+    def expect(
+        self,
+        tag: int | str | bytes,
+        value: int | str | bytes,
+        timeout: float | None = None,
+    ) -> Future:
+        """
+        Return a future completed with the next message having `value` for `tag`.
+
+        Cancelling the future removes it from the engine.
+
+        Args:
+        ----
+            tag (int | str | bytes): The tag to match.
+            value (int | str | bytes): The value expected.
+            timeout (float | None, optional): Seconds after which the future fails with
+                `TimeoutError` and is removed. Defaults to None (no timeout).
+
+        Returns:
+        -------
+            Future: The future, its result is the FixMessageView matching.
+
+        """
+        tag = fix_tag_key(tag)
+        if not isinstance(value, bytes):
+            value = str(value).encode("utf-8")
+        key = (tag, value)
+        future: Future = Future()
+        with self._lock:
+            self._waiters.setdefault(key, []).append(future)
+            self._tags[tag] = self._tags.get(tag, 0) + 1
+        if timeout is not None:
+            if self.timer_wheel is None:
+                self.timer_wheel = get_timer_wheel()
+            timer = self.timer_wheel.call_later(timeout, self._expire, key, future)
+            future.add_done_callback(lambda _: timer.cancel())
+        future.add_done_callback(lambda f: f.cancelled() and self._discard(key, f))
+        return future
+
+    def wait(
+        self,
+        tag: int | str | bytes,
+        value: int | str | bytes,
+        timeout: float | None = None,
+    ) -> FixMessageView | None:
+        """
+        Block until a message has `value` for `tag`.
+
+        Args:
+        ----
+            tag (int | str | bytes): The tag to match.
+            value (int | str | bytes): The value expected.
+            timeout (float | None, optional): Seconds to wait. Defaults to None (forever).
+
+        Returns:
+        -------
+            FixMessageView | None: The message, None if the timeout expired.
+
+        """
+        future = self.expect(tag, value)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            return None
+
+    def dispatch(self, message: FixMessageView) -> int:
+        """
+        Complete the futures waiting for one of the values of the message.
+
+        Args:
+        ----
+            message (FixMessageView): A message received from the server.
+
+        Returns:
+        -------
+            int: The number of futures completed.
+
+        """
+        if not self._tags:
+            return 0
+        matched: list[tuple[bytes, Future]] = []
+        with self._lock:
+            for tag in self._tags:
+                value = message.get(tag)
+                if value is None:
+                    continue
+                futures = self._waiters.pop((tag, value), None)
+                if futures:
+                    matched.extend((tag, future) for future in futures)
+            for tag, _ in matched:
+                self._release(tag)
+        completed = 0
+        for _, future in matched:
+            if future.set_running_or_notify_cancel():  # False if cancelled meanwhile
+                future.set_result(message)
+                completed += 1
+        return completed
+
+    def cancel_all(self) -> None:
+        """Cancel every future waiting."""
+        with self._lock:
+            futures = [f for waiters in self._waiters.values() for f in waiters]
+            self._waiters.clear()
+            self._tags.clear()
+        for future in futures:
+            future.cancel()
+
+    def _expire(self, key: tuple[bytes, bytes], future: Future) -> None:
+        if not self._discard(key, future):
+            return  # completed meanwhile
+        with contextlib.suppress(InvalidStateError):  # cancelled meanwhile
+            future.set_exception(
+                FutureTimeoutError(f"No message with {key[0]!r}={key[1]!r} received")
+            )
+
+    def _discard(self, key: tuple[bytes, bytes], future: Future) -> bool:
+        with self._lock:
+            futures = self._waiters.get(key)
+            if not futures or future not in futures:
+                return False
+            futures.remove(future)
+            if not futures:
+                del self._waiters[key]
+            self._release(key[0])
+        return True
+
+    def _release(self, tag: bytes) -> None:
+        count = self._tags[tag] - 1
+        if count:
+            self._tags[tag] = count
+        else:
+            del self._tags[tag]
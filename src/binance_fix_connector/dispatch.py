@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from binance_fix_connector.message import FixMessageView
+
+MD_REQ_ID = b"262"
+SYMBOL = b"55"
+
+MessageHandler = Callable[["FixMessageView"], object]
+
+
+def _to_bytes(value: str | bytes | None) -> bytes | None:
+    if value is None or isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+
+class HandlerRegistration:
+    """Handle returned by `HandlerRegistry.add`, to remove the handler."""
+
+    __slots__ = ("handler", "md_req_id", "message_type", "symbol")
+
+    def __init__(
+        self,
+        message_type: bytes,
+        handler: MessageHandler,
+        md_req_id: bytes | None,
+        symbol: bytes | None,
+    ) -> None:
+        self.message_type: bytes = message_type
+        self.handler: MessageHandler = handler
+        self.md_req_id: bytes | None = md_req_id
+        self.symbol: bytes | None = symbol
+
+    def __repr__(self) -> str:
+        return (
+            f"HandlerRegistration({self.message_type!r}, {self.handler!r}, "
+            f"md_req_id={self.md_req_id!r}, symbol={self.symbol!r})"
+        )
+
+
+class HandlerRegistry:
+    """
+    Handlers called with the messages received, selected by MsgType (35).
+
+    A handler can be restricted to the messages of a MDReqID (262) and/or a Symbol
+    (55). The handlers are called from the receive thread, in the order they were
+    added; a message of a MsgType without handlers costs a single dictionary lookup.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Never mutated in place, so dispatch can read them without the lock.
+        self._handlers: dict[bytes, tuple[HandlerRegistration, ...]] = {}
+        self.logger = logging.getLogger("BinanceFixConnector")
+
+    def __len__(self) -> int:
+        return sum(map(len, self._handlers.values()))
+
+    def add(
+        self,
+        message_type: str | bytes,
+        handler: MessageHandler,
+        *,
+        md_req_id: str | bytes | None = None,
+        symbol: str | bytes | None = None,
+    ) -> HandlerRegistration:
+        """
+        Call `handler` with every message received of type `message_type`.
+
+        Args:
+        ----
+            message_type (str | bytes): The MsgType (35).
+            handler (Callable[[FixMessageView], object]): The function to call.
+            md_req_id (str | bytes | None, optional): Only the messages with this MDReqID (262). Defaults to None.
+            symbol (str | bytes | None, optional): Only the messages with this Symbol (55), in any of their entries. Defaults to None.
+
+        Returns:
+        -------
+            HandlerRegistration: The handle to remove the handler.
+
+        """
+        registration = HandlerRegistration(
+            _to_bytes(message_type), handler, _to_bytes(md_req_id), _to_bytes(symbol)
+        )
+        with self._lock:
+            handlers = self._handlers.get(registration.message_type, ())
+            self._handlers[registration.message_type] = (*handlers, registration)
+        return registration
+
+    def remove(self, registration: HandlerRegistration) -> bool:
+        """
+        Remove a handler.
+
+        Args:
+        ----
+            registration (HandlerRegistration): The handle returned by `add`.
+
+        Returns:
+        -------
+            bool: False if the handler was not registered.
+
+        """
+        with self._lock:
+            handlers = self._handlers.get(registration.message_type, ())
+            if registration not in handlers:
+                return False
+            remaining = tuple(h for h in handlers if h is not registration)
+            if remaining:
+                self._handlers[registration.message_type] = remaining
+            else:
+                del self._handlers[registration.message_type]
+            return True
+
+    def has_handlers(self, message_type: str | bytes) -> bool:
+        return _to_bytes(message_type) in self._handlers
+
+    def dispatch(self, message: FixMessageView) -> int:
+        """
+        Call the handlers of the message.
+
+        Exceptions raised by a handler are logged, the other handlers are still called.
+
+        Args:
+        ----
+            message (FixMessageView): A message received from the server.
+
+        Returns:
+        -------
+            int: The number of handlers called.
+
+        """
+        handlers = self._handlers.get(message.message_type)
+        if not handlers:
+            return 0
+        called = 0
+        md_req_id = symbols = None
+        for registration in handlers:
+            if registration.md_req_id is not None:
+                if md_req_id is None:
+                    md_req_id = message.get(MD_REQ_ID) or b""
+                if md_req_id != registration.md_req_id:
+                    continue
+            if registration.symbol is not None:
+                if symbols is None:
+                    symbols = message.get_all(SYMBOL)
+                if registration.symbol not in symbols:
+                    continue
+            called += 1
+            try:
+                registration.handler(message)
+            except Exception:
+                self.logger.exception(
+                    "Error in the handler of %s messages", registration.message_type
+                )
+        return called
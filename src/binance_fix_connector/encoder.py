@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from simplefix import FixMessage
+from simplefix.message import fix_tag, fix_val
+
+SOH = b"\x01"
+_SKIPPED_TAGS = frozenset((b"8", b"9", b"35", b"10"))
+_EQUALS_JOIN = b"=".join
+_TAGS: dict[int | str, bytes] = {}
+_CHECKSUM_FIELDS = tuple(b"10=%03d\x01" % checksum for checksum in range(256))
+_FIELD_OVERHEAD = ord("=") + SOH[0]
+
+
+class FixOutboundMessage(FixMessage):
+    """
+    FixMessage that keeps its body fields encoded as they are appended.
+
+    `append_pair` stores the pair as `FixMessage` does, and also the encoded
+    `tag=value<SOH>` field, so encoding the body is a single join. Adding header
+    pairs or removing pairs detaches the message from its `HeaderTemplate`, and it
+    is then encoded by `FixMessage.encode()`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.header_template: HeaderTemplate | None = None
+        self.body_fields: list[bytes] | None = []
+        self.body_length: int = 0
+        self.body_checksum: int = 0
+
+    def append_pair(
+        self, tag: int | str | bytes, value: object, header: bool = False
+    ) -> None:
+        if tag is None or value is None:
+            return
+        tag_bytes = _TAGS.get(tag) if type(tag) in (int, str) else None
+        if tag_bytes is None:
+            tag_bytes = fix_tag(tag)
+            int(tag_bytes)
+            if type(tag) in (int, str):
+                _TAGS[tag] = tag_bytes
+        if header or tag_bytes in _SKIPPED_TAGS:
+            super().append_pair(tag, value, header=header)
+            self.header_template = None
+            self.body_fields = None
+            return
+        value_bytes = fix_val(value)
+        self.pairs.append((tag_bytes, value_bytes))
+        if self.body_fields is not None:
+            field = tag_bytes + b"=" + value_bytes + SOH
+            self.body_fields.append(field)
+            self.body_length += len(field)
+            self.body_checksum += sum(field)
+
+    def remove(self, tag: int | str | bytes, nth: int = 1) -> bytes | None:
+        self.header_template = None
+        self.body_fields = None
+        return super().remove(tag, nth)
+
+
+class HeaderTemplate:
+    """
+    Pre-encoded standard header of the messages of a session.
+
+    BeginString (8), MsgType (35), SenderCompID (49), TargetCompID (56) and
+    RecvWindow (25000) do not change between the messages of a session, so they are
+    encoded (and added to the checksum) once. Only MsgSeqNum (34), SendingTime (52)
+    and the body are encoded for every message.
+    """
+
+    __slots__ = (
+        "_checksum",
+        "_head",
+        "_length",
+        "_middle",
+        "_prefix",
+        "_size",
+        "_tail",
+        "begin_string",
+        "header_pairs",
+        "header_pairs_after_time",
+        "message_type",
+    )
+
+    def __init__(
+        self,
+        fix_version: str,
+        msg_type: str,
+        sender_comp_id: str,
+        target_comp_id: str,
+        recv_window: str | int | None = None,
+    ) -> None:
+        self.begin_string: bytes = fix_version.encode("utf-8")
+        self.message_type: bytes = str(msg_type).encode("utf-8")
+        sender = sender_comp_id.encode("utf-8")
+        target = target_comp_id.encode("utf-8")
+
+        self.header_pairs: tuple[tuple[bytes, bytes], ...] = (
+            (b"8", self.begin_string),
+            (b"35", self.message_type),
+            (b"49", sender),
+            (b"56", target),
+        )
+        trailing: tuple[tuple[bytes, bytes], ...] = ()
+        if recv_window is not None:
+            trailing = ((b"25000", str(recv_window).encode("utf-8")),)
+        self.header_pairs_after_time: tuple[tuple[bytes, bytes], ...] = trailing
+        self._size = len(self.header_pairs) + 2 + len(trailing)
+
+        self._prefix = b"8=" + self.begin_string + SOH + b"9="
+        self._head = b"".join(
+            _EQUALS_JOIN(pair) + SOH for pair in self.header_pairs[1:]
+        )
+        self._head += b"34="
+        self._middle = SOH + b"52="
+        self._tail = SOH + b"".join(_EQUALS_JOIN(pair) + SOH for pair in trailing)
+        self._length = len(self._head) + len(self._middle) + len(self._tail)
+        self._checksum = sum(self._prefix) + sum(self._head) + sum(self._middle)
+        self._checksum += sum(self._tail) + SOH[0]  # SOH after BodyLength
+
+    def create_message(self, msg_seq_num: str, sending_time: str) -> FixOutboundMessage:
+        """
+        Return a message with the header pairs already set, without going through `append_pair`.
+
+        Args:
+        ----
+            msg_seq_num (str): MsgSeqNum (34).
+            sending_time (str): SendingTime (52).
+
+        Returns:
+        -------
+            FixOutboundMessage: The message ready to be filled with the body tags.
+
+        """
+        msg = FixOutboundMessage()
+        msg.begin_string = self.begin_string
+        msg.message_type = self.message_type
+        msg.pairs = [
+            *self.header_pairs,
+            (b"34", msg_seq_num.encode("ASCII")),
+            (b"52", sending_time.encode("ASCII")),
+            *self.header_pairs_after_time,
+        ]
+        msg.header_index = len(msg.pairs)
+        msg.header_template = self
+        return msg
+
+    def encode(self, msg: FixOutboundMessage) -> bytes:
+        """
+        Encode a message created by `create_message`, like `FixMessage.encode()`.
+
+        Falls back to `FixMessage.encode()` if the message has been changed other than
+        by appending body pairs.
+
+        Args:
+        ----
+            msg (FixOutboundMessage): The message.
+
+        Returns:
+        -------
+            bytes: The message in on-the-wire FIX format.
+
+        """
+        pairs = msg.pairs
+        body_fields = msg.body_fields
+        if (
+            msg.header_template is not self
+            or body_fields is None
+            or msg.header_index != self._size
+            or len(pairs) != self._size + len(body_fields)
+        ):
+            return msg.encode()
+        msg_seq_num = pairs[4][1]
+        sending_time = pairs[5][1]
+        body_length = b"%d" % (
+            self._length + len(msg_seq_num) + len(sending_time) + msg.body_length
+        )
+        checksum = (
+            self._checksum
+            + sum(msg_seq_num)
+            + sum(sending_time)
+            + sum(body_length)
+            + msg.body_checksum
+        )
+        return b"".join(
+            (
+                self._prefix,
+                body_length,
+                SOH,
+                self._head,
+                msg_seq_num,
+                self._middle,
+                sending_time,
+                self._tail,
+                *body_fields,
+                _CHECKSUM_FIELDS[checksum % 256],
+            )
+        )
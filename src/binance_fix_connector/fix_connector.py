@@ -3,30 +3,79 @@ from __future__ import annotations
 
 import base64
 import contextlib
+import itertools
 import logging
 import socket
-import ssl
 import sys
 import threading
 import time
-from datetime import datetime, timedelta, timezone
-from queue import Queue
-from typing import TYPE_CHECKING
+from datetime import datetime, timedelta
+from queue import Empty, Queue
+from typing import TYPE_CHECKING, Callable
 from urllib.parse import urlparse
 
 from simplefix import FixMessage
 
+from binance_fix_connector.bars import DEFAULT_INTERVALS, BarBuilder
+from binance_fix_connector.book_ticker import BookTickerCache
+from binance_fix_connector.capture import INBOUND, OUTBOUND, WireCapture
+from binance_fix_connector.clock import SendingTimeClock
+from binance_fix_connector.conflation import ConflatingQueue
+from binance_fix_connector.correlation import CorrelationEngine, CorrelationTags
+from binance_fix_connector.dispatch import (
+    HandlerRegistration,
+    HandlerRegistry,
+    MessageHandler,
+)
+from binance_fix_connector.encoder import HeaderTemplate
+from binance_fix_connector.framer import MAX_RECEIVE_BUFFER_SIZE, FixFramer
+from binance_fix_connector.handoff import (
+    HEADER_TAGS,
+    MARKET_DATA_REQUEST,
+    MD_REQ_ID,
+    STANDBY_SESSION_MESSAGE_TYPES,
+    SUBSCRIPTION_REQUEST_TYPE,
+    UNSUBSCRIBE,
+    HandoffDeduplicator,
+    active_subscriptions,
+)
+from binance_fix_connector.market_data import InstrumentScales
+from binance_fix_connector.message import FixMessageView, WireFrame
+from binance_fix_connector.order_book import OrderBookEngine
+from binance_fix_connector.reactor import FixReactor
+from binance_fix_connector.scheduler import SessionScheduler, get_scheduler
+from binance_fix_connector.send_queue import SendQueue, message_priority, order_keys
+from binance_fix_connector.socket_profile import (
+    TCP_QUICKACK,
+    SocketProfile,
+    get_socket_profile,
+)
+from binance_fix_connector.timer_wheel import TimerHandle, TimerWheel
+from binance_fix_connector.tls import TLSContextCache, get_tls_cache
+
 if TYPE_CHECKING:
+    from concurrent.futures import Future
+
     from cryptography.hazmat.primitives.asymmetric import ed25519
 
+    from binance_fix_connector.bars import Bar
+
 _SOH_ = "\x01"
 GREEN = "\033[32m"
 BLUE = "\u001b[34m"
 RESET = "\x1b[0m"
+WIRE_LOGGER_NAME = "BinanceFixConnector.wire"
+_SESSION_COUNTER = itertools.count(1)
+RECEIVE_THREAD_JOIN_TIMEOUT = 5
+_MARKET_DATA_TYPES = (b"W", b"X")
+# MsgSeqNum (34) of the messages numbered by the writer thread of the send queue.
+PENDING_MSG_SEQ_NUM = "0"
+PENDING_MSG_SEQ_NUM_BYTES = PENDING_MSG_SEQ_NUM.encode("ASCII")
+# Part of the heartbeat interval added for the transmission time before the server
+# is considered silent (TestRequest sent), then unresponsive (disconnected).
+HEARTBEAT_ALLOWANCE = 0.2
 MAX_BUFFER_SIZE = 4096
 MAX_SENDER_ID_LENGTH = 8
-MIN_FIX_MESSAGE_LENGTH = 37
-TRAILER_SIZE = 6
 FIX_MD_URL = "tcp+tls://fix-md.binance.com:9000"
 FIX_OE_URL = "tcp+tls://fix-oe.binance.com:9000"
 FIX_DC_URL = "tcp+tls://fix-dc.binance.com:9000"
@@ -39,6 +88,9 @@ class FixMsgTypes:
     LOGON = "A"
     REJECT = "3"
     NEWS = "B"
+    INSTRUMENT_LIST = "y"
+    MARKET_DATA_SNAPSHOT = "W"
+    MARKET_DATA_INCREMENTAL_REFRESH = "X"
 
 
 class FixTags:
@@ -74,6 +126,7 @@ def _create_session(
     target_comp_id: str = "SPOT",
     fix_version: str = "FIX.4.4",
     socket_buffer_size: int = MAX_BUFFER_SIZE,
+    max_buffer_size: int = MAX_RECEIVE_BUFFER_SIZE,
     heart_bt_int: int = 30,
     reset_seq_num_flag: bool = True,
     encrypt_method: int = 0,
@@ -81,6 +134,14 @@ def _create_session(
     response_mode: int | None = None,
     drop_copy_flag: bool | None = None,
     recv_window: int | None = None,
+    wire_capture: WireCapture | None = None,
+    queue_messages: bool = True,
+    reactor: FixReactor | None = None,
+    send_queue: bool = False,
+    socket_profile: SocketProfile | str | None = None,
+    tls_cache: TLSContextCache | None = None,
+    scheduler: SessionScheduler | None = None,
+    shared_with: BinanceFixConnector | None = None,
 ) -> BinanceFixConnector:
     session = BinanceFixConnector(
         endpoint=endpoint,
@@ -90,13 +151,32 @@ def _create_session(
         target_comp_id=target_comp_id,
         fix_version=fix_version,
         socket_buffer_size=socket_buffer_size,
+        max_buffer_size=max_buffer_size,
         heart_bt_int=heart_bt_int,
         reset_seq_num_flag=reset_seq_num_flag,
         encrypt_method=encrypt_method,
         message_handling=message_handling,
         response_mode=response_mode,
         drop_copy_flag=drop_copy_flag,
+        wire_capture=wire_capture,
+        queue_messages=queue_messages,
+        reactor=reactor,
+        send_queue=send_queue,
+        socket_profile=socket_profile,
+        tls_cache=tls_cache,
+        scheduler=scheduler,
     )
+    if shared_with is not None:
+        # Set before connecting: the messages received are delivered as the ones of
+        # `shared_with`, from the first one, except the session messages of its own
+        # connection until it takes over.
+        session.standby = True
+        session.queue_msg_received = shared_with.queue_msg_received
+        session.handlers = shared_with.handlers
+        session.correlation = shared_with.correlation
+        session.instrument_scales = shared_with.instrument_scales
+        session.conflated_md_req_ids = shared_with.conflated_md_req_ids
+        session.handoff = shared_with.handoff
     session.connect()
     session.logon(recv_window=recv_window)
     return session
@@ -112,12 +192,16 @@ def create_market_data_session(
     heart_bt_int: int = 30,
     message_handling: int = 2,
     recv_window: int | None = None,
+    socket_profile: SocketProfile | str | None = None,
+    queue_messages: bool = True,
 ) -> BinanceFixConnector:
     """
     Create a session to the FIX market data service.
 
     Message handling:   1->UNORDERED
                         2->SEQUENTIAL
+    Socket profile: "low-latency", "high-throughput" or a SocketProfile
+    Queue messages: False to only deliver the messages to the handlers
     """
     return _create_session(
         endpoint=endpoint,
@@ -132,6 +216,8 @@ def create_market_data_session(
         encrypt_method=0,
         message_handling=message_handling,
         recv_window=recv_window,
+        socket_profile=socket_profile,
+        queue_messages=queue_messages,
     )
 
 
@@ -146,6 +232,8 @@ def create_order_entry_session(
     message_handling: int = 2,
     response_mode: int = 1,
     recv_window: int | None = None,
+    socket_profile: SocketProfile | str | None = None,
+    queue_messages: bool = True,
 ) -> BinanceFixConnector:
     """
     Create a session to the FIX order-entry service.
@@ -154,6 +242,8 @@ def create_order_entry_session(
                     2->ONLY_ACKS
     Message handling:   1->UNORDERED
                         2->SEQUENTIAL
+    Socket profile: "low-latency", "high-throughput" or a SocketProfile
+    Queue messages: False to only deliver the messages to the handlers
     """
     return _create_session(
         endpoint=endpoint,
@@ -170,6 +260,8 @@ def create_order_entry_session(
         message_handling=message_handling,
         drop_copy_flag="N",
         recv_window=recv_window,
+        socket_profile=socket_profile,
+        queue_messages=queue_messages,
     )
 
 
@@ -184,6 +276,8 @@ def create_drop_copy_session(
     message_handling: int = 2,
     response_mode: int = 1,
     recv_window: int | None = None,
+    socket_profile: SocketProfile | str | None = None,
+    queue_messages: bool = True,
 ) -> BinanceFixConnector:
     """
     Create a session to the FIX drop-copy service.
@@ -192,6 +286,8 @@ def create_drop_copy_session(
                     2->ONLY_ACKS
     Message handling:   1->UNORDERED
                         2->SEQUENTIAL
+    Socket profile: "low-latency", "high-throughput" or a SocketProfile
+    Queue messages: False to only deliver the messages to the handlers
     """
     return _create_session(
         endpoint=endpoint,
@@ -208,6 +304,8 @@ def create_drop_copy_session(
         message_handling=message_handling,
         drop_copy_flag="Y",
         recv_window=recv_window,
+        socket_profile=socket_profile,
+        queue_messages=queue_messages,
     )
 
 
@@ -222,6 +320,7 @@ class BinanceFixConnector:
         target_comp_id: str = "SPOT",
         fix_version: str = "FIX.4.4",
         socket_buffer_size: int = MAX_BUFFER_SIZE,
+        max_buffer_size: int = MAX_RECEIVE_BUFFER_SIZE,
         heart_bt_int: int = 30,
         reset_seq_num_flag: bool = True,
         encrypt_method: int = 0,
@@ -229,6 +328,13 @@ class BinanceFixConnector:
         response_mode: int = 1,
         drop_copy_flag: bool = False,
         restart: bool = True,
+        wire_capture: WireCapture | None = None,
+        queue_messages: bool = True,
+        reactor: FixReactor | None = None,
+        send_queue: bool = False,
+        socket_profile: SocketProfile | str | None = None,
+        tls_cache: TLSContextCache | None = None,
+        scheduler: SessionScheduler | None = None,
     ) -> None:
         """
         Create a fix session.
@@ -241,9 +347,11 @@ class BinanceFixConnector:
             sender_comp_id (str): the sender id (client)
             target_comp_id (str, optional):The target id (server). Defaults to "SPOT".
             fix_version (str, optional): The fix version protocol used. Defaults to "FIX.4.4".
-            socket_buffer_size (int, optional): The socket buffer when receiving messages from server. Defaults to 4096.
+            socket_buffer_size (int, optional): The initial size of the buffer receiving messages from server. Defaults to 4096.
+            max_buffer_size (int, optional): The size the receive buffer can grow to when a message does not fit. Defaults to 16MiB.
 
             heart_bt_int (int, optional): The heartbeat interval. Defaults to 30
+                The Heartbeats and TestRequests are sent on this interval, 0 disables them.
             reset_seq_num_flag (bool, optional): The reset seq num flag. Defaults to True.
 
             encrypt_method (int, optional): The encrypt method. Defaults to 0 (None).
@@ -251,6 +359,22 @@ class BinanceFixConnector:
             response_mode (int, optional): The response mode. Defaults to 1 (EVERYTHING).
             drop_copy_flag (bool, optional): The drop copy flag. Defaults to False.
             restart (bool, optional): Whether to enable automatic session restart upon server notification. Defaults to True.
+            wire_capture (WireCapture | None, optional): Where to record the frames sent and received. Defaults to None.
+            queue_messages (bool, optional): Whether to put the messages received in the queue read by
+                `retrieve_messages_until` and `get_all_new_messages_received`. Sessions processing the
+                messages with `add_handler` can turn it off. Defaults to True.
+            reactor (FixReactor | None, optional): The reactor reading the connection and sending the heartbeats,
+                instead of a receive thread per session. Defaults to None.
+            send_queue (bool, optional): Whether to write the messages from a writer thread, session messages
+                and cancels first, instead of from the thread sending them. MsgSeqNum (34) and SendingTime (52)
+                are then assigned by the writer thread. Defaults to False.
+            socket_profile (SocketProfile | str | None, optional): The options of the TCP socket, or the name of a
+                preset ("low-latency", "high-throughput"). Defaults to None (OS defaults).
+            tls_cache (TLSContextCache | None, optional): The SSL contexts and TLS sessions to resume, per endpoint.
+                Defaults to None (the cache shared by the sessions of the process).
+            scheduler (SessionScheduler | None, optional): The threads preparing and performing the restarts,
+                and the timer wheel of the heartbeats and timeouts. Defaults to None (the scheduler
+                shared by all the sessions).
 
 
         Raises:
@@ -291,6 +415,7 @@ class BinanceFixConnector:
         self.drop_copy_flag = drop_copy_flag
 
         self.socket_buffer_size: int = socket_buffer_size
+        self.max_buffer_size: int = max_buffer_size
 
         self.lock = threading.Lock()
         self.priv_key: ed25519.Ed25519PrivateKey = None
@@ -301,7 +426,7 @@ class BinanceFixConnector:
         self.is_connected: bool = False
 
         self.msg_seq_num: int = 1
-        self.queue_msg_received: Queue[FixMessage] = Queue()
+        self.queue_msg_received: Queue[FixMessageView] = Queue()
         self.messages_sent: list[FixMessage] = []
 
         self.restart: bool = restart
@@ -309,6 +434,48 @@ class BinanceFixConnector:
         self.restart_session = None
         self.restart_timer = None
         self.restart_time = None
+        self.restart_future: Future | None = None
+        self.handoff: HandoffDeduplicator | None = None
+        # Restart session sharing the queue and handlers of the session it replaces.
+        self.standby: bool = False
+        # Replaying a capture (`CaptureReplay`): no session-level action on the messages.
+        self.replaying: bool = False
+        self.scheduler: SessionScheduler = scheduler or get_scheduler()
+        self.timer_wheel: TimerWheel = self.scheduler.timer_wheel
+
+        self.last_sent: float = 0.0
+        self.last_received: float = 0.0
+        self.liveness_timer: TimerHandle | None = None
+        self.test_request_id: str | None = None
+        self.test_request_time: float = 0.0
+        self.test_request_ids = itertools.count(1)
+
+        self.wire_capture: WireCapture | None = wire_capture
+        self.session_id: str = (
+            f"{sender_comp_id}-{target_comp_id}-{next(_SESSION_COUNTER)}"
+        )
+
+        self.queue_messages: bool = queue_messages
+        self.conflated_md_req_ids: set[bytes] = set()
+        self.reactor: FixReactor | None = reactor
+        self.socket_profile: SocketProfile | None = get_socket_profile(socket_profile)
+        self.socket_options: dict[str, int | str] = {}
+        self.tls_cache: TLSContextCache = tls_cache or get_tls_cache()
+        self.connect_timings: dict[str, float | bool] = {}
+        self.send_queue: SendQueue | None = (
+            SendQueue(
+                self._send_data,
+                encode=self._encode_queued,
+                on_written=self._record_sent,
+                name=f"FixSendQueue-{self.session_id}",
+            )
+            if send_queue
+            else None
+        )
+        self.handlers = HandlerRegistry()
+        self.correlation = CorrelationEngine(self.timer_wheel)
+        self.instrument_scales = InstrumentScales()
+        self.header_templates: dict[tuple[str, str | None], HeaderTemplate] = {}
 
         logging.basicConfig(
             level=logging.INFO,
@@ -317,7 +484,9 @@ class BinanceFixConnector:
         )
 
         self.logger = logging.getLogger("BinanceFixConnector")
-        self.__data: bytes = b""
+        self.wire_logger = logging.getLogger(WIRE_LOGGER_NAME)
+        self.framer = FixFramer(socket_buffer_size, max_buffer_size)
+        self.sending_time_clock = SendingTimeClock()
 
     def current_utc_time(self) -> str:
         """
@@ -328,7 +497,28 @@ class BinanceFixConnector:
             - datetime in string format YYYYmmdd-HH:MM:SS.ffffff
 
         """
-        return datetime.now(timezone.utc).strftime("%Y%m%d-%H:%M:%S.%f")
+        return self.sending_time_clock.now()
+
+    def get_metrics(self) -> dict[str, dict]:
+        """
+        Return the metrics collected by the session.
+
+        Returns
+        -------
+            dict[str, dict]: The metrics grouped by stage ("receive": reads, frames, bytes copied...,
+            "connect": duration of the TCP connect and TLS handshake, TLS session resumed...,
+            "wire_capture": records written and dropped..., "send_queue": frames and writes...,
+            "socket": the options of the socket profile).
+
+        """
+        metrics = {"receive": self.framer.stats(), "connect": self.connect_timings}
+        if self.socket_profile is not None:
+            metrics["socket"] = self.socket_options
+        if self.send_queue is not None:
+            metrics["send_queue"] = self.send_queue.stats()
+        if self.wire_capture is not None:
+            metrics["wire_capture"] = self.wire_capture.stats()
+        return metrics
 
     def get_next_seq_num(self) -> str:
         """
@@ -376,55 +566,46 @@ class BinanceFixConnector:
         signature = self.private_key.sign(bytes(signed_headers, "ASCII"))
         return base64.b64encode(signature).decode("ASCII")
 
-    def parse_server_response(self) -> list[FixMessage]:
+    def parse_server_response(self) -> list[FixMessageView]:
         """
         Parse the response from the server and create a fix message for every message serve has sent.
 
         Returns
         -------
-            list[FixMessage]: The list of (FIX) messages server has sent.
-
-        """
-        if len(self.__data) < MIN_FIX_MESSAGE_LENGTH:
-            return []
-        raw_data = self.__data.decode("utf-8")
-        msg = raw_data if raw_data.startswith(_SOH_) else f"{_SOH_}{raw_data}"
-        raw_messages = [f"8={x}" for x in msg.split(f"{_SOH_}8=") if x]
-        messages: list[FixMessage] = []
-        for i in range(len(raw_messages)):
-            tag_values = [
-                x
-                for x in raw_messages[i].split(_SOH_)
-                if "=" in x and not x.startswith("=")
-            ]
-            if (
-                len(tag_values) > 1
-                and tag_values[0] == "8="
-                and tag_values[1] == self.fix_version
-            ):
-                tag_values.pop(0)
-                tag_values[0] = f"8={self.fix_version}"
-            if tag_values[-1].startswith("10=") and len(tag_values[-1]) >= TRAILER_SIZE:
-                fix_msg = FixMessage()
-                fix_msg.append_strings(tag_values)
-                messages.append(fix_msg)
-            else:  # uncompleted message
-                self.__data = bytes(f"{_SOH_}".join(raw_messages[i:]).encode("ASCII"))
-                return messages
+            list[FixMessageView]: The list of (FIX) messages server has sent.
 
-        self.__data = b""
-        return messages
+        """
+        return [FixMessageView(frame) for frame in self.framer.frames()]
 
     def connect(self) -> None:
         """Create a socket connection between the client and the server."""
         try:
             if self.sock:
+                if self.reactor is not None:
+                    self.reactor.unregister(self)
                 self.sock.close()
                 self.sock = None
             url = urlparse(self.endpoint)
+            start = time.perf_counter()
             sock = socket.create_connection((url.hostname, url.port))
-            context = ssl.create_default_context()
-            self.sock = context.wrap_socket(sock, server_hostname=url.hostname)
+            tcp_connected = time.perf_counter()
+            if self.socket_profile is not None:
+                self.socket_options = self.socket_profile.apply(sock)
+            context = self.tls_cache.get_context(self.endpoint)
+            context_loaded = time.perf_counter()
+            self.sock = context.wrap_socket(
+                sock,
+                server_hostname=url.hostname,
+                session=self.tls_cache.get_session(self.endpoint),
+            )
+            connected = time.perf_counter()
+            self.connect_timings = {
+                "tcp_connect": tcp_connected - start,
+                "tls_context": context_loaded - tcp_connected,
+                "tls_handshake": connected - context_loaded,
+                "total": connected - start,
+                "session_reused": self.sock.session_reused,
+            }
             self.logger.info("-" * 100)
             self.logger.info(
                 "FIX Client (%s:%s): Connected to %s",
@@ -435,7 +616,12 @@ class BinanceFixConnector:
             self.logger.info("-" * 100)
             self.logger.info("LOGIN (A)")
             self.is_connected = True
-            if self.receive_thread is None or not self.receive_thread.is_alive():
+            self.start_liveness()
+            if self.send_queue is not None:
+                self.send_queue.start()
+            if self.reactor is not None:
+                self.reactor.register(self)
+            elif self.receive_thread is None or not self.receive_thread.is_alive():
                 self.receive_thread = threading.Thread(
                     target=self.__receive_messages, daemon=True
                 )
@@ -447,31 +633,21 @@ class BinanceFixConnector:
 
     def __receive_messages(self) -> None:
         """Read the data sent from server and process the messages accordingly."""
-        messages: list[FixMessage] = []
+        messages: list[FixMessageView] = []
+        quickack = (
+            self.socket_profile is not None
+            and self.socket_profile.quickack
+            and TCP_QUICKACK is not None
+        )
         while self.is_connected:
             try:
-                data = self.sock.recv(self.socket_buffer_size)
-                self.__data += data
-                if not data:
+                if not self.framer.recv_into(self.sock):
                     break
+                if quickack:
+                    self.sock.setsockopt(socket.IPPROTO_TCP, TCP_QUICKACK, 1)
                 messages = self.parse_server_response()
                 if messages:
-                    self.__data = b""
-                    for msg in messages:
-                        try:
-                            clean_message = (
-                                msg.encode().decode("utf-8").replace(_SOH_, "|")
-                            )
-                        except ValueError:
-                            self.logger.warning(
-                                "Message decoded but could not be logged (missing MsgType: 35)"
-                            )
-                            continue
-
-                        self.logger.info(
-                            "%sServer=>Client: %s%s", GREEN, clean_message, RESET
-                        )
-                    self.on_message_received(messages)
+                    self._process_received(messages)
 
             except OSError:
                 break
@@ -480,19 +656,48 @@ class BinanceFixConnector:
                 self.disconnect()
                 raise
 
-    def on_message_received(self, messages: list[FixMessage]) -> None:
+    def _process_received(self, messages: list[FixMessageView]) -> None:
+        """Record, log and process the messages parsed from the data received."""
+        self.last_received = time.monotonic()
+        if self.wire_capture is not None:
+            received_ns = time.monotonic_ns()
+            for msg in messages:
+                self.wire_capture.record(
+                    INBOUND, msg.frame, self.session_id, received_ns
+                )
+        if self.wire_logger.isEnabledFor(logging.INFO):
+            for msg in messages:
+                self.wire_logger.info(
+                    "%sServer=>Client: %s%s", GREEN, WireFrame(msg.encode()), RESET
+                )
+        self.on_message_received(messages)
+
+    def on_message_received(self, messages: list[FixMessageView]) -> None:
         """
         Process every message received from server.
 
         Args:
         ----
-            messages (list[FixMessage]): The messages to be processed
+            messages (list[FixMessageView]): The messages to be processed
 
         """
-        with self.lock:
-            for msg in messages:
-                self.queue_msg_received.put(msg)
+        if self.handoff is not None:
+            messages = self.handoff.filter(messages)
+        standby = self.standby
+        if self.queue_messages:
+            self._enqueue_messages(
+                [
+                    message
+                    for message in messages
+                    if message.message_type not in STANDBY_SESSION_MESSAGE_TYPES
+                ]
+                if standby
+                else messages
+            )
         for message in messages:
+            if not standby or message.message_type not in STANDBY_SESSION_MESSAGE_TYPES:
+                self.correlation.dispatch(message)
+                self.handlers.dispatch(message)
             msg_type = (
                 None
                 if not message.get(FixTags.MSG_TYPE)
@@ -514,29 +719,54 @@ class BinanceFixConnector:
                     "Sending a heartbeat message as we received a TestRequest message from server"
                 )
                 self.heartbeat(test_req_resp_id)
+            if msg_type == FixMsgTypes.LOGON and not self.replaying:
+                # The TLS 1.3 session tickets are received before the Logon response.
+                self.tls_cache.save_session(self.endpoint, self.sock)
+            if msg_type == FixMsgTypes.INSTRUMENT_LIST:
+                self.instrument_scales.update(message)
             if msg_type == FixMsgTypes.NEWS:
                 self.logger.info("News message received from server.")
                 news_text = (
                     None if not message.get(148) else message.get(148).decode("utf-8")
                 )
                 self.logger.info("NewsText: %s", news_text)
-                if self.restart:
+                if self.restart and not self.replaying:
                     self.schedule_restart()
-            if msg_type == FixMsgTypes.LOGOUT and self.restart is False:
+            if (
+                msg_type == FixMsgTypes.LOGOUT
+                and self.restart is False
+                and not self.replaying
+            ):
                 self.logger.info(
                     "Logout message received from server. Closing connection."
                 )
                 self.logout()
                 self.disconnect()
 
-    def get_all_new_messages_received(self) -> list[FixMessage]:
+    def _enqueue_messages(self, messages: list[FixMessageView]) -> None:
+        """Put the messages in the queue read by `retrieve_messages_until`."""
+        with self.lock:
+            for msg in messages:
+                if not self._is_conflated(msg):
+                    self.queue_msg_received.put(msg)
+
+    def _is_conflated(self, msg: FixMessageView) -> bool:
+        """Return True for the market data delivered by a `ConflatingQueue` instead of the queue."""
+        conflated = self.conflated_md_req_ids
+        return bool(
+            conflated
+            and msg.message_type in _MARKET_DATA_TYPES
+            and msg.get(MD_REQ_ID) in conflated
+        )
+
+    def get_all_new_messages_received(self) -> list[FixMessageView]:
         """
         Return all the FIX messages received from the server until now.
         If no new messages received, it returns [].
 
         Returns
         -------
-            list[FixMessage]: The list of fix messages received from server.
+            list[FixMessageView]: The list of fix messages received from server.
 
         """
         with self.lock:
@@ -545,33 +775,294 @@ class BinanceFixConnector:
                 for _ in range(self.queue_msg_received.qsize())
             ]
 
+    def add_handler(
+        self,
+        message_type: str,
+        handler: MessageHandler,
+        *,
+        md_req_id: str | None = None,
+        symbol: str | None = None,
+    ) -> HandlerRegistration:
+        """
+        Call `handler` from the receive thread with every message of type `message_type`.
+
+        Args:
+        ----
+            message_type (str): The MsgType (35).
+            handler (Callable[[FixMessageView], object]): The function to call.
+            md_req_id (str | None, optional): Only the messages with this MDReqID (262). Defaults to None.
+            symbol (str | None, optional): Only the messages with this Symbol (55), in any of their entries. Defaults to None.
+
+        Returns:
+        -------
+            HandlerRegistration: The handle to pass to `remove_handler`.
+
+        """
+        return self.handlers.add(
+            message_type, handler, md_req_id=md_req_id, symbol=symbol
+        )
+
+    def add_order_book(
+        self, md_req_id: str, *, fixed_point: bool = False, ladder: str = "array"
+    ) -> OrderBookEngine:
+        """
+        Maintain the books of the symbols of a depth stream subscription.
+
+        The snapshots (W) and diffs (X) of the subscription are applied from the
+        receive thread. After a gap in the book update ids, the subscription is sent
+        again with `resubscribe` to receive a new snapshot.
+
+        Args:
+        ----
+            md_req_id (str): The MDReqID (262) of the depth stream subscription.
+            fixed_point (bool, optional): Keep prices and quantities as fixed-point integers,
+                using the scales of `instrument_scales`. Defaults to False.
+            ladder (str, optional): The storage of the levels, "array" or "dense" (indexed by
+                tick, implies `fixed_point`). Defaults to "array".
+
+        Returns:
+        -------
+            OrderBookEngine: The books, by symbol.
+
+        """
+        books = OrderBookEngine(
+            scales=self.instrument_scales if fixed_point or ladder == "dense" else None,
+            resync=lambda _symbol, req_id: self.resubscribe(req_id or md_req_id),
+            ladder=ladder,
+        )
+        for message_type in (
+            FixMsgTypes.MARKET_DATA_SNAPSHOT,
+            FixMsgTypes.MARKET_DATA_INCREMENTAL_REFRESH,
+        ):
+            self.add_handler(message_type, books.on_message, md_req_id=md_req_id)
+        return books
+
+    def add_book_ticker(
+        self, md_req_id: str, *, fixed_point: bool = False
+    ) -> BookTickerCache:
+        """
+        Keep the latest best bid and ask of the symbols of a book ticker subscription.
+
+        The cache is updated from the receive thread; `cache.get(symbol)` can be called
+        from any thread, without draining `queue_msg_received`.
+
+        Args:
+        ----
+            md_req_id (str): The MDReqID (262) of the book ticker subscription.
+            fixed_point (bool, optional): Keep prices and quantities as fixed-point integers,
+                using the scales of `instrument_scales`. Defaults to False.
+
+        Returns:
+        -------
+            BookTickerCache: The best bid and ask, by symbol.
+
+        """
+        cache = BookTickerCache(self.instrument_scales if fixed_point else None)
+        for message_type in (
+            FixMsgTypes.MARKET_DATA_SNAPSHOT,
+            FixMsgTypes.MARKET_DATA_INCREMENTAL_REFRESH,
+        ):
+            self.add_handler(message_type, cache.on_message, md_req_id=md_req_id)
+        return cache
+
+    def add_bar_builder(
+        self,
+        md_req_id: str,
+        intervals: tuple[float, ...] = DEFAULT_INTERVALS,
+        *,
+        on_bar: Callable[[Bar], object] | None = None,
+        fixed_point: bool = False,
+    ) -> BarBuilder:
+        """
+        Build OHLCV and VWAP bars from the trades of a trade stream subscription.
+
+        The trades are added to the open bars from the receive thread; the bars are
+        passed to `on_bar` when they close, from the receive thread or a worker thread of
+        the scheduler.
+
+        Args:
+        ----
+            md_req_id (str): The MDReqID (262) of the trade stream subscription.
+            intervals (tuple[float, ...], optional): The bar intervals, in seconds. Defaults to (1, 60).
+            on_bar (Callable[[Bar], object] | None, optional): Called with every bar closed. Defaults to None.
+            fixed_point (bool, optional): Keep prices and quantities as fixed-point integers,
+                using the scales of `instrument_scales`. Defaults to False.
+
+        Returns:
+        -------
+            BarBuilder: The bars, by symbol and interval.
+
+        """
+        builder = BarBuilder(
+            intervals,
+            scales=self.instrument_scales if fixed_point else None,
+            on_bar=on_bar,
+            scheduler=self.scheduler,
+        )
+        self.add_handler(
+            FixMsgTypes.MARKET_DATA_INCREMENTAL_REFRESH,
+            builder.on_message,
+            md_req_id=md_req_id,
+        )
+        return builder
+
+    def add_conflation(
+        self, md_req_id: str, *, mode: str = "latest", fixed_point: bool = False
+    ) -> ConflatingQueue:
+        """
+        Deliver the market data of a subscription conflated, to a consumer that may fall behind.
+
+        The snapshots (W) and updates (X) of the subscription are merged by symbol into a
+        `ConflatingQueue` from the receive thread, and are no longer put in
+        `queue_msg_received`: read them with `queue.get()` or `queue.poll()`.
+
+        Args:
+        ----
+            md_req_id (str): The MDReqID (262) of the subscription.
+            mode (str, optional): "latest" for ticker and book ticker streams (the last value of
+                each MDEntryType), "depth" for depth streams (the diffs folded by price level).
+                Defaults to "latest".
+            fixed_point (bool, optional): Keep prices and quantities as fixed-point integers,
+                using the scales of `instrument_scales`. Defaults to False.
+
+        Returns:
+        -------
+            ConflatingQueue: The pending updates, by symbol.
+
+        """
+        queue = ConflatingQueue(mode, self.instrument_scales if fixed_point else None)
+        for message_type in (
+            FixMsgTypes.MARKET_DATA_SNAPSHOT,
+            FixMsgTypes.MARKET_DATA_INCREMENTAL_REFRESH,
+        ):
+            self.add_handler(message_type, queue.on_message, md_req_id=md_req_id)
+        self.conflated_md_req_ids.add(md_req_id.encode("utf-8"))
+        return queue
+
+    def resubscribe(self, md_req_id: str) -> bool:
+        """
+        Unsubscribe from a market data stream and subscribe again, to get a new snapshot.
+
+        Args:
+        ----
+            md_req_id (str): The MDReqID (262) of the subscription.
+
+        Returns:
+        -------
+            bool: False if no subscription with this MDReqID was sent.
+
+        """
+        with self.lock:
+            subscriptions = active_subscriptions(self.messages_sent)
+        key = md_req_id.encode("utf-8")
+        subscription = next(
+            (message for message in subscriptions if message.get(MD_REQ_ID) == key),
+            None,
+        )
+        if subscription is None:
+            self.logger.warning("No subscription with MDReqID %s", md_req_id)
+            return False
+        self.send_message(
+            self.copy_message(subscription, {SUBSCRIPTION_REQUEST_TYPE: UNSUBSCRIBE})
+        )
+        self.send_message(self.copy_message(subscription))
+        return True
+
+    def remove_handler(self, registration: HandlerRegistration) -> bool:
+        """
+        Stop calling a handler added with `add_handler`.
+
+        Args:
+        ----
+            registration (HandlerRegistration): The handle returned by `add_handler`.
+
+        Returns:
+        -------
+            bool: False if the handler was not registered.
+
+        """
+        return self.handlers.remove(registration)
+
     def retrieve_messages_until(
         self,
         message_type: str | list[str],
         message_cl_ord_id: str | None = None,
         timeout_seconds: int = 3,
-    ) -> list[FixMessage]:
+    ) -> list[FixMessageView]:
         """Return all the FIX messages received from the server until message of desired type is received."""
-        # with self.lock:
         if isinstance(message_type, str):
             message_type = [message_type]
-        messages: list[FixMessage] = []
-        timeout = datetime.now() + timedelta(seconds=timeout_seconds)
-        while datetime.now() < timeout:
-            for _ in range(self.queue_msg_received.qsize()):
-                msg = self.queue_msg_received.get()
-                messages.append(msg)
-                if message_cl_ord_id:
-                    cl_ord_id = (
-                        None if not msg.get("11") else msg.get("11").decode("utf-8")
-                    )
-                    if cl_ord_id == message_cl_ord_id:
-                        return messages
-                elif message_type and msg.get("35").decode("utf-8") in message_type:
+        messages: list[FixMessageView] = []
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return messages
+            try:
+                msg = self.queue_msg_received.get(timeout=remaining)
+            except Empty:
+                return messages
+            messages.append(msg)
+            if message_cl_ord_id:
+                cl_ord_id = None if not msg.get("11") else msg.get("11").decode("utf-8")
+                if cl_ord_id == message_cl_ord_id:
                     return messages
+            elif message_type and msg.get("35").decode("utf-8") in message_type:
+                return messages
+
+    def expect_response(
+        self,
+        *,
+        cl_ord_id: str | None = None,
+        orig_cl_ord_id: str | None = None,
+        md_req_id: str | None = None,
+        instrument_req_id: str | None = None,
+        message_type: str | None = None,
+        timeout: float | None = None,
+    ) -> Future[FixMessageView]:
+        """
+        Return a future completed by the receive thread with the next message matching.
+
+        Call it before sending the request, so the response can not arrive before the
+        future is registered. Exactly one key must be given.
+
+        Args:
+        ----
+            cl_ord_id (str | None, optional): ClOrdID (11) of the message.
+            orig_cl_ord_id (str | None, optional): OrigClOrdID (41) of the message.
+            md_req_id (str | None, optional): MDReqID (262) of the message.
+            instrument_req_id (str | None, optional): InstrumentReqID (320) of the message.
+            message_type (str | None, optional): MsgType (35) of the message.
+            timeout (float | None, optional): Seconds after which the future fails with
+                `TimeoutError`, from the timer wheel. Defaults to None (no timeout).
 
-            time.sleep(0.001)
-        return messages
+        Raises:
+        ------
+            ValueError: Raised when not exactly one key is given
+
+        Returns:
+        -------
+            Future[FixMessageView]: The future, call `result(timeout)` to wait for the message.
+
+        """
+        keys = [
+            (tag, value)
+            for tag, value in (
+                (CorrelationTags.CL_ORD_ID, cl_ord_id),
+                (CorrelationTags.ORIG_CL_ORD_ID, orig_cl_ord_id),
+                (CorrelationTags.MD_REQ_ID, md_req_id),
+                (CorrelationTags.INSTRUMENT_REQ_ID, instrument_req_id),
+                (CorrelationTags.MSG_TYPE, message_type),
+            )
+            if value is not None
+        ]
+        if len(keys) != 1:
+            msg = (
+                "Exactly one of cl_ord_id, orig_cl_ord_id, md_req_id, "
+                "instrument_req_id and message_type must be given"
+            )
+            raise ValueError(msg)
+        return self.correlation.expect(*keys[0], timeout=timeout)
 
     def send_message(self, message: FixMessage, *, raw: bool = False) -> None:
         """
@@ -592,17 +1083,85 @@ class BinanceFixConnector:
         """
         with self.lock:  # save the logon message for future auto_reconnects
             self.messages_sent.append(message)
+            # Decided with the append: a subscription is either replayed by
+            # `start_handoff` or sent to the restart session here, never both.
+            mirror = (
+                self.restart_session
+                if self.handoff is not None
+                and message.message_type == MARKET_DATA_REQUEST
+                else None
+            )
+        if mirror is not None:
+            mirror.send_message(mirror.copy_message(message))
 
         if not self.sock:
             self.logger.error("Error: No connection established. can't send message.")
             return
         try:
-            self.sock.sendall(message.encode(raw))
-            clean_message = message.encode().decode("utf-8").replace(chr(1), "|")
-            self.logger.info("%sClient=>Server: %s%s", BLUE, clean_message, RESET)
+            if self.send_queue is not None:
+                # Encoded, numbered and logged by the writer thread, in the order written.
+                self.send_queue.put(
+                    (message, raw),
+                    message_priority(message.message_type),
+                    order_keys(message),
+                )
+                return
+            data = self.encode_message(message, raw=raw)
+            self._send_data(data)
+            self._record_sent([data])
         except Exception:
             self.logger.exception("Error sending message")
 
+    def _encode_queued(self, item: tuple[FixMessage, bool]) -> bytes:
+        """Assign the pending header fields of a message taken by the writer thread and encode it."""
+        message, raw = item
+        if not raw:
+            self.assign_pending_header(message)
+        return self.encode_message(message, raw=raw)
+
+    def _record_sent(self, frames: list[bytes]) -> None:
+        """Capture and log the frames written to the connection."""
+        if self.wire_capture is not None:
+            for data in frames:
+                self.wire_capture.record(OUTBOUND, data, self.session_id)
+        if self.wire_logger.isEnabledFor(logging.INFO):
+            for data in frames:
+                self.wire_logger.info(
+                    "%sClient=>Server: %s%s", BLUE, WireFrame(data), RESET
+                )
+
+    def _send_data(self, data: bytes) -> None:
+        """Write encoded messages to the connection."""
+        self.last_sent = time.monotonic()
+        if self.reactor is not None:
+            self.reactor.send(self, data)
+        else:
+            self.sock.sendall(data)
+
+    def encode_message(self, message: FixMessage, *, raw: bool = False) -> bytes:
+        """
+        Return the message in on-the-wire FIX format.
+
+        Messages created with `create_fix_message_with_basic_header` are encoded from
+        their header template: only MsgSeqNum (34), SendingTime (52) and the body are
+        encoded, BodyLength (9) and Checksum (10) are computed from the precomputed
+        header length and byte sum.
+
+        Args:
+        ----
+            message (FixMessage): The message
+            raw (bool, optional): If True, encode pairs exactly as provided.
+
+        Returns:
+        -------
+            bytes: The encoded message.
+
+        """
+        template = getattr(message, "header_template", None)
+        if raw or template is None:
+            return message.encode(raw)
+        return template.encode(message)
+
     def create_fix_message_with_basic_header(
         self,
         msg_type: str,
@@ -618,20 +1177,48 @@ class BinanceFixConnector:
 
         Returns:
         -------
-            FixMessage: the fix message ready to be filled with the body tags
+            FixMessage: the fix message ready to be filled with the body tags. The header is
+            copied from a template cached by msg type and recv window.
 
         """
-        msg = FixMessage()
+        template = self.header_templates.get((msg_type, recv_window))
+        if template is None:
+            template = HeaderTemplate(
+                self.fix_version,
+                msg_type,
+                self.sender_comp_id,
+                self.target_comp_id,
+                recv_window,
+            )
+            self.header_templates[(msg_type, recv_window)] = template
+        if self.send_queue is not None:
+            # Assigned when the writer thread takes the message, see `assign_pending_header`.
+            return template.create_message(PENDING_MSG_SEQ_NUM, self.current_utc_time())
+        return template.create_message(self.get_next_seq_num(), self.current_utc_time())
 
-        msg.append_pair(FixTags.BEGIN_STRING, self.fix_version, header=True)
-        msg.append_pair(FixTags.MSG_TYPE, msg_type, header=True)
-        msg.append_pair(FixTags.SENDER_COMP_ID, self.sender_comp_id, header=True)
-        msg.append_pair(FixTags.TARGET_COMP_ID, self.target_comp_id, header=True)
-        msg.append_pair(FixTags.MSG_SEQ_NUM, self.get_next_seq_num(), header=True)
-        msg.append_pair(FixTags.SENDING_TIME, self.current_utc_time(), header=True)
-        msg.append_pair(FixTags.RECV_WINDOW, recv_window, header=True)
+    def assign_pending_header(self, message: FixMessage) -> None:
+        """
+        Assign MsgSeqNum (34) and SendingTime (52) to a message created with a pending MsgSeqNum.
 
-        return msg
+        With a send queue, `create_fix_message_with_basic_header` leaves MsgSeqNum at
+        "0": the writer thread assigns the next sequence number (and the current time)
+        when it takes the message, so the sequence numbers follow the order the
+        messages are written in. Messages already numbered are left as they are.
+
+        Args:
+        ----
+            message (FixMessage): The message.
+
+        """
+        pairs = message.pairs
+        for i in range(min(message.header_index, len(pairs))):
+            tag, value = pairs[i]
+            if tag == b"34":
+                if value != PENDING_MSG_SEQ_NUM_BYTES:
+                    return
+                pairs[i] = (tag, self.get_next_seq_num().encode("ASCII"))
+            elif tag == b"52":
+                pairs[i] = (tag, self.current_utc_time().encode("ASCII"))
 
     def logon(
         self,
@@ -654,6 +1241,8 @@ class BinanceFixConnector:
             msg = self.create_fix_message_with_basic_header(
                 FixMsgTypes.LOGON, recv_window
             )
+            # The signature covers MsgSeqNum (34) and SendingTime (52).
+            self.assign_pending_header(msg)
             signature = self.generate_signature(
                 self.sender_comp_id,
                 self.target_comp_id,
@@ -736,19 +1325,107 @@ class BinanceFixConnector:
     def disconnect(self) -> None:
         """Stop the connection with the server by shuting down the socket connection."""
         self.is_connected = False
+        if self.liveness_timer is not None:
+            self.liveness_timer.cancel()
+            self.liveness_timer = None
+        if self.send_queue is not None:
+            self.send_queue.stop()
         if self.sock:
+            self.tls_cache.save_session(self.endpoint, self.sock)
+            if self.reactor is not None:
+                self.reactor.unregister(self)
             with contextlib.suppress(OSError):
                 self.sock.shutdown(socket.SHUT_RDWR)
             self.sock.close()
 
+    def start_liveness(self) -> None:
+        """
+        Start the heartbeats and the liveness checks of the connection.
+
+        A Heartbeat is sent when nothing was sent for `heart_bt_int` seconds (the
+        reactor sends them for its sessions), a TestRequest when nothing was received
+        for `heart_bt_int` seconds plus an allowance, and the session is disconnected
+        when the TestRequest got no answer in the same delay. The deadlines are kept in
+        the timer wheel shared by the sessions, and the checks run on the worker
+        threads of the scheduler, so a send or disconnect blocking on a socket never
+        delays the timers of the other sessions. A `heart_bt_int` of 0 disables the
+        checks.
+        """
+        if self.liveness_timer is not None:
+            self.liveness_timer.cancel()
+            self.liveness_timer = None
+        interval = int(self.heart_bt_int or 0)
+        if interval <= 0:
+            return
+        self.last_sent = self.last_received = time.monotonic()
+        self.test_request_id = None
+        self.liveness_timer = self._call_liveness_later(interval)
+
+    def _call_liveness_later(self, delay: float) -> TimerHandle:
+        """Run `_check_liveness` on a worker thread of the scheduler in `delay` seconds."""
+        return self.scheduler.call_later(delay, self._check_liveness)
+
+    def _check_liveness(self) -> None:
+        """Send the Heartbeat or TestRequest due, or disconnect a silent server."""
+        if not self.is_connected:
+            return
+        interval = int(self.heart_bt_int)
+        timeout = interval * (1 + HEARTBEAT_ALLOWANCE)
+        now = time.monotonic()
+        if now - self.last_received < timeout:
+            self.test_request_id = None
+        elif self.test_request_id is None:
+            self.test_request_id = f"TEST{next(self.test_request_ids)}"
+            self.test_request_time = now
+            self.logger.warning(
+                "Nothing received for %.1f seconds, sending TestRequest %s",
+                now - self.last_received,
+                self.test_request_id,
+            )
+            self.test_request(self.test_request_id)
+        elif now - self.test_request_time >= timeout:
+            self.logger.error(
+                "No answer to TestRequest %s, closing the connection",
+                self.test_request_id,
+            )
+            self.disconnect()
+            return
+        if self.reactor is None and time.monotonic() - self.last_sent >= interval:
+            self.heartbeat()
+
+        if self.test_request_id is None:
+            deadline = self.last_received + timeout
+        else:
+            deadline = self.test_request_time + timeout
+        if self.reactor is None:
+            deadline = min(deadline, self.last_sent + interval)
+        self.liveness_timer = self._call_liveness_later(
+            max(deadline - time.monotonic(), 0)
+        )
+
     def schedule_restart(self) -> None:
-        """Schedule the session restart in 10 minutes."""
+        """
+        Schedule the session restart in 10 minutes.
+
+        The restart session is connected and logged on by the scheduler, so the receive
+        thread keeps reading meanwhile, and the restart is performed by the scheduler
+        (or the reactor) when the delay expires.
+        """
         if not self.restart_flag:
             self.restart_flag = True
             self.restart_time = datetime.now() + timedelta(minutes=10)
             self.logger.info(f"Session restart scheduled for {self.restart_time}")
 
-            self.restart_session = _create_session(
+            if self.reactor is not None:
+                self.restart_timer = self.reactor.call_later(10 * 60, self._restart)
+            else:
+                self.restart_timer = self.scheduler.call_later(10 * 60, self._restart)
+            self.restart_future = self.scheduler.submit(self._create_restart_session)
+
+    def _create_restart_session(self) -> BinanceFixConnector:
+        """Connect and logon the session taking over at the restart."""
+        try:
+            restart_session = _create_session(
                 api_key=self.api_key,
                 private_key=self.private_key,
                 endpoint=self.endpoint,
@@ -756,52 +1433,120 @@ class BinanceFixConnector:
                 target_comp_id=self.target_comp_id,
                 fix_version=self.fix_version,
                 socket_buffer_size=self.socket_buffer_size,
+                max_buffer_size=self.max_buffer_size,
                 heart_bt_int=self.heart_bt_int,
                 reset_seq_num_flag=self.reset_seq_num_flag,
                 encrypt_method=self.encrypt_method,
                 message_handling=self.message_handling,
                 response_mode=self.response_mode,
                 drop_copy_flag=self.drop_copy_flag,
+                wire_capture=self.wire_capture,
+                queue_messages=self.queue_messages,
+                reactor=self.reactor,
+                send_queue=self.send_queue is not None,
+                socket_profile=self.socket_profile,
+                tls_cache=self.tls_cache,
+                scheduler=self.scheduler,
+                shared_with=self,
             )
+        except Exception:
+            self.logger.exception("Error creating the restart session")
+            self.restart_flag = False
+            self.restart_time = None
+            if self.restart_timer is not None:
+                self.restart_timer.cancel()
+            raise
+        self.restart_session = restart_session
+        self.start_handoff(restart_session)
+        return restart_session
 
-            if self.restart_timer is None or not self.restart_timer.is_alive():
-                self.restart_timer = threading.Thread(
-                    target=self._restart_timer_thread, daemon=True
-                )
-                self.restart_timer.start()
+    def start_handoff(self, restart_session: BinanceFixConnector) -> None:
+        """
+        Subscribe the restart session to the market data streams of the session.
+
+        Until the restart, both sessions receive the streams: the messages received
+        twice are dropped, so the subscribers see a single stream without gap. The
+        MarketDataRequests (V) sent by the session meanwhile are also sent by the
+        restart session.
+
+        Args:
+        ----
+            restart_session (BinanceFixConnector): The session taking over at the restart.
 
-    def _restart_timer_thread(self) -> None:
-        """Thread that waits until restart time and then performs the restart."""
-        while self.restart_flag and datetime.now() < self.restart_time:
-            time.sleep(1)
+        """
+        with self.lock:
+            self.handoff = restart_session.handoff = HandoffDeduplicator()
+            # Sent under the lock, so the (un)subscriptions sent meanwhile, copied
+            # to the restart session by `send_message`, follow them.
+            for subscription in active_subscriptions(self.messages_sent):
+                restart_session.send_message(restart_session.copy_message(subscription))
+
+    def copy_message(
+        self, message: FixMessage, overrides: dict[bytes, bytes] | None = None
+    ) -> FixMessage:
+        """
+        Return a copy of a message, with the header of this session.
+
+        Args:
+        ----
+            message (FixMessage): A message, usually sent by another session.
+            overrides (dict[bytes, bytes] | None, optional): New values of some tags of the body.
+                Defaults to None.
 
+        Returns:
+        -------
+            FixMessage: The copy, with the next MsgSeqNum (34) of this session.
+
+        """
+        copy = self.create_fix_message_with_basic_header(
+            message.message_type.decode("utf-8")
+        )
+        for tag, value in message.pairs:
+            if tag not in HEADER_TAGS:
+                if overrides is not None:
+                    value = overrides.get(tag, value)
+                copy.append_pair(tag, value)
+        return copy
+
+    def _restart(self) -> None:
+        """Perform the scheduled restart."""
         if self.restart_flag:
             self.logger.info("Performing scheduled restart...")
             self.reconnect()
 
     def reconnect(self) -> None:
-        """Perform the actual reconnection to the new session."""
+        """
+        Switch to the restart session, already connected and logged on.
+
+        The messages received by the session before the switch stay in the queue
+        shared with the restart session, which has been receiving the same streams
+        since `start_handoff`: no message is lost or delivered twice.
+        """
         if not self.restart_flag or not self.restart_session:
             self.logger.warning("No restart scheduled or restart session not created")
             return
 
         try:
             self.logger.info("Disconnecting current session...")
+            receive_thread = self.receive_thread
             self.disconnect()
-
-            time.sleep(1)
-
-            self.logger.info("Connecting to new session...")
-            self.restart_session.connect()
-            self.sock = self.restart_session.sock
-            self.ssl_sock = self.restart_session.ssl_sock
-            self.receive_thread = self.restart_session.receive_thread
-            self.is_connected = self.restart_session.is_connected
-            self.msg_seq_num = self.restart_session.msg_seq_num
-            self.queue_msg_received = self.restart_session.queue_msg_received
-            self.messages_sent = self.restart_session.messages_sent
-
-            self.__dict__.update(self.restart_session.__dict__)
+            if (
+                receive_thread is not None
+                and receive_thread is not threading.current_thread()
+            ):
+                # Done with the messages of the old connection before switching.
+                receive_thread.join(RECEIVE_THREAD_JOIN_TIMEOUT)
+
+            self.logger.info("Switching to the new session...")
+            restart_session = self.restart_session
+            self.__dict__.update(restart_session.__dict__)
+            # The receive thread (or reactor channel) of the restart session keeps
+            # running: share the state so both objects are the same session.
+            restart_session.__dict__ = self.__dict__
+            self.handoff = None
+            self.standby = False
+            if self.reactor is not None:
+                self.reactor.register(self)
 
             self.logger.info("Restart completed successfully")
             self.restart_flag = False
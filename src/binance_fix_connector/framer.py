@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import socket
+
+SOH = b"\x01"
+BEGIN_STRING_PREFIX = b"8="
+BODY_LENGTH_PREFIX = b"9="
+CHECKSUM_PREFIX = b"10="
+TRAILER_SIZE = 7  # 10=NNN<SOH>
+INITIAL_BUFFER_SIZE = 4096
+MAX_RECEIVE_BUFFER_SIZE = 16 * 1024 * 1024
+
+
+class FixFramer:
+    """
+    Split a stream of bytes into complete FIX frames.
+
+    Frame boundaries are computed from BodyLength (9), so the bytes of a frame are
+    never decoded nor split on SOH to find where it ends. The data is read straight
+    into a preallocated buffer with `recv_into`; incomplete data stays in place until
+    the rest of the frame is received. The buffer is compacted only when the free
+    space at its end is not enough for the next read, and grows (up to `max_size`)
+    when a frame does not fit in it.
+    """
+
+    def __init__(
+        self,
+        initial_size: int = INITIAL_BUFFER_SIZE,
+        max_size: int = MAX_RECEIVE_BUFFER_SIZE,
+    ) -> None:
+        """
+        Create a framer.
+
+        Args:
+        ----
+            initial_size (int, optional): The initial size of the receive buffer. Defaults to 4096.
+            max_size (int, optional): The maximum size the receive buffer can grow to. Defaults to 16MiB.
+
+        Raises:
+        ------
+            ValueError: Raised when the sizes are not valid
+
+        """
+        if initial_size <= 0 or max_size < initial_size:
+            msg = "initial_size must be positive and not greater than max_size"
+            raise ValueError(msg)
+        self.buffer: bytearray = bytearray(initial_size)
+        self.max_size: int = max_size
+        self.min_read_size: int = max(1, initial_size // 4)
+        self._start: int = 0
+        self._end: int = 0
+        # Bytes of the incomplete frame at `_start` already scanned for its trailer.
+        self._trailer_scanned: int = 0
+
+        self.reads: int = 0
+        self.frames_count: int = 0
+        self.bytes_received: int = 0
+        self.bytes_copied: int = 0
+        self.compactions: int = 0
+        self.grows: int = 0
+        self.body_length_mismatches: int = 0
+        self.discarded_bytes: int = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def pending(self) -> bytes:
+        """Return a copy of the data waiting for the rest of its frame."""
+        return bytes(self.buffer[self._start : self._end])
+
+    def recv_into(self, sock: socket.socket) -> int:
+        """
+        Read from the socket straight into the free space of the buffer.
+
+        Args:
+        ----
+            sock (socket.socket): The socket to read from.
+
+        Returns:
+        -------
+            int: The number of bytes read, 0 when the connection was closed.
+
+        """
+        self._reserve(self.min_read_size)
+        with memoryview(self.buffer) as view:
+            size = sock.recv_into(view[self._end :])
+        self._commit(size)
+        return size
+
+    def feed(self, data: bytes) -> None:
+        """
+        Append data to the buffer, for callers that do not read from a socket.
+
+        Args:
+        ----
+            data (bytes): The raw bytes received.
+
+        """
+        size = len(data)
+        self._reserve(size)
+        if len(self.buffer) - self._end < size:
+            msg = (
+                f"FIX frame larger than the maximum buffer size ({self.max_size} bytes)"
+            )
+            raise BufferError(msg)
+        self.buffer[self._end : self._end + size] = data
+        self._commit(size)
+
+    def frames(self) -> list[bytes]:
+        """
+        Return every complete frame available in the buffer.
+
+        Returns
+        -------
+            list[bytes]: The complete frames, each one including header and trailer.
+
+        """
+        buf = self.buffer
+        end = self._end
+        pos = self._start
+        frames: list[bytes] = []
+        with memoryview(buf) as view:
+            while pos < end:
+                if buf.startswith(BEGIN_STRING_PREFIX, pos, end):
+                    frame_end = self._frame_end(buf, pos, end)
+                    if frame_end < 0:
+                        break
+                    frames.append(bytes(view[pos:frame_end]))
+                    pos = frame_end
+                    self._trailer_scanned = 0
+                    continue
+                # Garbage before the BeginString, resync on the next frame.
+                start = buf.find(SOH + BEGIN_STRING_PREFIX, pos, end)
+                new_pos = end - 1 if start < 0 else start + 1
+                self.discarded_bytes += new_pos - pos
+                pos = new_pos
+                self._trailer_scanned = 0
+                if start < 0:
+                    break
+        self.frames_count += len(frames)
+        if pos == end:
+            self._start = self._end = 0
+        else:
+            self._start = pos
+        return frames
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Return the counters of the receive path.
+
+        Returns
+        -------
+            dict[str, int | float]: reads, frames, reads per frame, bytes received, bytes copied
+            by compactions and grows, and the current buffer size.
+
+        """
+        return {
+            "reads": self.reads,
+            "frames": self.frames_count,
+            "reads_per_frame": (
+                self.reads / self.frames_count if self.frames_count else 0.0
+            ),
+            "bytes_received": self.bytes_received,
+            "bytes_copied": self.bytes_copied,
+            "compactions": self.compactions,
+            "grows": self.grows,
+            "buffer_size": len(self.buffer),
+            "body_length_mismatches": self.body_length_mismatches,
+            "discarded_bytes": self.discarded_bytes,
+        }
+
+    def _commit(self, size: int) -> None:
+        """Account for `size` bytes written at the end of the buffer."""
+        if size <= 0:
+            return
+        free = len(self.buffer) - self._end
+        self._end += size
+        self.reads += 1
+        self.bytes_received += size
+        # The read filled all the free space: more data is likely waiting, so
+        # the next reserve grows the buffer instead of doing small reads.
+        if size == free >= self.min_read_size:
+            self.min_read_size = min(self.min_read_size * 2, self.max_size // 2)
+
+    def _reserve(self, size: int) -> None:
+        """Make sure there are (up to `max_size`) `size` free bytes at the end of the buffer."""
+        capacity = len(self.buffer)
+        if capacity - self._end >= size:
+            return
+        used = self._end - self._start
+        size = min(size, self.max_size - used)
+        if size <= 0:
+            msg = (
+                f"FIX frame larger than the maximum buffer size ({self.max_size} bytes)"
+            )
+            raise BufferError(msg)
+        if self._start:
+            self._compact()
+            if capacity - used >= size:
+                return
+        new_capacity = capacity
+        while new_capacity < used + size:
+            new_capacity *= 2
+        new_capacity = min(new_capacity, self.max_size)
+        self.buffer.extend(bytes(new_capacity - capacity))
+        self.bytes_copied += used
+        self.grows += 1
+
+    def _compact(self) -> None:
+        """Move the pending data to the beginning of the buffer."""
+        used = self._end - self._start
+        self.buffer[:used] = self.buffer[self._start : self._end]
+        self._start = 0
+        self._end = used
+        self.bytes_copied += used
+        self.compactions += 1
+
+    def _frame_end(self, buf: bytearray, pos: int, end: int) -> int:
+        """Return the offset right after the frame starting at `pos`, -1 if it is incomplete."""
+        begin_string_end = buf.find(SOH, pos, end)
+        if begin_string_end < 0:
+            return -1
+        body_length_start = begin_string_end + 1
+        if end - body_length_start < len(BODY_LENGTH_PREFIX):
+            return -1
+        if not buf.startswith(BODY_LENGTH_PREFIX, body_length_start, end):
+            return self._scan_trailer(buf, body_length_start, end)
+        body_length_end = buf.find(SOH, body_length_start, end)
+        if body_length_end < 0:
+            return -1
+        try:
+            body_length = int(buf[body_length_start + 2 : body_length_end])
+        except ValueError:
+            return self._scan_trailer(buf, body_length_end, end)
+
+        checksum_start = body_length_end + 1 + body_length
+        frame_end = checksum_start + TRAILER_SIZE
+        if frame_end > end:
+            # Make sure a wrong BodyLength does not block the stream forever. Only the
+            # data received since the last call is scanned (plus the bytes of a trailer
+            # cut by the read), so a large frame received in many reads is scanned once.
+            scan_start = max(body_length_end, pos + self._trailer_scanned)
+            trailer = self._scan_trailer(buf, scan_start, end)
+            if trailer < 0:
+                self._trailer_scanned = max(end - TRAILER_SIZE - pos, 0)
+                return -1
+            self.body_length_mismatches += 1
+            return trailer
+        if (
+            buf.startswith(CHECKSUM_PREFIX, checksum_start, end)
+            and buf[frame_end - 1] == SOH[0]
+        ):
+            return frame_end
+        self.body_length_mismatches += 1
+        return self._scan_trailer(buf, body_length_end, end)
+
+    @staticmethod
+    def _scan_trailer(buf: bytearray, pos: int, end: int) -> int:
+        """Find the end of the frame looking for the CheckSum (10) field."""
+        checksum_start = buf.find(SOH + CHECKSUM_PREFIX, pos - 1, end)
+        if checksum_start < 0:
+            return -1
+        checksum_end = buf.find(SOH, checksum_start + 1, end)
+        if checksum_end < 0:
+            return -1
+        return checksum_end + 1
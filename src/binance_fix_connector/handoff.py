@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import TYPE_CHECKING
+
+from binance_fix_connector.message import SOH, FixMessageView
+
+if TYPE_CHECKING:
+    from simplefix import FixMessage
+
+EXECUTION_REPORT = b"8"
+INCREMENTAL_REFRESH = b"X"
+MARKET_DATA_REQUEST = b"V"
+SUBSCRIBE = b"1"
+UNSUBSCRIBE = b"2"
+
+MD_REQ_ID = b"262"
+SUBSCRIPTION_REQUEST_TYPE = b"263"
+SYMBOL = b"55"
+EXEC_ID = b"17"
+NO_MD_ENTRIES = b"268"
+TRADE_ID = b"1003"
+FIRST_BOOK_UPDATE_ID = b"25043"
+LAST_BOOK_UPDATE_ID = b"25044"
+# Sent on the first entry they apply to only, the following entries inherit them.
+INHERITED_TAGS = (SYMBOL, FIRST_BOOK_UPDATE_ID, LAST_BOOK_UPDATE_ID)
+
+# Heartbeat, TestRequest, ResendRequest, Reject, SequenceReset, Logout, Logon and
+# MarketDataRequestReject: about the connection of the restart session (its Logon,
+# the rejects of the subscriptions it sends again...), not delivered to the user.
+STANDBY_SESSION_MESSAGE_TYPES = frozenset(
+    (b"0", b"1", b"2", b"3", b"4", b"5", b"A", b"Y")
+)
+
+# Set from the session sending the message, not copied when it is sent again.
+HEADER_TAGS = frozenset(
+    (b"8", b"9", b"10", b"34", b"35", b"49", b"52", b"56", b"25000")
+)
+
+DEFAULT_CAPACITY = 65536
+
+
+def message_key(message: FixMessageView) -> tuple | None:
+    """
+    Return what identifies a message received on both sessions of a handoff.
+
+    ExecutionReports (8) are identified by their ExecID (17), market data messages by
+    their MDReqID (262), symbols and TradeID (1003) / LastBookUpdateID (25044).
+
+    Args:
+    ----
+        message (FixMessageView): A message received.
+
+    Returns:
+    -------
+        tuple | None: The key, None if the message can not be identified (it is never a duplicate).
+
+    """
+    msg_type = message.message_type
+    if msg_type == EXECUTION_REPORT:
+        exec_id = message.get(EXEC_ID)
+        return None if exec_id is None else (msg_type, exec_id)
+    md_req_id = message.get(MD_REQ_ID)
+    if md_req_id is None:
+        return None
+    trade_ids = tuple(message.get_all(TRADE_ID))
+    book_update_ids = tuple(message.get_all(LAST_BOOK_UPDATE_ID))
+    if not trade_ids and not book_update_ids:
+        return None
+    symbols = tuple(message.get_all(SYMBOL))
+    return (msg_type, md_req_id, symbols, trade_ids, book_update_ids)
+
+
+def _tag_of(field: bytes) -> bytes:
+    return field.partition(b"=")[0]
+
+
+def _split_entries(frame: bytes) -> tuple[bytes, list[list[bytes]]] | None:
+    """Return the fields before NoMDEntries (268) and the fields of each entry."""
+    group_start = frame.find(SOH + NO_MD_ENTRIES + b"=")
+    if group_start < 0:
+        return None
+    fields = frame[group_start + 1 :].split(SOH)[1:-1]
+    if fields and fields[-1].startswith(b"10="):
+        fields.pop()
+    if not fields:
+        return None
+    delimiter = _tag_of(fields[0])
+    entries: list[list[bytes]] = []
+    for field in fields:
+        if _tag_of(field) == delimiter:
+            entries.append([])
+        entries[-1].append(field)
+    return frame[: group_start + 1], entries
+
+
+def _encode_frame(head: bytes, entries: list[list[bytes]]) -> bytes:
+    """Return the frame of the fields before the group and the entries, with BodyLength and CheckSum."""
+    begin_string_end = head.index(SOH) + 1
+    body_start = head.index(SOH, begin_string_end) + 1
+    body = head[body_start:] + NO_MD_ENTRIES + b"=%d" % len(entries) + SOH
+    body += b"".join(field + SOH for entry in entries for field in entry)
+    frame = head[:begin_string_end] + b"9=%d" % len(body) + SOH + body
+    return frame + b"10=%03d" % (sum(frame) % 256) + SOH
+
+
+class HandoffDeduplicator:
+    """
+    Drop the messages received twice while two sessions consume the same streams.
+
+    During a restart, the restart session subscribes to the market data streams of
+    the session it replaces, and both deliver their messages to the same queue and
+    handlers until the switch. The first copy received is delivered, whichever
+    session received it, the others are dropped.
+
+    The two connections may not batch the same trades and book updates in their
+    MarketDataIncrementalRefresh (X) messages: these are compared entry by entry, by
+    MDReqID (262), Symbol (55) and TradeID (1003), or LastBookUpdateID (25044) for the
+    entries of a book update. The entries already received are removed from the
+    message, which is dropped when none is left. The other messages are identified as
+    a whole with `message_key`. The entries and messages without these ids can not be
+    told apart from a new one and are always delivered. The keys of the last
+    `capacity` messages and entries are kept, and the messages and entries dropped are
+    counted in `duplicates`.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity: int = capacity
+        self.duplicates: int = 0
+        self._lock = threading.Lock()
+        self._seen: set[tuple] = set()
+        self._order: deque[tuple] = deque()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def seen(self, message: FixMessageView) -> bool:
+        """
+        Record a message, return True if it was already received in full.
+
+        Args:
+        ----
+            message (FixMessageView): A message received by one of the sessions.
+
+        Returns:
+        -------
+            bool: True if the message is a duplicate.
+
+        """
+        return self.deduplicate(message) is None
+
+    def deduplicate(self, message: FixMessageView) -> FixMessageView | None:
+        """
+        Record a message, return what was not received yet.
+
+        Args:
+        ----
+            message (FixMessageView): A message received by one of the sessions.
+
+        Returns:
+        -------
+            FixMessageView | None: The message, the message without the entries already
+                received, or None if it is a duplicate.
+
+        """
+        if message.message_type == INCREMENTAL_REFRESH:
+            md_req_id = message.get(MD_REQ_ID)
+            split = None if md_req_id is None else _split_entries(message.frame)
+            if split is not None:
+                return self._deduplicate_entries(message, md_req_id, *split)
+        key = message_key(message)
+        if key is None:
+            return message
+        with self._lock:
+            if key in self._seen:
+                self.duplicates += 1
+                return None
+            self._add(key)
+        return message
+
+    def filter(self, messages: list[FixMessageView]) -> list[FixMessageView]:
+        """Return the messages, without the messages and entries already received."""
+        filtered = []
+        for message in messages:
+            message = self.deduplicate(message)
+            if message is not None:
+                filtered.append(message)
+        return filtered
+
+    def _deduplicate_entries(
+        self,
+        message: FixMessageView,
+        md_req_id: bytes,
+        head: bytes,
+        entries: list[list[bytes]],
+    ) -> FixMessageView | None:
+        symbol = last_book_id = None
+        for field in head.split(SOH):
+            tag = _tag_of(field)
+            if tag == SYMBOL:
+                symbol = field[len(SYMBOL) + 1 :]
+            elif tag == LAST_BOOK_UPDATE_ID:
+                last_book_id = field[len(LAST_BOOK_UPDATE_ID) + 1 :]
+        keys = []
+        for entry in entries:
+            trade_id = None
+            for field in entry:
+                tag = _tag_of(field)
+                if tag == SYMBOL:
+                    symbol = field[len(SYMBOL) + 1 :]
+                elif tag == TRADE_ID:
+                    trade_id = field[len(TRADE_ID) + 1 :]
+                elif tag == LAST_BOOK_UPDATE_ID:
+                    last_book_id = field[len(LAST_BOOK_UPDATE_ID) + 1 :]
+            if trade_id is not None:
+                keys.append((md_req_id, symbol, TRADE_ID, trade_id))
+            elif last_book_id is not None:
+                # All the entries of a book update are kept or dropped together.
+                keys.append((md_req_id, symbol, LAST_BOOK_UPDATE_ID, last_book_id))
+            else:
+                keys.append(None)
+
+        with self._lock:
+            new_keys = {key for key in keys if key is not None} - self._seen
+            kept = [key is None or key in new_keys for key in keys]
+            for key in dict.fromkeys(key for key in keys if key in new_keys):
+                self._add(key)
+            self.duplicates += kept.count(False)
+        if all(kept):
+            return message
+        if not any(kept):
+            return None
+
+        kept_entries = []
+        inherited: dict[bytes, bytes] = {}
+        dropped_before = False
+        for entry, keep in zip(entries, kept):
+            if keep and dropped_before:
+                # The fields inherited from a dropped entry are sent again.
+                tags = {_tag_of(field) for field in entry}
+                entry = (
+                    entry[:1]
+                    + [
+                        inherited[tag]
+                        for tag in INHERITED_TAGS
+                        if tag in inherited and tag not in tags
+                    ]
+                    + entry[1:]
+                )
+            for field in entry:
+                tag = _tag_of(field)
+                if tag in INHERITED_TAGS:
+                    inherited[tag] = field
+            if keep:
+                kept_entries.append(entry)
+            dropped_before = not keep
+        return FixMessageView(_encode_frame(head, kept_entries))
+
+    def _add(self, key: tuple) -> None:
+        self._seen.add(key)
+        self._order.append(key)
+        if len(self._order) > self.capacity:
+            self._seen.discard(self._order.popleft())
+
+
+def active_subscriptions(messages_sent: list[FixMessage]) -> list[FixMessage]:
+    """
+    Return the MarketDataRequests (V) subscribing to the streams still subscribed.
+
+    Args:
+    ----
+        messages_sent (list[FixMessage]): The messages sent by a session.
+
+    Returns:
+    -------
+        list[FixMessage]: The subscriptions, in the order they were sent.
+
+    """
+    subscriptions: dict[bytes, FixMessage] = {}
+    for message in messages_sent:
+        if message.message_type != MARKET_DATA_REQUEST:
+            continue
+        md_req_id = message.get(MD_REQ_ID)
+        request_type = message.get(SUBSCRIPTION_REQUEST_TYPE)
+        if request_type == SUBSCRIBE:
+            subscriptions[md_req_id] = message
+        elif request_type == UNSUBSCRIBE:
+            subscriptions.pop(md_req_id, None)
+    return list(subscriptions.values())
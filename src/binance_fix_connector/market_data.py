@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import calendar
+from array import array
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from simplefix import FixMessage
+
+    from binance_fix_connector.message import FixMessageView
+
+SOH = b"\x01"
+NAN = float("nan")
+MISSING_ID = -1
+MISSING_ENUM = -1
+MISSING_FIXED = -1
+_NUMPY_TYPES = {"b": "i1", "d": "f8", "q": "i8"}
+
+
+class MDTags:
+    MD_REQ_ID = b"262"
+    NO_MD_ENTRIES = b"268"
+    MD_UPDATE_ACTION = b"279"
+    MD_ENTRY_TYPE = b"269"
+    MD_ENTRY_PX = b"270"
+    MD_ENTRY_SIZE = b"271"
+    SYMBOL = b"55"
+    NO_RELATED_SYM = b"146"
+    MIN_PRICE_INCREMENT = b"969"
+    MIN_QTY_INCREMENT = b"25039"
+    TRADE_ID = b"1003"
+    TRANSACT_TIME = b"60"
+    AGGRESSOR_SIDE = b"2446"
+    FIRST_BOOK_UPDATE_ID = b"25043"
+    LAST_BOOK_UPDATE_ID = b"25044"
+    CHECKSUM = b"10"
+
+
+class MDUpdateAction:
+    NEW = 0
+    CHANGE = 1
+    DELETE = 2
+
+
+class MDEntryType:
+    BID = 0
+    OFFER = 1
+    TRADE = 2
+
+
+class AggressorSide:
+    BUY = 1
+    SELL = 2
+
+
+@lru_cache(maxsize=8)
+def _day_start_us(date: bytes) -> int:
+    """Return the microseconds since the epoch of a YYYYmmdd UTC date."""
+    day = calendar.timegm((int(date[:4]), int(date[4:6]), int(date[6:8]), 0, 0, 0))
+    return day * 1_000_000
+
+
+def parse_utc_timestamp(value: bytes | str) -> int:
+    """
+    Parse a UTCTimestamp (e.g. TransactTime 60) into microseconds since the epoch.
+
+    Args:
+    ----
+        value (bytes | str): The timestamp, YYYYmmdd-HH:MM:SS with up to 9 decimals.
+
+    Returns:
+    -------
+        int: The microseconds since the epoch, the decimals after the microseconds are dropped.
+
+    """
+    if isinstance(value, str):
+        value = value.encode("ASCII")
+    seconds = int(value[9:11]) * 3600 + int(value[12:14]) * 60 + int(value[15:17])
+    fraction = value[18:24]
+    microseconds = int(fraction) * 10 ** (6 - len(fraction)) if fraction else 0
+    return _day_start_us(value[:8]) + seconds * 1_000_000 + microseconds
+
+
+# tag -> (column, array typecode, converter, missing value)
+_NUMERIC_COLUMNS: dict[bytes, tuple[str, str, Callable, int | float]] = {
+    MDTags.MD_UPDATE_ACTION: ("action", "b", int, MISSING_ENUM),
+    MDTags.MD_ENTRY_TYPE: ("side", "b", int, MISSING_ENUM),
+    MDTags.MD_ENTRY_PX: ("price", "d", float, NAN),
+    MDTags.MD_ENTRY_SIZE: ("qty", "d", float, NAN),
+    MDTags.TRADE_ID: ("trade_id", "q", int, MISSING_ID),
+    MDTags.FIRST_BOOK_UPDATE_ID: ("first_book_id", "q", int, MISSING_ID),
+    MDTags.LAST_BOOK_UPDATE_ID: ("last_book_id", "q", int, MISSING_ID),
+    MDTags.TRANSACT_TIME: ("transact_time", "q", parse_utc_timestamp, MISSING_ID),
+    MDTags.AGGRESSOR_SIDE: ("aggressor_side", "b", int, MISSING_ENUM),
+}
+# Fields Binance only sends on the first entry they apply to, the following
+# entries inherit them.
+_INHERITED_TAGS = (
+    MDTags.SYMBOL,
+    MDTags.FIRST_BOOK_UPDATE_ID,
+    MDTags.LAST_BOOK_UPDATE_ID,
+)
+
+
+def decimals_of(increment: bytes | str) -> int:
+    """
+    Return the number of decimals of a tick or step size.
+
+    Args:
+    ----
+        increment (bytes | str): The increment, e.g. b"0.01000000".
+
+    Returns:
+    -------
+        int: The decimals required to represent multiples of the increment, e.g. 2.
+
+    """
+    if isinstance(increment, str):
+        increment = increment.encode("ASCII")
+    _, _, fraction = increment.partition(b".")
+    return len(fraction.rstrip(b"0"))
+
+
+def parse_fixed(value: bytes | str, decimals: int) -> int:
+    """
+    Parse a decimal value into a fixed-point integer with `decimals` decimals.
+
+    Args:
+    ----
+        value (bytes | str): The value, e.g. b"638.54000000".
+        decimals (int): The decimals of the fixed-point representation, e.g. 2.
+
+    Raises:
+    ------
+        ValueError: When the value has more significant decimals than `decimals`.
+
+    Returns:
+    -------
+        int: The fixed-point value, e.g. 63854.
+
+    """
+    if isinstance(value, str):
+        value = value.encode("ASCII")
+    integer, _, fraction = value.partition(b".")
+    size = len(fraction)
+    if size > decimals:
+        if fraction[decimals:].strip(b"0"):
+            msg = f"{value!r} has more than {decimals} decimals"
+            raise ValueError(msg)
+        fraction = fraction[:decimals]
+    elif size < decimals:
+        fraction += b"0" * (decimals - size)
+    return int(integer + fraction)
+
+
+def format_fixed(value: int, decimals: int) -> str:
+    """Return the decimal string of a fixed-point integer."""
+    if not decimals:
+        return str(value)
+    sign = "-" if value < 0 else ""
+    integer, fraction = divmod(abs(value), 10**decimals)
+    return f"{sign}{integer}.{fraction:0{decimals}d}"
+
+
+class InstrumentScale:
+    """Fixed-point scale of the prices and quantities of a symbol."""
+
+    __slots__ = (
+        "price_converter",
+        "price_decimals",
+        "price_tick",
+        "qty_converter",
+        "qty_decimals",
+    )
+
+    def __init__(
+        self, price_decimals: int, qty_decimals: int, price_tick: int = 1
+    ) -> None:
+        """
+        Create the scale of a symbol.
+
+        Args:
+        ----
+            price_decimals (int): The decimals of the tick size (MinPriceIncrement 969).
+            qty_decimals (int): The decimals of the step size (MinQtyIncrement 25039).
+            price_tick (int, optional): The tick size in fixed-point units, e.g. 5 for a tick
+                size of 0.05 with 2 decimals. Defaults to 1.
+
+        """
+        self.price_decimals: int = price_decimals
+        self.qty_decimals: int = qty_decimals
+        self.price_tick: int = price_tick
+        self.price_converter: Callable[[bytes], int] = partial(
+            parse_fixed, decimals=price_decimals
+        )
+        self.qty_converter: Callable[[bytes], int] = partial(
+            parse_fixed, decimals=qty_decimals
+        )
+
+    @classmethod
+    def from_increments(
+        cls, tick_size: bytes | str, step_size: bytes | str
+    ) -> InstrumentScale:
+        price_decimals = decimals_of(tick_size)
+        return cls(
+            price_decimals,
+            decimals_of(step_size),
+            max(parse_fixed(tick_size, price_decimals), 1),
+        )
+
+    def price(self, value: bytes | str) -> int:
+        return parse_fixed(value, self.price_decimals)
+
+    def qty(self, value: bytes | str) -> int:
+        return parse_fixed(value, self.qty_decimals)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, InstrumentScale)
+            and self.price_decimals == other.price_decimals
+            and self.qty_decimals == other.qty_decimals
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"InstrumentScale(price_decimals={self.price_decimals}, "
+            f"qty_decimals={self.qty_decimals}, price_tick={self.price_tick})"
+        )
+
+
+class InstrumentScales:
+    """Fixed-point scales by symbol, filled from InstrumentList (y) responses."""
+
+    def __init__(self) -> None:
+        self._scales: dict[str, InstrumentScale] = {}
+
+    def __getitem__(self, symbol: str) -> InstrumentScale:
+        scale = self._scales.get(symbol)
+        if scale is None:
+            msg = f"No scale for symbol {symbol}, request the InstrumentList (x) first"
+            raise ValueError(msg)
+        return scale
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._scales
+
+    def __len__(self) -> int:
+        return len(self._scales)
+
+    def get(self, symbol: str) -> InstrumentScale | None:
+        return self._scales.get(symbol)
+
+    def set(self, symbol: str, scale: InstrumentScale) -> None:
+        self._scales[symbol] = scale
+
+    def update(self, message: FixMessageView | FixMessage | bytes) -> list[str]:
+        """
+        Read the tick size (969) and step size (25039) of every symbol of an InstrumentList (y) message.
+
+        Args:
+        ----
+            message (FixMessageView | FixMessage | bytes): The InstrumentList (y) message.
+
+        Returns:
+        -------
+            list[str]: The symbols updated.
+
+        """
+        frame = message if isinstance(message, bytes) else _frame_of(message)
+        group_start = frame.find(SOH + MDTags.NO_RELATED_SYM + b"=")
+        if group_start < 0:
+            return []
+        symbols = []
+        instrument: dict[bytes, bytes] = {}
+        for field in frame[group_start + 1 :].split(SOH)[1:]:
+            tag, _, value = field.partition(b"=")
+            if tag in (MDTags.SYMBOL, MDTags.CHECKSUM):
+                symbols += self._set_instrument(instrument)
+                instrument = {}
+                if tag == MDTags.CHECKSUM:
+                    break
+            instrument.setdefault(tag, value)
+        return symbols
+
+    def _set_instrument(self, instrument: dict[bytes, bytes]) -> list[str]:
+        symbol = instrument.get(MDTags.SYMBOL)
+        tick_size = instrument.get(MDTags.MIN_PRICE_INCREMENT)
+        step_size = instrument.get(MDTags.MIN_QTY_INCREMENT)
+        if symbol is None or tick_size is None or step_size is None:
+            return []
+        symbol = symbol.decode("utf-8")
+        self._scales[symbol] = InstrumentScale.from_increments(tick_size, step_size)
+        return [symbol]
+
+
+class MDEntries:
+    """
+    Columns of the MDEntry repeating group (NoMDEntries 268) of a W or X message.
+
+    Every column has one value per entry. Missing fields are set to NaN (price, qty)
+    or -1 (action, side, aggressor side, ids and time); Symbol (55) and the book update
+    ids are inherited from the previous entry, or from the message when they are sent
+    outside the group. TransactTime (60) is decoded into microseconds since the epoch.
+
+    When decoded with scales, `price` and `qty` are fixed-point integers: the value is
+    `price / 10 ** price_decimals`.
+    """
+
+    __slots__ = (
+        "action",
+        "aggressor_side",
+        "first_book_id",
+        "last_book_id",
+        "md_req_id",
+        "price",
+        "price_decimals",
+        "qty",
+        "qty_decimals",
+        "side",
+        "symbol",
+        "trade_id",
+        "transact_time",
+    )
+
+    def __init__(self, md_req_id: str | None) -> None:
+        self.md_req_id: str | None = md_req_id
+        self.action: array = array("b")
+        self.side: array = array("b")
+        self.price: array = array("d")
+        self.qty: array = array("d")
+        self.trade_id: array = array("q")
+        self.first_book_id: array = array("q")
+        self.last_book_id: array = array("q")
+        self.transact_time: array = array("q")
+        self.aggressor_side: array = array("b")
+        self.symbol: list[str | None] = []
+        self.price_decimals: int | None = None
+        self.qty_decimals: int | None = None
+
+    def __len__(self) -> int:
+        return len(self.symbol)
+
+    def as_numpy(self) -> dict[str, object]:
+        """
+        Return the columns as NumPy arrays sharing the memory of the `array.array` columns.
+
+        Raises
+        ------
+            ImportError: When NumPy is not installed.
+
+        """
+        import numpy as np
+
+        return {
+            column: np.frombuffer(
+                getattr(self, column),
+                dtype=_NUMPY_TYPES[getattr(self, column).typecode],
+            )
+            for column in (
+                "action",
+                "side",
+                "price",
+                "qty",
+                "trade_id",
+                "first_book_id",
+                "last_book_id",
+                "transact_time",
+                "aggressor_side",
+            )
+        }
+
+
+def decode_md_entries(
+    message: FixMessageView | FixMessage | bytes,
+    scales: InstrumentScales | InstrumentScale | None = None,
+) -> MDEntries:
+    """
+    Decode the MDEntry group of a MarketDataSnapshot (W) or MarketDataIncrementalRefresh (X) into columns.
+
+    The group is read in a single pass over the frame; each column is then converted
+    in bulk, the values are only placed entry by entry when some entries miss the field.
+
+    When `scales` is sent, prices and quantities are decoded straight from the frame
+    into fixed-point integers (`int64` columns) using the tick and step size of the
+    symbol, and missing values are set to -1.
+
+    Args:
+    ----
+        message (FixMessageView | FixMessage | bytes): The message, or its raw frame.
+        scales (InstrumentScales | InstrumentScale | None, optional): The scales to decode prices and
+            quantities as fixed-point integers. Defaults to None (floats).
+
+    Raises:
+    ------
+        ValueError: When there is no scale for the symbol, or a value has more decimals than its scale.
+
+    Returns:
+    -------
+        MDEntries: The decoded columns.
+
+    """
+    frame = message if isinstance(message, bytes) else _frame_of(message)
+    group_start = frame.find(SOH + MDTags.NO_MD_ENTRIES + b"=")
+    md_req_id = _find(frame, MDTags.MD_REQ_ID, 0, len(frame))
+    entries = MDEntries(None if md_req_id is None else md_req_id.decode("utf-8"))
+    if group_start < 0:
+        return entries
+
+    fields = frame[group_start + 1 :].split(SOH)
+    count = int(fields[0][len(MDTags.NO_MD_ENTRIES) + 1 :])
+    if count <= 0 or len(fields) < 2:
+        return entries
+    delimiter = fields[1].partition(b"=")[0]
+
+    # Single pass: values and entry positions by tag.
+    values: dict[bytes, list[bytes]] = {}
+    positions: dict[bytes, list[int]] = {}
+    entry = -1
+    for field in fields[1:]:
+        tag, _, value = field.partition(b"=")
+        if tag == delimiter:
+            entry += 1
+        elif tag == MDTags.CHECKSUM:
+            break
+        tag_values = values.get(tag)
+        if tag_values is None:
+            values[tag] = [value]
+            positions[tag] = [entry]
+        else:
+            tag_values.append(value)
+            positions[tag].append(entry)
+    count = entry + 1
+
+    # Fields sent once for the whole message, outside of the group.
+    header_values = {tag: _find(frame, tag, 0, group_start) for tag in _INHERITED_TAGS}
+
+    symbols = values.get(MDTags.SYMBOL)
+    symbol = header_values[MDTags.SYMBOL]
+    column = [None if symbol is None else symbol.decode("utf-8")] * count
+    if symbols is not None:
+        tag_positions = positions[MDTags.SYMBOL]
+        stops = tag_positions[1:] + [count]
+        for value, start, stop in zip(symbols, tag_positions, stops):
+            column[start:stop] = [value.decode("utf-8")] * (stop - start)
+    entries.symbol = column
+
+    columns = dict(_NUMERIC_COLUMNS)
+    if scales is not None:
+        scale = _scale_of(scales, column)
+        if scale is not None:
+            entries.price_decimals = scale.price_decimals
+            entries.qty_decimals = scale.qty_decimals
+            columns[MDTags.MD_ENTRY_PX] = (
+                "price",
+                "q",
+                scale.price_converter,
+                MISSING_FIXED,
+            )
+            columns[MDTags.MD_ENTRY_SIZE] = (
+                "qty",
+                "q",
+                scale.qty_converter,
+                MISSING_FIXED,
+            )
+        else:
+            # Several symbols with different scales in the same message.
+            entries.price_decimals = entries.qty_decimals = None
+            for tag, column_name, attribute in (
+                (MDTags.MD_ENTRY_PX, "price", "price_converter"),
+                (MDTags.MD_ENTRY_SIZE, "qty", "qty_converter"),
+            ):
+                del columns[tag]
+                data = array("q", [MISSING_FIXED]) * count
+                for value, position in zip(values.get(tag, ()), positions.get(tag, ())):
+                    converter = getattr(scales[column[position]], attribute)
+                    data[position] = converter(value)
+                setattr(entries, column_name, data)
+
+    for tag, (column_name, typecode, converter, missing) in columns.items():
+        tag_values = values.get(tag)
+        if tag_values is not None and len(tag_values) == count:
+            setattr(entries, column_name, array(typecode, map(converter, tag_values)))
+            continue
+        default = header_values.get(tag)
+        default = missing if default is None else converter(default)
+        data = array(typecode, [default]) * count
+        if tag_values is not None:
+            tag_positions = positions[tag]
+            if tag in _INHERITED_TAGS:
+                stops = tag_positions[1:] + [count]
+                for value, start, stop in zip(
+                    map(converter, tag_values), tag_positions, stops
+                ):
+                    data[start:stop] = array(typecode, [value]) * (stop - start)
+            else:
+                for value, position in zip(map(converter, tag_values), tag_positions):
+                    data[position] = value
+        setattr(entries, column_name, data)
+    return entries
+
+
+def _scale_of(
+    scales: InstrumentScales | InstrumentScale, symbols: list[str | None]
+) -> InstrumentScale | None:
+    """Return the scale shared by all the entries, None if the symbols have different scales."""
+    if isinstance(scales, InstrumentScale):
+        return scales
+    distinct = set(symbols)
+    if not distinct:
+        return None
+    if len(distinct) == 1:
+        return scales[distinct.pop()]
+    first, *others = (scales[symbol] for symbol in distinct)
+    return first if all(first == other for other in others) else None
+
+
+def _frame_of(message: FixMessageView | FixMessage) -> bytes:
+    frame = getattr(message, "frame", None)
+    return frame if frame is not None else message.encode()
+
+
+def _find(frame: bytes, tag: bytes, start: int, end: int) -> bytes | None:
+    """Return the first value of `tag` between `start` and `end`."""
+    key = SOH + tag + b"="
+    position = frame.find(key, start, end)
+    if position < 0:
+        return None
+    position += len(key)
+    value_end = frame.find(SOH, position)
+    return frame[position:value_end]
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from typing import Iterator
+
+SOH = b"\x01"
+
+_TAG_KEYS: dict[int, bytes] = {}
+
+
+def fix_tag_key(tag: int | str | bytes) -> bytes:
+    """Return the wire representation of a FIX tag (same rules as simplefix)."""
+    if type(tag) is int:
+        key = _TAG_KEYS.get(tag)
+        if key is None:
+            key = _TAG_KEYS[tag] = str(tag).encode("ASCII")
+        return key
+    if type(tag) is bytes:
+        return tag
+    if hasattr(tag, "__int__"):
+        return str(int(tag)).encode("ASCII")
+    return str(tag).encode("ASCII")
+
+
+class WireFrame:
+    """
+    Lazy `str` form of an encoded message, for logging.
+
+    The frame is only decoded (and SOH replaced by `|`) when a handler formats the
+    log record.
+    """
+
+    __slots__ = ("frame",)
+
+    def __init__(self, frame: bytes) -> None:
+        self.frame: bytes = frame
+
+    def __str__(self) -> str:
+        return self.frame.rstrip(SOH).decode("utf-8").replace("\x01", "|")
+
+
+class FixMessageView:
+    """
+    Read-only FIX message backed by the raw frame received from the server.
+
+    It exposes the reading API of `simplefix.FixMessage` (`get`, `message_type`,
+    `pairs`, `encode`...), but nothing is decoded when the message is created:
+    first occurrences of a tag are searched directly in the frame, and the index of
+    all the fields is only built (once) when repeating group entries are requested
+    with `get(tag, nth)`.
+    """
+
+    __slots__ = ("_index", "frame", "message_type")
+
+    def __init__(self, frame: bytes) -> None:
+        """
+        Create a message view.
+
+        Args:
+        ----
+            frame (bytes): A complete FIX frame, from BeginString (8) to CheckSum (10).
+
+        """
+        self.frame: bytes = frame
+        self._index: dict[bytes, list[bytes]] | None = None
+        self.message_type: bytes | None = self._find(b"35")
+
+    @property
+    def begin_string(self) -> bytes | None:
+        return self._find(b"8")
+
+    def get(self, tag: int | str | bytes, nth: int = 1) -> bytes | None:
+        """
+        Return n-th value for tag.
+
+        Args:
+        ----
+            tag (int | str | bytes): FIX field tag number.
+            nth (int, optional): Index of tag if repeating, first is 1. Defaults to 1.
+
+        Returns:
+        -------
+            bytes | None: None if nothing found, otherwise value matching tag.
+
+        """
+        key = fix_tag_key(tag)
+        index = self._index
+        if index is None:
+            if nth == 1:
+                return self._find(key)
+            index = self._build_index()
+        values = index.get(key)
+        nth = int(nth)
+        if values is None or nth < 1 or nth > len(values):
+            return None
+        return values[nth - 1]
+
+    def get_all(self, tag: int | str | bytes) -> list[bytes]:
+        """
+        Return every value for tag, in the order they appear in the message.
+
+        Args:
+        ----
+            tag (int | str | bytes): FIX field tag number.
+
+        Returns:
+        -------
+            list[bytes]: The values, empty if the tag is not in the message.
+
+        """
+        index = self._index if self._index is not None else self._build_index()
+        return list(index.get(fix_tag_key(tag), ()))
+
+    @property
+    def pairs(self) -> list[tuple[bytes, bytes]]:
+        pairs = []
+        for field in self.frame.split(SOH)[:-1]:
+            tag, _, value = field.partition(b"=")
+            pairs.append((tag, value))
+        return pairs
+
+    def count(self) -> int:
+        """Return the number of pairs in this message."""
+        return self.frame.count(SOH)
+
+    def encode(self, raw: bool = False) -> bytes:
+        """Return the message in on-the-wire FIX format, which is the frame received."""
+        return self.frame
+
+    def to_string(self, separator: str = "|") -> str:
+        """Return string form of message, for logging."""
+        return self.frame[:-1].decode("utf-8").replace("\x01", separator)
+
+    def _find(self, key: bytes) -> bytes | None:
+        """Return the first value of the tag `key` searching the frame."""
+        frame = self.frame
+        if frame.startswith(key + b"="):
+            start = len(key) + 1
+        else:
+            start = frame.find(SOH + key + b"=")
+            if start < 0:
+                return None
+            start += len(key) + 2
+        end = frame.find(SOH, start)
+        return frame[start:] if end < 0 else frame[start:end]
+
+    def _build_index(self) -> dict[bytes, list[bytes]]:
+        """Index every field of the frame by tag."""
+        index: dict[bytes, list[bytes]] = {}
+        for field in self.frame.split(SOH)[:-1]:
+            tag, _, value = field.partition(b"=")
+            values = index.get(tag)
+            if values is None:
+                index[tag] = [value]
+            else:
+                values.append(value)
+        self._index = index
+        return index
+
+    def __contains__(self, tag: int | str | bytes) -> bool:
+        return self.get(tag) is not None
+
+    def __getitem__(self, item_index: int) -> tuple[int, bytes]:
+        tag, value = self.pairs[item_index]
+        return int(tag), value
+
+    def __iter__(self) -> Iterator[tuple[int, bytes]]:
+        for tag, value in self.pairs:
+            yield int(tag), value
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FixMessageView):
+            return self.frame == other.frame
+        if not hasattr(other, "pairs"):
+            return False
+        return sorted(self.pairs) == sorted(other.pairs)
+
+    __hash__ = None
+
+    def __str__(self) -> str:
+        return self.to_string("|")
+
+    def __repr__(self) -> str:
+        return f"FixMessageView({self.frame!r})"
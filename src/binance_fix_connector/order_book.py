@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import logging
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import TYPE_CHECKING, Callable
+
+from binance_fix_connector.market_data import (
+    InstrumentScale,
+    MDEntries,
+    MDEntryType,
+    MDTags,
+    MDUpdateAction,
+    decode_md_entries,
+)
+
+if TYPE_CHECKING:
+    from binance_fix_connector.market_data import InstrumentScales
+    from binance_fix_connector.message import FixMessageView
+
+SNAPSHOT = b"W"
+INCREMENTAL_REFRESH = b"X"
+DEFAULT_MAX_PENDING = 1024
+DEFAULT_MAX_DENSE_LEVELS = 1 << 20
+LADDERS = ("array", "dense")
+
+
+class BookSide:
+    """
+    Price levels of one side of a book, in two sorted contiguous arrays.
+
+    The prices and the quantities are kept in parallel `array.array` columns (int64
+    for fixed-point books, float64 otherwise), sorted so the best level is the last
+    one: the asks are stored with negated prices. Levels are found, added and removed
+    with `bisect`; the moves are mostly near the end of the arrays, where the book
+    changes the most. The best level is read in O(1) and the N best levels in O(N).
+    """
+
+    __slots__ = ("descending", "keys", "qtys")
+
+    def __init__(self, descending: bool, typecode: str = "d") -> None:
+        """
+        Create an empty side.
+
+        Args:
+        ----
+            descending (bool): True for the bids (best price is the highest).
+            typecode (str, optional): Array typecode of the prices and quantities, "q" for
+                fixed-point integers. Defaults to "d".
+
+        """
+        self.descending: bool = descending
+        self.keys: array = array(typecode)  # prices, negated for the asks
+        self.qtys: array = array(typecode)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def set(self, price: float, qty: float) -> None:
+        """Set the quantity of a level, a quantity of 0 removes it."""
+        if not qty:
+            self.delete(price)
+            return
+        key = price if self.descending else -price
+        keys = self.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            self.qtys[i] = qty
+        else:
+            keys.insert(i, key)
+            self.qtys.insert(i, qty)
+
+    def delete(self, price: float) -> None:
+        """Remove a level, if present."""
+        key = price if self.descending else -price
+        keys = self.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+            del self.qtys[i]
+
+    def clear(self) -> None:
+        del self.keys[:]
+        del self.qtys[:]
+
+    def best(self) -> tuple[float, float] | None:
+        """Return the best (price, qty), None if the side is empty."""
+        if not self.keys:
+            return None
+        key = self.keys[-1]
+        return (key if self.descending else -key), self.qtys[-1]
+
+    def top(self, depth: int) -> list[tuple[float, float]]:
+        """Return the `depth` best levels, best first."""
+        keys = self.keys[: -depth - 1 : -1]
+        qtys = self.qtys[: -depth - 1 : -1]
+        if not self.descending:
+            return [(-key, qty) for key, qty in zip(keys, qtys)]
+        return list(zip(keys, qtys))
+
+    def nbytes(self) -> int:
+        """Return the memory allocated for the levels, in bytes."""
+        return sys.getsizeof(self.keys) + sys.getsizeof(self.qtys)
+
+
+class DenseBookSide:
+    """
+    Price levels of one side of a fixed-point book, in an array indexed by tick.
+
+    `qtys[i]` is the quantity at the price `base + i * tick`, 0 when there is no
+    level. Setting or removing a level is O(1), without moving the other levels; the
+    index of the best level is kept, and searched from the removed level when the best
+    level is removed. The array covers the prices seen since the last snapshot and
+    grows when a price falls outside, so it suits the instruments whose price range in
+    ticks (MinPriceIncrement 969) is bounded.
+    """
+
+    __slots__ = (
+        "base",
+        "best_index",
+        "count",
+        "descending",
+        "max_levels",
+        "qtys",
+        "tick",
+    )
+
+    def __init__(
+        self, descending: bool, tick: int, max_levels: int = DEFAULT_MAX_DENSE_LEVELS
+    ) -> None:
+        """
+        Create an empty side.
+
+        Args:
+        ----
+            descending (bool): True for the bids (best price is the highest).
+            tick (int): The tick size, in fixed-point units of the prices.
+            max_levels (int, optional): The maximum number of ticks covered. Defaults to 1048576.
+
+        """
+        self.descending: bool = descending
+        self.tick: int = tick
+        self.max_levels: int = max_levels
+        self.qtys: array = array("q")
+        self.base: int = 0
+        self.count: int = 0
+        self.best_index: int = -1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def set(self, price: int, qty: int) -> None:
+        """
+        Set the quantity of a level, a quantity of 0 removes it.
+
+        Raises
+        ------
+            ValueError: When the price is not a multiple of the tick, or the range of prices
+                is wider than `max_levels` ticks.
+
+        """
+        if not qty:
+            self.delete(price)
+            return
+        qtys = self.qtys
+        if not qtys:
+            self.base = price
+        i, remainder = divmod(price - self.base, self.tick)
+        if remainder:
+            msg = f"Price {price} is not a multiple of the tick {self.tick}"
+            raise ValueError(msg)
+        if i < 0 or i >= len(qtys):
+            self._grow(i)
+            qtys = self.qtys
+            i = (price - self.base) // self.tick
+        if not qtys[i]:
+            self.count += 1
+            best = self.best_index
+            if best < 0 or (i > best if self.descending else i < best):
+                self.best_index = i
+        qtys[i] = qty
+
+    def delete(self, price: int) -> None:
+        """Remove a level, if present."""
+        i, remainder = divmod(price - self.base, self.tick)
+        qtys = self.qtys
+        if remainder or i < 0 or i >= len(qtys) or not qtys[i]:
+            return
+        qtys[i] = 0
+        self.count -= 1
+        if i != self.best_index:
+            return
+        if not self.count:
+            self.best_index = -1
+        elif self.descending:
+            while not qtys[i]:
+                i -= 1
+            self.best_index = i
+        else:
+            while not qtys[i]:
+                i += 1
+            self.best_index = i
+
+    def clear(self) -> None:
+        del self.qtys[:]
+        self.count = 0
+        self.best_index = -1
+
+    def best(self) -> tuple[int, int] | None:
+        """Return the best (price, qty), None if the side is empty."""
+        i = self.best_index
+        if i < 0:
+            return None
+        return self.base + i * self.tick, self.qtys[i]
+
+    def top(self, depth: int) -> list[tuple[int, int]]:
+        """Return the `depth` best levels, best first."""
+        levels: list[tuple[int, int]] = []
+        i = self.best_index
+        if i < 0:
+            return levels
+        qtys = self.qtys
+        step = -1 if self.descending else 1
+        while 0 <= i < len(qtys) and len(levels) < depth:
+            if qtys[i]:
+                levels.append((self.base + i * self.tick, qtys[i]))
+            i += step
+        return levels
+
+    def nbytes(self) -> int:
+        """Return the memory allocated for the levels, in bytes."""
+        return sys.getsizeof(self.qtys)
+
+    def _grow(self, i: int) -> None:
+        """Extend the array to the index `i`, relative to the current base."""
+        size = len(self.qtys)
+        if i < 0:
+            size -= i
+        else:
+            size = i + 1
+        if size > self.max_levels:
+            msg = f"The prices span {size} ticks, more than {self.max_levels}"
+            raise ValueError(msg)
+        if i < 0:
+            self.qtys[0:0] = array("q", bytes(8 * -i))
+            self.base += i * self.tick
+            if self.best_index >= 0:
+                self.best_index -= i
+        else:
+            self.qtys.extend(array("q", bytes(8 * (i + 1 - len(self.qtys)))))
+
+
+class OrderBook:
+    """
+    Book of a symbol, built from a MarketDataSnapshot (W) and the following diffs (X).
+
+    `last_update_id` is the LastBookUpdateID (25044) of the last snapshot or diff
+    applied. The book is `synced` once a snapshot was applied; it is cleared when a gap
+    is detected, until the next snapshot.
+    """
+
+    __slots__ = (
+        "asks",
+        "bids",
+        "last_update_id",
+        "pending",
+        "price_decimals",
+        "qty_decimals",
+        "resyncing",
+        "symbol",
+        "synced",
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        bids: BookSide | DenseBookSide | None = None,
+        asks: BookSide | DenseBookSide | None = None,
+    ) -> None:
+        """
+        Create an empty book.
+
+        Args:
+        ----
+            symbol (str): The symbol.
+            max_pending (int, optional): Diffs kept while waiting for a snapshot. Defaults to 1024.
+            bids (BookSide | DenseBookSide | None, optional): The bid side. Defaults to None (BookSide).
+            asks (BookSide | DenseBookSide | None, optional): The ask side. Defaults to None (BookSide).
+
+        """
+        self.symbol: str = symbol
+        self.bids: BookSide | DenseBookSide = (
+            BookSide(descending=True) if bids is None else bids
+        )
+        self.asks: BookSide | DenseBookSide = (
+            BookSide(descending=False) if asks is None else asks
+        )
+        self.last_update_id: int = -1
+        self.synced: bool = False
+        self.resyncing: bool = False
+        self.price_decimals: int | None = None
+        self.qty_decimals: int | None = None
+        # Diffs received before the snapshot: (entries, start, stop)
+        self.pending: deque[tuple[MDEntries, int, int]] = deque(maxlen=max_pending)
+
+    def __repr__(self) -> str:
+        return (
+            f"OrderBook({self.symbol}, last_update_id={self.last_update_id}, "
+            f"bid={self.best_bid()}, ask={self.best_ask()})"
+        )
+
+    def best_bid(self) -> tuple[float, float] | None:
+        return self.bids.best()
+
+    def best_ask(self) -> tuple[float, float] | None:
+        return self.asks.best()
+
+    def top(
+        self, depth: int
+    ) -> tuple[list[tuple[float, float]], list[tuple[float, float]]]:
+        """Return the `depth` best bids and asks, best first."""
+        return self.bids.top(depth), self.asks.top(depth)
+
+    def clear(self) -> None:
+        self.bids.clear()
+        self.asks.clear()
+        self.synced = False
+
+    def nbytes(self) -> int:
+        """Return the memory allocated for the levels of both sides, in bytes."""
+        return self.bids.nbytes() + self.asks.nbytes()
+
+    def apply_snapshot(
+        self, entries: MDEntries, start: int, stop: int, last_update_id: int
+    ) -> None:
+        """Replace the levels with the entries of a snapshot."""
+        self.clear()
+        sides = (self.bids, self.asks)
+        for i in range(start, stop):
+            side = entries.side[i]
+            if side == MDEntryType.BID or side == MDEntryType.OFFER:
+                sides[side].set(entries.price[i], entries.qty[i])
+        self.last_update_id = last_update_id
+        self.price_decimals = entries.price_decimals
+        self.qty_decimals = entries.qty_decimals
+        self.synced = True
+        self.resyncing = False
+
+    def apply_diff(self, entries: MDEntries, start: int, stop: int) -> None:
+        """Apply the entries of a diff, without checking the update ids."""
+        sides = (self.bids, self.asks)
+        for i in range(start, stop):
+            side = entries.side[i]
+            if side != MDEntryType.BID and side != MDEntryType.OFFER:
+                continue
+            if entries.action[i] == MDUpdateAction.DELETE:
+                sides[side].delete(entries.price[i])
+            else:
+                sides[side].set(entries.price[i], entries.qty[i])
+        self.last_update_id = entries.last_book_id[start]
+
+
+class OrderBookEngine:
+    """
+    Books of the symbols of a depth stream subscription.
+
+    Pass `on_message` the MarketDataSnapshot (W) and MarketDataIncrementalRefresh (X)
+    messages of the subscription, e.g. with `BinanceFixConnector.add_order_book`. The
+    snapshot of a symbol replaces its book, then the diffs are applied in order of
+    book update ids: a diff whose FirstBookUpdateID (25043) is not the next id after
+    the LastBookUpdateID (25044) of the book is a gap. The book is then cleared and
+    `resync` is called to get a new snapshot; the diffs received meanwhile are kept
+    and the ones following the snapshot are applied when it arrives.
+    """
+
+    def __init__(
+        self,
+        scales: InstrumentScales | InstrumentScale | None = None,
+        resync: Callable[[str, str | None], object] | None = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        ladder: str = "array",
+    ) -> None:
+        """
+        Create an engine without books.
+
+        Args:
+        ----
+            scales (InstrumentScales | InstrumentScale | None, optional): The scales to keep prices and quantities
+                as fixed-point integers. Defaults to None (floats).
+            resync (Callable[[str, str | None], object] | None, optional): Called with the symbol and
+                MDReqID (262) of a book after a gap, to request a new snapshot. Defaults to None.
+            max_pending (int, optional): Diffs kept by symbol while waiting for a snapshot.
+                Defaults to 1024.
+            ladder (str, optional): The storage of the levels: "array" (`BookSide`, sorted arrays)
+                or "dense" (`DenseBookSide`, indexed by tick, requires the scales). Defaults to "array".
+
+        Raises:
+        ------
+            ValueError: Raised when the ladder is unknown, or "dense" without scales.
+
+        """
+        if ladder not in LADDERS:
+            msg = f"Unknown ladder {ladder!r}, use one of {', '.join(LADDERS)}"
+            raise ValueError(msg)
+        if ladder == "dense" and scales is None:
+            msg = "The dense ladder requires the scales of the instruments"
+            raise ValueError(msg)
+        self.ladder: str = ladder
+        self.scales: InstrumentScales | InstrumentScale | None = scales
+        self.resync: Callable[[str, str | None], object] | None = resync
+        self.max_pending: int = max_pending
+        self.books: dict[str, OrderBook] = {}
+        self.logger = logging.getLogger("BinanceFixConnector")
+        self.snapshots: int = 0
+        self.updates: int = 0
+        self.stale_updates: int = 0
+        self.gaps: int = 0
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.books
+
+    def __getitem__(self, symbol: str) -> OrderBook:
+        return self.books[symbol]
+
+    def get(self, symbol: str) -> OrderBook | None:
+        return self.books.get(symbol)
+
+    def memory_report(self) -> dict[str, int]:
+        """Return the memory allocated for the levels of each book, in bytes by symbol."""
+        return {symbol: book.nbytes() for symbol, book in self.books.items()}
+
+    def stats(self) -> dict[str, int]:
+        """Return the counters of the engine."""
+        return {
+            "books": len(self.books),
+            "snapshots": self.snapshots,
+            "updates": self.updates,
+            "stale_updates": self.stale_updates,
+            "gaps": self.gaps,
+        }
+
+    def on_message(self, message: FixMessageView) -> None:
+        """
+        Apply a MarketDataSnapshot (W) or MarketDataIncrementalRefresh (X) to the books.
+
+        Args:
+        ----
+            message (FixMessageView): The message, other types are ignored.
+
+        """
+        msg_type = message.message_type
+        if msg_type != SNAPSHOT and msg_type != INCREMENTAL_REFRESH:
+            return
+        entries = decode_md_entries(message, self.scales)
+        if msg_type == SNAPSHOT and not entries:
+            # Empty book: the symbol and book id are only in the message.
+            symbol = message.get(MDTags.SYMBOL)
+            last_book_id = message.get(MDTags.LAST_BOOK_UPDATE_ID)
+            if symbol is not None and last_book_id is not None:
+                book = self._book(symbol.decode("utf-8"))
+                self._apply_snapshot(book, entries, 0, 0, int(last_book_id))
+            return
+        for symbol, start, stop in _symbol_ranges(entries):
+            book = self._book(symbol)
+            if msg_type == SNAPSHOT:
+                last_book_id = entries.last_book_id[start]
+                self._apply_snapshot(book, entries, start, stop, last_book_id)
+            elif book.synced:
+                self._apply_diff(book, entries, start, stop)
+            else:
+                book.pending.append((entries, start, stop))
+
+    def _book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(
+                symbol, self.max_pending, *self._create_sides(symbol)
+            )
+        return book
+
+    def _create_sides(
+        self, symbol: str
+    ) -> tuple[BookSide, BookSide] | tuple[DenseBookSide, DenseBookSide]:
+        if self.scales is None:
+            return BookSide(descending=True), BookSide(descending=False)
+        if self.ladder == "array":
+            return BookSide(True, "q"), BookSide(False, "q")
+        scale = (
+            self.scales
+            if isinstance(self.scales, InstrumentScale)
+            else self.scales[symbol]
+        )
+        return DenseBookSide(True, scale.price_tick), DenseBookSide(
+            False, scale.price_tick
+        )
+
+    def _apply_snapshot(
+        self,
+        book: OrderBook,
+        entries: MDEntries,
+        start: int,
+        stop: int,
+        last_update_id: int,
+    ) -> None:
+        book.apply_snapshot(entries, start, stop, last_update_id)
+        self.snapshots += 1
+        pending = list(book.pending)
+        book.pending.clear()
+        for diff in pending:
+            if book.synced:
+                self._apply_diff(book, *diff)
+            else:  # gap in the diffs kept
+                book.pending.append(diff)
+
+    def _apply_diff(
+        self, book: OrderBook, entries: MDEntries, start: int, stop: int
+    ) -> None:
+        if entries.last_book_id[start] <= book.last_update_id:
+            self.stale_updates += 1  # already in the snapshot
+            return
+        if entries.first_book_id[start] > book.last_update_id + 1:
+            self.gaps += 1
+            self.logger.warning(
+                "Gap in the book of %s: update %s after %s, requesting a snapshot",
+                book.symbol,
+                entries.first_book_id[start],
+                book.last_update_id,
+            )
+            book.clear()
+            book.pending.append((entries, start, stop))
+            if self.resync is not None and not book.resyncing:
+                book.resyncing = True
+                self.resync(book.symbol, entries.md_req_id)
+            return
+        book.apply_diff(entries, start, stop)
+        self.updates += 1
+
+
+def _symbol_ranges(entries: MDEntries) -> list[tuple[str, int, int]]:
+    """Return the (symbol, start, stop) ranges of consecutive entries of a symbol."""
+    ranges = []
+    symbols = entries.symbol
+    start = 0
+    for i in range(1, len(symbols) + 1):
+        if i == len(symbols) or symbols[i] != symbols[start]:
+            if symbols[start] is not None:
+                ranges.append((symbols[start], start, i))
+            start = i
+    return ranges
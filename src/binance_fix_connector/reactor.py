@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import selectors
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from binance_fix_connector.fix_connector import BinanceFixConnector
+
+_WOULD_BLOCK = (BlockingIOError, ssl.SSLWantReadError, ssl.SSLWantWriteError)
+
+
+class ReactorTimer:
+    """Handle of a callback scheduled with `FixReactor.call_later`."""
+
+    __slots__ = ("args", "callback", "cancelled", "deadline")
+
+    def __init__(
+        self, deadline: float, callback: Callable[..., Any], args: tuple
+    ) -> None:
+        self.deadline: float = deadline
+        self.callback: Callable[..., Any] = callback
+        self.args: tuple = args
+        self.cancelled: bool = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class _Channel:
+    """State of a session registered in the reactor."""
+
+    __slots__ = (
+        "fd",
+        "heartbeat_timer",
+        "last_send",
+        "lock",
+        "out",
+        "session",
+        "sock",
+        "writing",
+    )
+
+    def __init__(self, session: BinanceFixConnector) -> None:
+        self.session: BinanceFixConnector = session
+        self.sock: socket.socket = session.sock
+        self.fd: int = session.sock.fileno()
+        self.lock = threading.Lock()
+        self.out = bytearray()
+        self.writing: bool = False
+        self.last_send: float = time.monotonic()
+        self.heartbeat_timer: ReactorTimer | None = None
+
+
+class FixReactor:
+    """
+    One thread servicing the connections of many `BinanceFixConnector` sessions.
+
+    The sockets of the sessions created with `reactor=` are made non-blocking and
+    watched with `selectors` (epoll on Linux): when one is readable, the reactor reads
+    it, frames the data and dispatches the messages to the session after each read, as
+    its receive thread would. A session whose data can not be framed (a frame larger
+    than its `max_buffer_size`) is disconnected without stopping the others. Messages
+    are sent right away from the calling thread; what the socket can not take is kept
+    and written by the reactor when the socket is writable again.
+
+    The reactor also runs the timers of the sessions: a Heartbeat (0) is sent when
+    nothing was sent for `heart_bt_int` seconds, and scheduled restarts are run from
+    the reactor thread.
+    """
+
+    def __init__(self, logger: logging.Logger | None = None) -> None:
+        self.selector = selectors.DefaultSelector()
+        self.logger = logger or logging.getLogger("BinanceFixConnector")
+        self.thread: threading.Thread | None = None
+        self._running = False
+        self._channels: dict[socket.socket, _Channel] = {}
+        self._timers: list[tuple[float, int, ReactorTimer]] = []
+        self._timer_ids = itertools.count()
+        self._calls: deque[tuple[Callable[..., Any], tuple]] = deque()
+        self._wakeup_read, self._wakeup_write = socket.socketpair()
+        self._wakeup_read.setblocking(False)
+        self._wakeup_write.setblocking(False)
+        self.selector.register(self._wakeup_read, selectors.EVENT_READ, None)
+
+        self.loops: int = 0
+        self.reads: int = 0
+        self.messages: int = 0
+        self.deferred_writes: int = 0
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def start(self) -> None:
+        """Start the reactor thread."""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self._running = True
+        self.thread = threading.Thread(target=self._run, name="FixReactor", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the reactor thread, the sessions stay connected but are no longer read."""
+        self._running = False
+        self._wakeup()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop the reactor thread and close its selector, the reactor can not be started again."""
+        self.stop(timeout)
+        if self.thread is not None and self.thread.is_alive():
+            return  # still selecting: closed by the process exit
+        self.selector.close()
+        self._wakeup_read.close()
+        self._wakeup_write.close()
+
+    def in_reactor_thread(self) -> bool:
+        return self.thread is threading.current_thread()
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Run `callback(*args)` in the reactor thread. Can be called from any thread."""
+        self._calls.append((callback, args))
+        if not self.in_reactor_thread():
+            self._wakeup()
+
+    def call_later(
+        self, delay: float, callback: Callable[..., Any], *args: Any
+    ) -> ReactorTimer:
+        """
+        Run `callback(*args)` in the reactor thread in `delay` seconds.
+
+        Args:
+        ----
+            delay (float): Seconds to wait.
+            callback (Callable): The function to call.
+            *args (Any): The arguments of the function.
+
+        Returns:
+        -------
+            ReactorTimer: The timer, to cancel it.
+
+        """
+        timer = ReactorTimer(time.monotonic() + delay, callback, args)
+        self.call_soon(self._add_timer, timer)
+        return timer
+
+    def register(self, session: BinanceFixConnector) -> None:
+        """
+        Service the connection of a (connected) session.
+
+        If the connection is already registered, the messages received are now
+        dispatched to `session` (used when a session takes over the connection of its
+        restart session).
+        """
+        channel = self._channels.get(session.sock)
+        if channel is not None:
+            channel.session = session
+            return
+        channel = _Channel(session)
+        channel.sock.setblocking(False)
+        self._channels[channel.sock] = channel
+        self.call_soon(self._register, channel)
+
+    def unregister(self, session: BinanceFixConnector) -> None:
+        """Stop servicing the connection of a session."""
+        channel = self._channels.pop(session.sock, None)
+        if channel is not None:
+            self.call_soon(self._unregister, channel)
+
+    def send(self, session: BinanceFixConnector, data: bytes) -> None:
+        """
+        Send data on the connection of a session, from any thread.
+
+        Args:
+        ----
+            session (BinanceFixConnector): The session.
+            data (bytes): The encoded messages.
+
+        """
+        channel = self._channels.get(session.sock)
+        if channel is None:
+            session.sock.sendall(data)
+            return
+        with channel.lock:
+            channel.last_send = time.monotonic()
+            if channel.out:
+                channel.out += data
+                return
+            try:
+                sent = channel.sock.send(data)
+            except _WOULD_BLOCK:
+                sent = 0
+            if sent < len(data):
+                channel.out += data[sent:]
+                self.deferred_writes += 1
+                self.call_soon(self._watch_writes, channel)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return the counters of the reactor.
+
+        Returns
+        -------
+            dict[str, int]: sessions, loops, reads, messages dispatched and writes deferred.
+
+        """
+        return {
+            "sessions": len(self._channels),
+            "loops": self.loops,
+            "reads": self.reads,
+            "messages": self.messages,
+            "deferred_writes": self.deferred_writes,
+        }
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_write.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # already woken up (buffer full) or closed
+
+    def _run(self) -> None:
+        select = self.selector.select
+        while self._running:
+            self.loops += 1
+            timeout = None
+            if self._calls:
+                timeout = 0
+            elif self._timers:
+                timeout = max(0.0, self._timers[0][0] - time.monotonic())
+            for key, events in select(timeout):
+                channel = key.data
+                if channel is None:
+                    self._drain_wakeup()
+                    continue
+                if events & selectors.EVENT_WRITE:
+                    self._flush(channel)
+                if events & selectors.EVENT_READ:
+                    self._read(channel)
+            self._run_calls()
+            self._run_timers()
+
+    def _drain_wakeup(self) -> None:
+        try:
+            while self._wakeup_read.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _run_calls(self) -> None:
+        calls = self._calls
+        for _ in range(len(calls)):
+            callback, args = calls.popleft()
+            self._call(callback, args)
+
+    def _run_timers(self) -> None:
+        timers = self._timers
+        now = time.monotonic()
+        while timers and timers[0][0] <= now:
+            _, _, timer = heapq.heappop(timers)
+            if not timer.cancelled:
+                self._call(timer.callback, timer.args)
+
+    def _call(self, callback: Callable[..., Any], args: tuple) -> None:
+        try:
+            callback(*args)
+        except Exception:
+            self.logger.exception("Error in reactor callback %r", callback)
+
+    def _add_timer(self, timer: ReactorTimer) -> None:
+        heapq.heappush(self._timers, (timer.deadline, next(self._timer_ids), timer))
+
+    def _register(self, channel: _Channel) -> None:
+        if self._channels.get(channel.sock) is not channel:
+            return  # unregistered meanwhile
+        if channel.fd in self.selector.get_map():  # fd of a closed connection reused
+            self.selector.unregister(channel.fd)
+        self.selector.register(channel.fd, selectors.EVENT_READ, channel)
+        self._schedule_heartbeat(channel)
+        self._read(channel)  # data received before the registration
+
+    def _unregister(self, channel: _Channel) -> None:
+        key = self.selector.get_map().get(channel.fd)
+        if key is not None and key.data is channel:
+            self.selector.unregister(channel.fd)
+        if channel.heartbeat_timer is not None:
+            channel.heartbeat_timer.cancel()
+
+    def _watch_writes(self, channel: _Channel) -> None:
+        key = self.selector.get_map().get(channel.fd)
+        if key is None or key.data is not channel or channel.writing:
+            return
+        channel.writing = True
+        self.selector.modify(
+            channel.fd, selectors.EVENT_READ | selectors.EVENT_WRITE, channel
+        )
+
+    def _flush(self, channel: _Channel) -> None:
+        with channel.lock:
+            try:
+                sent = channel.sock.send(channel.out) if channel.out else 0
+            except _WOULD_BLOCK:
+                return
+            except OSError:
+                self.logger.exception("Error sending message")
+                channel.out.clear()
+                sent = 0
+            del channel.out[:sent]
+            if channel.out:
+                return
+            channel.writing = False
+        self.selector.modify(channel.fd, selectors.EVENT_READ, channel)
+
+    def _read(self, channel: _Channel) -> None:
+        session = channel.session
+        framer = session.framer
+        sock = channel.sock
+        closed = False
+        failed = False
+        while True:
+            try:
+                size = framer.recv_into(sock)
+            except _WOULD_BLOCK:
+                break
+            except BufferError:
+                self.logger.exception("Error receiving message")
+                failed = True
+                break
+            except OSError:
+                closed = True
+                break
+            if not size:
+                closed = True
+                break
+            self.reads += 1
+            # Dispatch what was read before reading more, so the buffer only holds
+            # the incomplete frame. The selector reports the socket again while the
+            # kernel has data; only the data already decrypted by TLS is read here.
+            messages = session.parse_server_response()
+            if messages:
+                self.messages += len(messages)
+                try:
+                    session._process_received(messages)
+                except Exception:
+                    self.logger.exception("Error receiving message")
+                    failed = True
+                    break
+            if not isinstance(sock, ssl.SSLSocket) or not sock.pending():
+                break
+        if self._channels.get(sock) is not channel:
+            return
+        if failed:
+            # Only this connection is closed, the other sessions are still serviced.
+            del self._channels[sock]
+            self._unregister(channel)
+            session.disconnect()
+        elif closed:
+            del self._channels[sock]
+            self._unregister(channel)
+            session.is_connected = False
+
+    def _schedule_heartbeat(self, channel: _Channel) -> None:
+        interval = channel.session.heart_bt_int
+        if not interval or int(interval) <= 0:
+            return
+        deadline = channel.last_send + int(interval)
+        timer = ReactorTimer(deadline, self._heartbeat, (channel,))
+        channel.heartbeat_timer = timer
+        self._add_timer(timer)
+
+    def _heartbeat(self, channel: _Channel) -> None:
+        if self._channels.get(channel.sock) is not channel:
+            return
+        if time.monotonic() - channel.last_send >= int(channel.session.heart_bt_int):
+            channel.session.heartbeat()
+        self._schedule_heartbeat(channel)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import random
+import time
+from typing import TYPE_CHECKING, Iterable
+
+from binance_fix_connector.capture import INBOUND, CaptureRecord, read_capture
+
+if TYPE_CHECKING:
+    from binance_fix_connector.fix_connector import BinanceFixConnector
+
+STAGES = ("read", "parse", "dispatch")
+
+
+class ReplaySocket:
+    """
+    Socket replacement returning the chunks of a replay from `recv_into`.
+
+    A chunk larger than the buffer is returned by several reads, as a socket would.
+
+    Everything sent is discarded (and counted), so the connector can answer the
+    replayed messages (heartbeats...) as it would on a real connection.
+    """
+
+    def __init__(self) -> None:
+        self.chunk: bytes = b""
+        self.messages_sent: int = 0
+        self.closed: bool = False
+
+    def recv_into(self, buffer: memoryview, nbytes: int = 0) -> int:
+        size = min(len(self.chunk), nbytes or len(buffer))
+        buffer[:size] = self.chunk[:size]
+        self.chunk = self.chunk[size:]
+        return size
+
+    def sendall(self, data: bytes) -> None:
+        self.messages_sent += 1
+
+    def shutdown(self, how: int) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ReplayReport:
+    """Messages, bytes and time spent in every stage of a replay."""
+
+    def __init__(self) -> None:
+        self.messages: int = 0
+        self.bytes: int = 0
+        self.reads: int = 0
+        self.elapsed: float = 0.0
+        self.stages: dict[str, float] = dict.fromkeys(STAGES, 0.0)
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict[str, float | int | dict[str, float]]:
+        """
+        Return the report as a dictionary.
+
+        Returns
+        -------
+            dict[str, float | int | dict[str, float]]: messages, bytes, reads, elapsed seconds,
+            messages per second and seconds spent by stage (read, parse, dispatch).
+
+        """
+        return {
+            "messages": self.messages,
+            "bytes": self.bytes,
+            "reads": self.reads,
+            "elapsed": self.elapsed,
+            "messages_per_second": self.messages_per_second,
+            "stages": dict(self.stages),
+        }
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.messages} messages, {self.bytes} bytes, {self.reads} reads "
+            f"in {self.elapsed:.3f}s ({self.messages_per_second:,.0f} messages/s)"
+        ]
+        for stage, seconds in self.stages.items():
+            per_message = seconds / self.messages * 1e6 if self.messages else 0.0
+            lines.append(f"  {stage:<10} {seconds:8.3f}s {per_message:8.2f} us/message")
+        return "\n".join(lines)
+
+
+class CaptureReplay:
+    """
+    Replay the frames received in a capture through a `BinanceFixConnector`.
+
+    The frames go through the same path as on a live session: `recv_into` into the
+    receive buffer (the socket is replaced by a `ReplaySocket`), then
+    `parse_server_response` and `on_message_received`. The connector is never
+    connected: it is `replaying`, so the Logon, News and Logout messages of the
+    capture neither save the TLS session, schedule a restart nor log out.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[CaptureRecord],
+        *,
+        session_id: str | None = None,
+    ) -> None:
+        """
+        Select the frames to replay.
+
+        Args:
+        ----
+            records (Iterable[CaptureRecord]): The records, as returned by `read_capture`.
+            session_id (str | None, optional): Only replay the frames of this session. Defaults to all.
+
+        """
+        self.records: list[CaptureRecord] = [
+            record
+            for record in records
+            if record.direction == INBOUND
+            and (session_id is None or record.session_id == session_id)
+        ]
+
+    @classmethod
+    def from_file(cls, path: str, *, session_id: str | None = None) -> CaptureReplay:
+        """Create a replay of the frames received in a capture file."""
+        return cls(read_capture(path), session_id=session_id)
+
+    def chunks(
+        self, chunk_size: int | tuple[int, int] | None = None, seed: int = 0
+    ) -> list[tuple[int, bytes]]:
+        """
+        Split the frames into the chunks returned by the successive reads.
+
+        Args:
+        ----
+            chunk_size (int | tuple[int, int] | None, optional): None to read one frame at a time,
+                a size to cut the stream in reads of that size regardless of the frame boundaries,
+                or a (min, max) range for reads of random sizes. Defaults to None.
+            seed (int, optional): The seed of the random read sizes. Defaults to 0.
+
+        Returns:
+        -------
+            list[tuple[int, bytes]]: The capture timestamp (ns) of the first byte of each chunk, and the chunk.
+
+        """
+        if chunk_size is None:
+            return [(record.timestamp_ns, record.frame) for record in self.records]
+        if isinstance(chunk_size, int):
+            low = high = chunk_size
+        else:
+            low, high = chunk_size
+        if low <= 0 or high < low:
+            msg = "chunk sizes must be positive"
+            raise ValueError(msg)
+        rng = random.Random(seed)
+        stream = b"".join(record.frame for record in self.records)
+        starts = []
+        offset = 0
+        for record in self.records:
+            starts.append((offset, record.timestamp_ns))
+            offset += len(record.frame)
+
+        chunks = []
+        pos = 0
+        record_index = 0
+        while pos < len(stream):
+            size = low if low == high else rng.randint(low, high)
+            while record_index + 1 < len(starts) and starts[record_index + 1][0] <= pos:
+                record_index += 1
+            chunks.append((starts[record_index][1], stream[pos : pos + size]))
+            pos += size
+        return chunks
+
+    def run(
+        self,
+        client: BinanceFixConnector,
+        *,
+        chunk_size: int | tuple[int, int] | None = None,
+        seed: int = 0,
+        paced: bool = False,
+        speed: float = 1.0,
+        keep_messages: bool = False,
+    ) -> ReplayReport:
+        """
+        Replay the frames through the connector.
+
+        Args:
+        ----
+            client (BinanceFixConnector): The connector, its socket is replaced during the replay.
+            chunk_size (int | tuple[int, int] | None, optional): See `chunks`. Defaults to None.
+            seed (int, optional): The seed of the random read sizes. Defaults to 0.
+            paced (bool, optional): Wait between the reads as in the capture, instead of
+                replaying at full speed. Defaults to False.
+            speed (float, optional): Speed factor of a paced replay. Defaults to 1.0.
+            keep_messages (bool, optional): Keep the messages in the queue of received
+                messages of the connector, instead of dropping them after each read. Defaults to False.
+
+        Returns:
+        -------
+            ReplayReport: The number of messages and the time spent in every stage.
+
+        """
+        chunks = self.chunks(chunk_size, seed)
+        report = ReplayReport()
+        replay_socket = ReplaySocket()
+        framer = client.framer
+        stages = report.stages
+        saved = (client.sock, client.is_connected, client.replaying)
+        client.sock, client.is_connected, client.replaying = replay_socket, True, True
+        perf_counter = time.perf_counter
+        first_timestamp = chunks[0][0] if chunks else 0
+        start = perf_counter()
+        try:
+            for timestamp, chunk in chunks:
+                if paced:
+                    delay = (timestamp - first_timestamp) / 1e9 / speed
+                    delay -= perf_counter() - start
+                    if delay > 0:
+                        time.sleep(delay)
+                replay_socket.chunk = chunk
+                while replay_socket.chunk:
+                    t0 = perf_counter()
+                    report.bytes += framer.recv_into(replay_socket)
+                    t1 = perf_counter()
+                    messages = client.parse_server_response()
+                    t2 = perf_counter()
+                    if messages:
+                        client.on_message_received(messages)
+                        if not keep_messages:
+                            with client.queue_msg_received.mutex:
+                                client.queue_msg_received.queue.clear()
+                    t3 = perf_counter()
+                    stages["read"] += t1 - t0
+                    stages["parse"] += t2 - t1
+                    stages["dispatch"] += t3 - t2
+                    report.reads += 1
+                    report.messages += len(messages)
+        finally:
+            report.elapsed = perf_counter() - start
+            client.sock, client.is_connected, client.replaying = saved
+        return report
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from binance_fix_connector.timer_wheel import TimerHandle, TimerWheel, get_timer_wheel
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class SessionScheduler:
+    """
+    Threads shared by the sessions for the work that must not run on a receive thread.
+
+    `submit` runs a function on a small pool of worker threads, so the standby sessions
+    of a restart (TCP connect, TLS handshake, logon) are prepared in parallel while the
+    receive threads keep reading. `call_later` runs a function on the pool once a
+    deadline is reached: the deadlines of all the sessions are kept in a `TimerWheel`,
+    instead of a polling thread per session.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timer_wheel: TimerWheel | None = None,
+    ) -> None:
+        """
+        Create a scheduler, its threads are started when needed.
+
+        Args:
+        ----
+            max_workers (int, optional): Number of worker threads. Defaults to 8.
+            timer_wheel (TimerWheel | None, optional): The wheel keeping the deadlines,
+                stopped with the scheduler. Defaults to None (a new wheel).
+
+        """
+        self.max_workers: int = max_workers
+        self.timer_wheel: TimerWheel = timer_wheel or TimerWheel(
+            name="FixSessionSchedulerTimer"
+        )
+        self.logger = logging.getLogger("BinanceFixConnector")
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.timer_wheel)
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        """
+        Run `function(*args)` on a worker thread.
+
+        Args:
+        ----
+            function (Callable): The function to call.
+            *args (Any): The arguments of the function.
+
+        Returns:
+        -------
+            Future: The future of the result.
+
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="FixSessionScheduler"
+                )
+            executor = self._executor
+        return executor.submit(function, *args)
+
+    def call_later(
+        self, delay: float, callback: Callable[..., Any], *args: Any
+    ) -> TimerHandle:
+        """
+        Run `callback(*args)` on a worker thread in `delay` seconds.
+
+        Args:
+        ----
+            delay (float): Seconds to wait.
+            callback (Callable): The function to call.
+            *args (Any): The arguments of the function.
+
+        Returns:
+        -------
+            TimerHandle: The handle, to cancel the call.
+
+        """
+        return self.timer_wheel.call_later(delay, self._submit_call, callback, args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel the calls scheduled and stop the threads."""
+        self.timer_wheel.stop()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _submit_call(self, callback: Callable[..., Any], args: tuple) -> None:
+        self.submit(callback, *args).add_done_callback(self._log_error)
+
+    def _log_error(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error("Error in a scheduled call", exc_info=future.exception())
+
+
+_default_scheduler: SessionScheduler | None = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SessionScheduler:
+    """Return the scheduler shared by the sessions of the process."""
+    global _default_scheduler  # noqa: PLW0603
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = SessionScheduler(timer_wheel=get_timer_wheel())
+        return _default_scheduler
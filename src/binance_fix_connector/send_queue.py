@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+PRIORITY_SESSION = 0
+PRIORITY_CANCEL = 1
+PRIORITY_NORMAL = 2
+
+# Heartbeat, TestRequest, ResendRequest, SequenceReset, Logout and Logon.
+SESSION_MESSAGE_TYPES = frozenset((b"0", b"1", b"2", b"4", b"5", b"A"))
+# OrderCancelRequest and OrderMassCancelRequest.
+CANCEL_MESSAGE_TYPES = frozenset((b"F", b"q"))
+ORDER_CANCEL_REQUEST = b"F"
+ORDER_MASS_CANCEL_REQUEST = b"q"
+
+CL_ORD_ID = b"11"
+ORIG_CL_ORD_ID = b"41"
+SYMBOL = b"55"
+
+MAX_BATCH_SIZE = 64 * 1024
+
+
+def message_priority(message_type: bytes | None) -> int:
+    """
+    Return the priority of a message in the `SendQueue`, from its MsgType (35).
+
+    Args:
+    ----
+        message_type (bytes | None): The MsgType.
+
+    Returns:
+    -------
+        int: PRIORITY_SESSION, PRIORITY_CANCEL or PRIORITY_NORMAL.
+
+    """
+    if message_type in SESSION_MESSAGE_TYPES:
+        return PRIORITY_SESSION
+    if message_type in CANCEL_MESSAGE_TYPES:
+        return PRIORITY_CANCEL
+    return PRIORITY_NORMAL
+
+
+def order_keys(message: Any) -> tuple[tuple[bytes, bytes], ...]:
+    """
+    Return the orders a message creates, or the orders a cancel targets.
+
+    An order (any message with a ClOrdID 11) creates the orders of its ClOrdIDs and
+    Symbols (55); an OrderCancelRequest (F) targets its OrigClOrdID (41) and an
+    OrderMassCancelRequest (q) its Symbol.
+
+    Args:
+    ----
+        message (Any): A `FixMessage` or `FixMessageView`.
+
+    Returns:
+    -------
+        tuple[tuple[bytes, bytes], ...]: The (tag, value) keys, for `SendQueue.put`.
+
+    """
+    message_type = message.message_type
+    if message_type in SESSION_MESSAGE_TYPES:
+        return ()
+    if message_type == ORDER_CANCEL_REQUEST:
+        orig_cl_ord_id = message.get(ORIG_CL_ORD_ID)
+        return () if orig_cl_ord_id is None else ((CL_ORD_ID, orig_cl_ord_id),)
+    if message_type == ORDER_MASS_CANCEL_REQUEST:
+        symbol = message.get(SYMBOL)
+        return () if symbol is None else ((SYMBOL, symbol),)
+    keys = []
+    for tag in (CL_ORD_ID, SYMBOL):
+        nth = 1
+        value = message.get(tag, nth)
+        while value is not None:
+            keys.append((tag, value))
+            nth += 1
+            value = message.get(tag, nth)
+    return tuple(keys) if keys and keys[0][0] == CL_ORD_ID else ()
+
+
+class _QueuedOrder:
+    """Message of the normal deque with the keys of its orders."""
+
+    __slots__ = ("data", "keys")
+
+    def __init__(self, data: Any, keys: tuple) -> None:
+        self.data: Any = data
+        self.keys: tuple = keys
+
+
+class SendQueue:
+    """
+    Thread writing the messages of a session to its connection, by priority.
+
+    `put` only appends the message to a deque and wakes the writer thread when it is
+    idle, so the threads sending messages (including the receive thread answering
+    TestRequests) never wait for the socket. The writer takes the session messages
+    first, then the cancels, then the other messages (new orders...), and joins the
+    frames ready into a single write of at most `max_batch_size` bytes. A cancel put
+    with the keys of an order still queued (see `order_keys`) is queued behind it, so
+    it never reaches the server before the order it cancels.
+
+    With `encode`, the messages are queued unencoded and encoded by the writer in the
+    order they are written, so the fields assigned by `encode` (MsgSeqNum 34) follow
+    the order of the wire and not the order of `put`.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[bytes], object],
+        *,
+        encode: Callable[[Any], bytes] | None = None,
+        on_written: Callable[[list[bytes]], object] | None = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        name: str = "FixSendQueue",
+    ) -> None:
+        """
+        Create a send queue, started with `start`.
+
+        Args:
+        ----
+            write (Callable[[bytes], object]): Writes the data to the connection (e.g. `sock.sendall`).
+            encode (Callable[[Any], bytes] | None, optional): Encodes a message when the writer takes it.
+                Defaults to None (the messages are queued encoded).
+            on_written (Callable[[list[bytes]], object] | None, optional): Called by the writer with the
+                frames of every successful write. Defaults to None.
+            max_batch_size (int, optional): The maximum size of a write. Defaults to 64KiB.
+            name (str, optional): The name of the writer thread. Defaults to "FixSendQueue".
+
+        """
+        self.write = write
+        self.encode = encode
+        self.on_written = on_written
+        self.max_batch_size: int = max_batch_size
+        self.name: str = name
+        self.logger = logging.getLogger("BinanceFixConnector")
+        self.thread: threading.Thread | None = None
+        self._queues: tuple[deque[Any], ...] = (deque(), deque(), deque())
+        # Frame encoded for the previous batch but not fitting in it, written next.
+        self._carry: bytes | None = None
+        # Number of queued messages by order key, updated under _lock.
+        self._queued_keys: dict[tuple[bytes, bytes], int] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._running = False
+
+        self.frames: int = 0
+        self.writes: int = 0
+        self.bytes: int = 0
+        self.errors: int = 0
+
+    def __len__(self) -> int:
+        return sum(map(len, self._queues)) + (self._carry is not None)
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self._running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def put(self, data: Any, priority: int = PRIORITY_NORMAL, keys: tuple = ()) -> None:
+        """
+        Queue messages, to be written by the writer thread.
+
+        Args:
+        ----
+            data (Any): The encoded messages, or a message passed to `encode`.
+            priority (int, optional): PRIORITY_SESSION, PRIORITY_CANCEL or PRIORITY_NORMAL.
+                Defaults to PRIORITY_NORMAL.
+            keys (tuple, optional): The `order_keys` of the message: a cancel is queued
+                behind the messages queued with one of its keys. Defaults to ().
+
+        """
+        if keys and priority != PRIORITY_SESSION:
+            with self._lock:
+                queued = self._queued_keys
+                if priority == PRIORITY_NORMAL:
+                    for key in keys:
+                        queued[key] = queued.get(key, 0) + 1
+                    data = _QueuedOrder(data, keys)
+                elif any(key in queued for key in keys):
+                    priority = PRIORITY_NORMAL
+                self._queues[priority].append(data)
+        else:
+            self._queues[priority].append(data)
+        if not self._ready.is_set():
+            self._idle.clear()
+            self._ready.set()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait until the messages queued are written.
+
+        Args:
+        ----
+            timeout (float | None, optional): Seconds to wait. Defaults to None (forever).
+
+        Returns:
+        -------
+            bool: False if messages are still queued when the timeout expires.
+
+        """
+        if self.thread is None or not self.thread.is_alive():
+            return not len(self)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while len(self) or not self._idle.is_set():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._idle.wait(remaining)
+        return True
+
+    def stop(self, timeout: float | None = 5) -> None:
+        """Write the messages queued and stop the writer thread."""
+        if self.thread is None:
+            return
+        self.flush(timeout)
+        self._running = False
+        self._ready.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return the counters of the queue.
+
+        Returns
+        -------
+            dict[str, int]: frames queued, writes, bytes written, write errors and frames pending.
+
+        """
+        return {
+            "frames": self.frames,
+            "writes": self.writes,
+            "bytes": self.bytes,
+            "errors": self.errors,
+            "pending": len(self),
+        }
+
+    def _run(self) -> None:
+        while self._running:
+            self._ready.wait()
+            # Cleared before taking the frames: a frame put afterwards sets it again.
+            self._ready.clear()
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    break
+                data = batch[0] if len(batch) == 1 else b"".join(batch)
+                try:
+                    self.write(data)
+                except Exception:
+                    self.errors += 1
+                    self.logger.exception("Error sending message")
+                else:
+                    if self.on_written is not None:
+                        self._call_on_written(batch)
+                self.frames += len(batch)
+                self.writes += 1
+                self.bytes += len(data)
+            self._idle.set()
+            if len(self):  # put between the last batch and _idle.set
+                self._idle.clear()
+                self._ready.set()
+
+    def _call_on_written(self, batch: list[bytes]) -> None:
+        try:
+            self.on_written(batch)
+        except Exception:
+            self.logger.exception("Error in the write callback %r", self.on_written)
+
+    def _take_batch(self) -> list[bytes]:
+        batch: list[bytes] = []
+        size = 0
+        if self._carry is not None:
+            batch.append(self._carry)
+            size = len(self._carry)
+            self._carry = None
+        encode = self.encode
+        for queue in self._queues:
+            while queue:
+                if encode is None:
+                    item = queue[0]
+                    if type(item) is _QueuedOrder:
+                        item = item.data
+                    if batch and size + len(item) > self.max_batch_size:
+                        return batch
+                    data = self._take(queue)
+                else:
+                    try:
+                        data = encode(self._take(queue))
+                    except Exception:
+                        self.errors += 1
+                        self.logger.exception("Error sending message")
+                        continue
+                    if batch and size + len(data) > self.max_batch_size:
+                        # Already encoded (numbered): it must be the next frame written.
+                        self._carry = data
+                        return batch
+                batch.append(data)
+                size += len(data)
+        return batch
+
+    def _take(self, queue: deque[Any]) -> Any:
+        item = queue.popleft()
+        if type(item) is not _QueuedOrder:
+            return item
+        with self._lock:
+            queued = self._queued_keys
+            for key in item.keys:
+                count = queued[key] - 1
+                if count:
+                    queued[key] = count
+                else:
+                    del queued[key]
+        return item.data
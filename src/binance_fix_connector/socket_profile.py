@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import socket
+import sys
+
+# Not exported by the socket module, value from <asm-generic/socket.h>.
+SO_BUSY_POLL = getattr(socket, "SO_BUSY_POLL", 46 if sys.platform == "linux" else None)
+TCP_QUICKACK = getattr(socket, "TCP_QUICKACK", None)
+
+
+class SocketProfile:
+    """
+    Options applied to the TCP socket of a session, before the TLS handshake.
+
+    Options left to None keep the OS default. Options the platform does not support,
+    or that can not be set (SO_BUSY_POLL above `net.core.busy_read` requires
+    CAP_NET_ADMIN), are reported by `apply` instead of failing the connection.
+    """
+
+    __slots__ = ("busy_poll", "name", "quickack", "rcvbuf", "sndbuf", "tcp_nodelay")
+
+    def __init__(
+        self,
+        name: str = "custom",
+        *,
+        tcp_nodelay: bool | None = None,
+        rcvbuf: int | None = None,
+        sndbuf: int | None = None,
+        quickack: bool | None = None,
+        busy_poll: int | None = None,
+    ) -> None:
+        """
+        Create a socket profile.
+
+        Args:
+        ----
+            name (str, optional): The name reported in the metrics. Defaults to "custom".
+            tcp_nodelay (bool | None, optional): TCP_NODELAY, send small messages right away. Defaults to None.
+            rcvbuf (int | None, optional): SO_RCVBUF in bytes (disables the receive buffer auto-tuning on Linux).
+                Defaults to None.
+            sndbuf (int | None, optional): SO_SNDBUF in bytes. Defaults to None.
+            quickack (bool | None, optional): TCP_QUICKACK, acknowledge the data received right away.
+                Linux clears it after some acks, so the receive thread sets it again after each read.
+                Defaults to None.
+            busy_poll (int | None, optional): SO_BUSY_POLL, microseconds to busy poll the device queue
+                on reads (Linux). Defaults to None.
+
+        """
+        self.name: str = name
+        self.tcp_nodelay: bool | None = tcp_nodelay
+        self.rcvbuf: int | None = rcvbuf
+        self.sndbuf: int | None = sndbuf
+        self.quickack: bool | None = quickack
+        self.busy_poll: int | None = busy_poll
+
+    def __repr__(self) -> str:
+        return (
+            f"SocketProfile({self.name!r}, tcp_nodelay={self.tcp_nodelay}, "
+            f"rcvbuf={self.rcvbuf}, sndbuf={self.sndbuf}, quickack={self.quickack}, "
+            f"busy_poll={self.busy_poll})"
+        )
+
+    def options(self) -> list[tuple[str, int, int | None, int]]:
+        """Return the options to set as (name, level, option, value)."""
+        options = []
+        if self.tcp_nodelay is not None:
+            options.append(
+                (
+                    "TCP_NODELAY",
+                    socket.IPPROTO_TCP,
+                    socket.TCP_NODELAY,
+                    int(self.tcp_nodelay),
+                )
+            )
+        if self.rcvbuf is not None:
+            options.append(
+                ("SO_RCVBUF", socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+            )
+        if self.sndbuf is not None:
+            options.append(
+                ("SO_SNDBUF", socket.SOL_SOCKET, socket.SO_SNDBUF, self.sndbuf)
+            )
+        if self.quickack is not None:
+            options.append(
+                ("TCP_QUICKACK", socket.IPPROTO_TCP, TCP_QUICKACK, int(self.quickack))
+            )
+        if self.busy_poll is not None:
+            options.append(
+                ("SO_BUSY_POLL", socket.SOL_SOCKET, SO_BUSY_POLL, self.busy_poll)
+            )
+        return options
+
+    def apply(self, sock: socket.socket) -> dict[str, int | str]:
+        """
+        Set the options of the profile on a socket.
+
+        Args:
+        ----
+            sock (socket.socket): The connected TCP socket.
+
+        Returns:
+        -------
+            dict[str, int | str]: The value of each option read back from the socket (the kernel doubles
+            the buffer sizes), or why it could not be set.
+
+        """
+        applied: dict[str, int | str] = {"profile": self.name}
+        for name, level, option, value in self.options():
+            if option is None:
+                applied[name] = "unsupported"
+                continue
+            try:
+                sock.setsockopt(level, option, value)
+                applied[name] = sock.getsockopt(level, option)
+            except OSError as e:
+                applied[name] = f"error: {e.strerror or e}"
+        return applied
+
+
+SOCKET_PROFILES: dict[str, SocketProfile] = {
+    "low-latency": SocketProfile(
+        "low-latency", tcp_nodelay=True, quickack=True, busy_poll=50
+    ),
+    "high-throughput": SocketProfile(
+        "high-throughput",
+        tcp_nodelay=True,
+        rcvbuf=4 * 1024 * 1024,
+        sndbuf=1024 * 1024,
+    ),
+}
+
+
+def get_socket_profile(profile: SocketProfile | str | None) -> SocketProfile | None:
+    """
+    Return a socket profile from its name.
+
+    Args:
+    ----
+        profile (SocketProfile | str | None): A profile, or the name of a preset ("low-latency", "high-throughput").
+
+    Raises:
+    ------
+        ValueError: When the preset does not exist.
+
+    Returns:
+    -------
+        SocketProfile | None: The profile.
+
+    """
+    if profile is None or isinstance(profile, SocketProfile):
+        return profile
+    if profile not in SOCKET_PROFILES:
+        msg = f"Unknown socket profile {profile!r}, expected one of {', '.join(SOCKET_PROFILES)}"
+        raise ValueError(msg)
+    return SOCKET_PROFILES[profile]
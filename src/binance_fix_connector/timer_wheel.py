@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from typing import Any, Callable
+
+DEFAULT_TICK = 0.05
+DEFAULT_SLOTS = 1024
+
+
+class TimerHandle:
+    """Handle of a callback scheduled with `TimerWheel.call_later`."""
+
+    __slots__ = ("args", "callback", "cancelled", "deadline", "rounds")
+
+    def __init__(
+        self, deadline: float, callback: Callable[..., Any], args: tuple
+    ) -> None:
+        self.deadline: float = deadline
+        self.callback: Callable[..., Any] = callback
+        self.args: tuple = args
+        self.cancelled: bool = False
+        self.rounds: int = 0
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel running the timers of all the sessions from one thread.
+
+    The wheel has `slots` lists and advances one slot every `tick` seconds: a timer is
+    appended to the slot of its deadline, with the number of turns of the wheel left
+    before it expires, so scheduling and cancelling are O(1) whatever the number of
+    timers, and each tick only looks at the timers of one slot. Deadlines are rounded
+    up to the next tick. The callbacks run on the wheel thread and must not block:
+    work that may block is handed over to a `SessionScheduler`.
+    """
+
+    def __init__(
+        self,
+        tick: float = DEFAULT_TICK,
+        slots: int = DEFAULT_SLOTS,
+        name: str = "FixTimerWheel",
+    ) -> None:
+        """
+        Create a wheel, its thread is started by the first timer.
+
+        Args:
+        ----
+            tick (float, optional): Seconds between two slots. Defaults to 0.05.
+            slots (int, optional): Number of slots, one turn is `tick * slots` seconds. Defaults to 1024.
+            name (str, optional): Name of the wheel thread. Defaults to "FixTimerWheel".
+
+        Raises:
+        ------
+            ValueError: Raised when the tick or the number of slots is not positive.
+
+        """
+        if tick <= 0 or slots <= 0:
+            msg = f"Invalid timer wheel: tick {tick}, slots {slots}"
+            raise ValueError(msg)
+        self.tick: float = tick
+        self.name: str = name
+        self.logger = logging.getLogger("BinanceFixConnector")
+        self._slots: list[list[TimerHandle]] = [[] for _ in range(slots)]
+        self._condition = threading.Condition()
+        self._origin = time.monotonic()
+        self._tick_count = 0  # last tick processed
+        self._timers = 0  # timers in the slots, cancelled included
+        self._thread: threading.Thread | None = None
+        self._running = True
+
+    def __len__(self) -> int:
+        with self._condition:
+            return sum(
+                1 for slot in self._slots for timer in slot if not timer.cancelled
+            )
+
+    def call_later(
+        self, delay: float, callback: Callable[..., Any], *args: Any
+    ) -> TimerHandle:
+        """
+        Run `callback(*args)` on the wheel thread in `delay` seconds.
+
+        Args:
+        ----
+            delay (float): Seconds to wait.
+            callback (Callable): The function to call.
+            *args (Any): The arguments of the function.
+
+        Returns:
+        -------
+            TimerHandle: The handle, to cancel the call.
+
+        """
+        timer = TimerHandle(time.monotonic() + delay, callback, args)
+        with self._condition:
+            if not self._timers:
+                # The slots are empty: skip the ticks elapsed since the last timer.
+                self._tick_count = max(
+                    self._tick_count, int((time.monotonic() - self._origin) / self.tick)
+                )
+            target = math.ceil((timer.deadline - self._origin) / self.tick)
+            ticks = max(target - self._tick_count, 1)
+            timer.rounds = (ticks - 1) // len(self._slots)
+            self._slots[(self._tick_count + ticks) % len(self._slots)].append(timer)
+            self._timers += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._running = True
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+            elif self._timers == 1:  # the thread waits for a timer
+                self._condition.notify()
+        return timer
+
+    def stop(self) -> None:
+        """Cancel the timers and stop the thread."""
+        with self._condition:
+            self._running = False
+            for slot in self._slots:
+                for timer in slot:
+                    timer.cancel()
+                slot.clear()
+            self._timers = 0
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and not self._timers:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                remaining = (
+                    self._origin + (self._tick_count + 1) * self.tick - time.monotonic()
+                )
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._tick_count += 1
+                expired = self._expire(self._tick_count % len(self._slots))
+            for timer in sorted(expired, key=lambda t: t.deadline):
+                if timer.cancelled:
+                    continue
+                try:
+                    timer.callback(*timer.args)
+                except Exception:
+                    self.logger.exception("Error in a timer callback")
+
+    def _expire(self, index: int) -> list[TimerHandle]:
+        """Remove the expired and cancelled timers of a slot, return the expired ones."""
+        slot = self._slots[index]
+        if not slot:
+            return []
+        expired = []
+        pending = []
+        for timer in slot:
+            if timer.cancelled:
+                continue
+            if timer.rounds:
+                timer.rounds -= 1
+                pending.append(timer)
+            else:
+                expired.append(timer)
+        self._slots[index] = pending
+        self._timers -= len(slot) - len(pending)
+        return expired
+
+
+_default_timer_wheel: TimerWheel | None = None
+_default_timer_wheel_lock = threading.Lock()
+
+
+def get_timer_wheel() -> TimerWheel:
+    """Return the timer wheel shared by the sessions of the process."""
+    global _default_timer_wheel  # noqa: PLW0603
+    with _default_timer_wheel_lock:
+        if _default_timer_wheel is None:
+            _default_timer_wheel = TimerWheel()
+        return _default_timer_wheel
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import ssl
+import threading
+from typing import Callable
+
+
+class TLSContextCache:
+    """
+    SSL contexts and TLS sessions of the endpoints, shared by the sessions.
+
+    `ssl.create_default_context` loads the system CA store each time it is called, so
+    the context of an endpoint is created once and reused by every connection. The
+    TLS session of the last connection to an endpoint is kept as well: a new
+    connection offering it resumes the session (abbreviated handshake) when the
+    server accepts it, which shortens the downtime of reconnects and restarts.
+    """
+
+    def __init__(
+        self, create_context: Callable[[], ssl.SSLContext] | None = None
+    ) -> None:
+        """
+        Create an empty cache.
+
+        Args:
+        ----
+            create_context (Callable[[], ssl.SSLContext] | None, optional): Creates the context of an endpoint,
+                e.g. to use another CA bundle. Defaults to None (ssl.create_default_context).
+
+        """
+        self.create_context = create_context
+        self._lock = threading.Lock()
+        self._contexts: dict[str, ssl.SSLContext] = {}
+        self._sessions: dict[str, ssl.SSLSession] = {}
+
+    def get_context(self, endpoint: str) -> ssl.SSLContext:
+        """
+        Return the SSL context of an endpoint, created on the first call.
+
+        Args:
+        ----
+            endpoint (str): The server endpoint.
+
+        Returns:
+        -------
+            ssl.SSLContext: The context.
+
+        """
+        context = self._contexts.get(endpoint)
+        if context is None:
+            with self._lock:
+                context = self._contexts.get(endpoint)
+                if context is None:
+                    context = (
+                        self.create_context()
+                        if self.create_context is not None
+                        else ssl.create_default_context()
+                    )
+                    self._contexts[endpoint] = context
+        return context
+
+    def get_session(self, endpoint: str) -> ssl.SSLSession | None:
+        """Return the TLS session to resume for an endpoint, if any."""
+        return self._sessions.get(endpoint)
+
+    def save_session(self, endpoint: str, sock: ssl.SSLSocket | None) -> bool:
+        """
+        Keep the TLS session of a connection, to resume it on the next connection.
+
+        With TLS 1.3 the session tickets are sent by the server after the handshake,
+        so the session is only available once data was received.
+
+        Args:
+        ----
+            endpoint (str): The server endpoint.
+            sock (ssl.SSLSocket | None): The connection.
+
+        Returns:
+        -------
+            bool: False if the connection has no resumable session.
+
+        """
+        session = getattr(sock, "session", None)
+        if not isinstance(session, ssl.SSLSession):
+            return False
+        if not session.has_ticket and not session.id:
+            return False
+        self._sessions[endpoint] = session
+        return True
+
+    def clear(self) -> None:
+        """Forget the contexts and sessions, e.g. after the CA store changed."""
+        with self._lock:
+            self._contexts.clear()
+            self._sessions.clear()
+
+
+_default_tls_cache: TLSContextCache | None = None
+_default_tls_cache_lock = threading.Lock()
+
+
+def get_tls_cache() -> TLSContextCache:
+    """Return the SSL contexts and TLS sessions shared by the sessions of the process."""
+    global _default_tls_cache  # noqa: PLW0603
+    with _default_tls_cache_lock:
+        if _default_tls_cache is None:
+            _default_tls_cache = TLSContextCache()
+        return _default_tls_cache
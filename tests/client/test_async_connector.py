@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+import asyncio
+import logging
+import os
+import unittest
+from unittest.mock import patch
+
+from simplefix import FixMessage
+
+from binance_fix_connector.async_connector import AsyncBinanceFixConnector
+from binance_fix_connector.framer import FixFramer
+from binance_fix_connector.message import FixMessageView
+from binance_fix_connector.utils import get_private_key
+
+logging.basicConfig(level=logging.CRITICAL)
+
+PRIVATE_KEY = os.path.join(os.path.dirname(__file__), "../unit_test_key.pem")
+OPEN_CONNECTION = asyncio.open_connection
+
+
+def server_message(msg_type, seq_num, *pairs):
+    msg = FixMessage()
+    msg.append_pair(8, "FIX.4.4", header=True)
+    msg.append_pair(35, msg_type, header=True)
+    msg.append_pair(49, "SPOT", header=True)
+    msg.append_pair(56, "BMDWATCH", header=True)
+    msg.append_pair(34, seq_num, header=True)
+    for tag, value in pairs:
+        msg.append_pair(tag, value)
+    return msg.encode()
+
+
+class FakeServer:
+    """Plain TCP FIX server answering Logon (A) and recording what it receives."""
+
+    def __init__(self):
+        self.connections = []
+        self.received = asyncio.Queue()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        for _, writer in self.connections:
+            writer.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections.append((reader, writer))
+        framer = FixFramer()
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                return
+            framer.feed(data)
+            for frame in framer.frames():
+                msg = FixMessageView(frame)
+                await self.received.put((len(self.connections), msg))
+                if msg.message_type == b"A":
+                    writer.write(server_message("A", 1, (98, 0), (108, 30)))
+                elif msg.message_type == b"V":
+                    writer.write(
+                        server_message(
+                            "W", 2, (262, msg.get(262)), (268, 0), (55, "BNBUSDT")
+                        )
+                    )
+
+    def send(self, data, connection=-1):
+        self.connections[connection][1].write(data)
+
+    async def open_connection(self, host, port, **kwargs):
+        return await OPEN_CONNECTION("127.0.0.1", self.port)
+
+
+class TestAsyncBinanceFixConnector(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = FakeServer()
+        await self.server.start()
+        patcher = patch(
+            "binance_fix_connector.async_connector.asyncio.open_connection",
+            self.server.open_connection,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session = AsyncBinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=get_private_key(PRIVATE_KEY),
+            sender_comp_id="BMDWATCH",
+        )
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.stop()
+
+    async def next_received(self):
+        return await asyncio.wait_for(self.server.received.get(), 5)
+
+    async def test_logon_request_and_async_for(self):
+        await self.session.connect()
+        response = await self.session.logon()
+        self.assertEqual(b"A", response.message_type)
+        _, logon = await self.next_received()
+        self.assertEqual(b"BMDWATCH", logon.get(49))
+        self.assertEqual(b"1", logon.get(34))
+
+        msg = self.session.create_fix_message_with_basic_header("V")
+        msg.append_pair(262, "BOOK")
+        snapshot = await self.session.request(msg, md_req_id="BOOK", timeout=5)
+        self.assertEqual(b"W", snapshot.message_type)
+        self.assertEqual(b"BOOK", snapshot.get(262))
+
+        for seq_num in range(3, 6):
+            self.server.send(server_message("X", seq_num, (262, "BOOK")))
+        self.server.send(server_message("5", 6, (58, "Logout acknowledgment.")))
+        self.server.connections[-1][1].close()
+
+        received = [msg.message_type async for msg in self.session]
+        self.assertEqual([b"A", b"W", b"X", b"X", b"X", b"5"], received)
+        self.assertFalse(self.session.is_connected)
+
+    async def test_test_request_is_answered(self):
+        await self.session.connect()
+        await self.session.logon()
+        await self.next_received()
+        self.server.send(server_message("1", 2, (112, "PING")))
+        _, heartbeat = await self.next_received()
+        self.assertEqual(b"0", heartbeat.message_type)
+        self.assertEqual(b"PING", heartbeat.get(112))
+
+        self.assertIsNone(await self.session.wait_for(message_type="8", timeout=0.01))
+        self.assertEqual(
+            [b"A", b"1"],
+            [m.message_type for m in self.session.get_all_new_messages_received()],
+        )
+
+    async def test_liveness_runs_in_the_event_loop(self):
+        self.session.heart_bt_int = 1
+        await self.session.connect()
+        await self.session.logon()
+        await self.next_received()
+        self.assertIsInstance(self.session.liveness_timer, asyncio.TimerHandle)
+
+        # Nothing sent: a Heartbeat. Nothing received: a TestRequest, then the
+        # connection is closed as the server does not answer it.
+        received = []
+        while len(received) < 2:
+            _, msg = await self.next_received()
+            received.append(msg.message_type)
+        self.assertIn(b"0", received)
+        self.assertIn(b"1", received)
+        await asyncio.wait_for(self._closed(), 5)
+        self.assertIsNone(self.session.liveness_timer)
+
+    async def _closed(self):
+        while self.session.is_connected:
+            await asyncio.sleep(0.01)
+
+    async def test_retrieve_messages_until(self):
+        await self.session.connect()
+        logon_task = asyncio.create_task(self.session.logon())
+        messages = await self.session.retrieve_messages_until("A", timeout_seconds=5)
+        self.assertEqual([b"A"], [m.message_type for m in messages])
+        self.assertEqual(b"A", (await logon_task).message_type)
+
+        start = asyncio.get_running_loop().time()
+        self.assertEqual(
+            [], await self.session.retrieve_messages_until("8", timeout_seconds=0.05)
+        )
+        self.assertGreaterEqual(asyncio.get_running_loop().time() - start, 0.04)
+
+    async def test_restart_switches_to_the_new_connection(self):
+        await self.session.connect()
+        await self.session.logon()
+        received = []
+        self.session.add_handler("X", received.append)
+        subscription = self.session.create_fix_message_with_basic_header("V")
+        subscription.append_pair(262, "BOOK")
+        subscription.append_pair(263, 1)
+        subscription.append_pair(55, "BNBUSDT")
+        await self.session.request(subscription, md_req_id="BOOK", timeout=5)
+        sent = [(await self.next_received())[1].message_type for _ in range(2)]
+        self.assertEqual([b"A", b"V"], sent)
+        old_writer = self.session.writer
+
+        self.session.restart_flag = True
+        await self.session._restart(0)
+        self.assertIsNot(old_writer, self.session.writer)
+        self.assertTrue(old_writer.is_closing())
+        self.assertTrue(self.session.is_connected)
+        self.assertFalse(self.session.restart_flag)
+        self.assertFalse(self.session.standby)
+        self.assertEqual(2, len(self.server.connections))
+
+        # The new connection subscribed again to the stream.
+        connection, logon = await self.next_received()
+        self.assertEqual((2, b"A"), (connection, logon.message_type))
+        connection, resubscription = await self.next_received()
+        self.assertEqual((2, b"V"), (connection, resubscription.message_type))
+        self.assertEqual(
+            (b"BOOK", b"2"), (resubscription.get(262), resubscription.get(34))
+        )
+
+        # Answered by the receive task of the new connection, then sent by the
+        # session: one sequence.
+        self.server.send(server_message("1", 3, (112, "PING")), connection=1)
+        _, heartbeat = await self.next_received()
+        self.assertEqual((b"PING", b"3"), (heartbeat.get(112), heartbeat.get(34)))
+        self.session.heartbeat()
+        await self.session.drain()
+        connection, heartbeat = await self.next_received()
+        self.assertEqual((2, b"4"), (connection, heartbeat.get(34)))
+
+        self.server.send(server_message("X", 4, (262, "BOOK")), connection=1)
+        messages = await self.session.retrieve_messages_until("X", timeout_seconds=5)
+        self.assertEqual(
+            [b"A", b"W", b"W", b"1", b"X"], [m.message_type for m in messages]
+        )
+        self.assertEqual(1, len(received))
+
+    async def test_failed_restart_session_is_closed(self):
+        await self.session.connect()
+        await self.session.logon()
+        restart_sessions = []
+
+        async def fail_logon(session, *args, **kwargs):
+            restart_sessions.append(session)
+            raise asyncio.TimeoutError
+
+        self.session.schedule_restart()
+        with patch.object(AsyncBinanceFixConnector, "logon", fail_logon):
+            with self.assertLogs("BinanceFixConnector", "ERROR"):
+                await self.session.restart_task
+        self.assertIsNone(self.session.restart_session)
+        self.assertIsNone(self.session.restart_task)
+        self.assertIsNone(self.session.restart_time)
+        self.assertFalse(self.session.restart_flag)
+        self.assertTrue(self.session.is_connected)
+        self.assertFalse(restart_sessions[0].is_connected)
+        self.assertTrue(restart_sessions[0].writer.is_closing())
+
+    async def test_news_received_after_a_restart_schedules_the_next_one(self):
+        self.session.restart = True
+        await self.session.connect()
+        await self.session.logon()
+        self.session.restart_flag = True
+        await self.session._restart(0)
+
+        self.server.send(server_message("B", 2, (148, "Restart")), connection=1)
+        await self.session.wait_for(message_type="B", timeout=5)
+        self.assertTrue(self.session.restart_flag)
+        self.assertIsNotNone(self.session.restart_task)
+        self.session.restart_task.cancel()
+
+    async def test_conflated_stream_stays_out_of_the_queue(self):
+        await self.session.connect()
+        await self.session.logon()
+        await self.next_received()
+        conflation = self.session.add_conflation("BOOK")
+        msg = self.session.create_fix_message_with_basic_header("V")
+        msg.append_pair(262, "BOOK")
+        self.session.send_message(msg)
+        await self.next_received()
+        self.server.send(server_message("1", 3, (112, "PING")))
+        _, heartbeat = await self.next_received()
+        self.assertEqual(b"0", heartbeat.message_type)
+
+        self.assertEqual(
+            [b"A", b"1"],
+            [m.message_type for m in self.session.get_all_new_messages_received()],
+        )
+        self.assertEqual(["BNBUSDT"], [u.symbol for u in conflation.poll()])
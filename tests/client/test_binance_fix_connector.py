@@ -1,3 +1,4 @@
+import logging
 import unittest
 import threading
 import time
@@ -8,8 +9,11 @@ from binance_fix_connector.fix_connector import (
     BinanceFixConnector,
     FixMsgTypes,
     FixTags,
+    WIRE_LOGGER_NAME,
     _create_session,
 )
+from binance_fix_connector.scheduler import SessionScheduler
+from binance_fix_connector.timer_wheel import TimerHandle
 
 
 class TestFixSessionRestart(unittest.TestCase):
@@ -31,7 +35,9 @@ class TestFixSessionRestart(unittest.TestCase):
             fix_version="FIX.4.4",
             heart_bt_int=30,
             message_handling=2,
+            scheduler=SessionScheduler(),
         )
+        self.addCleanup(self.session.scheduler.shutdown)
 
         self.session.sock = MagicMock()
         self.session.is_connected = True
@@ -77,20 +83,19 @@ class TestFixSessionRestart(unittest.TestCase):
             self.assertTrue(self.session.restart_flag)
             self.assertIsNotNone(self.session.restart_time)
             self.assertIsNotNone(self.session.restart_timer)
-            self.assertIsInstance(self.session.restart_timer, threading.Thread)
+            self.assertIsInstance(self.session.restart_timer, TimerHandle)
+            self.assertIs(mock_new_session, self.session.restart_future.result(5))
+            self.assertIs(mock_new_session, self.session.restart_session)
+            self.assertEqual(1, len(self.session.scheduler))
 
     @patch("binance_fix_connector.fix_connector._create_session")
-    @patch("binance_fix_connector.fix_connector.threading.Thread")
     def test_multiple_news_messages_dont_create_multiple_timers(
-        self, mock_thread, mock_create_session
+        self, mock_create_session
     ):
         """Test that multiple NEWS messages don't create multiple timers."""
         mock_new_session = MagicMock()
         mock_create_session.return_value = mock_new_session
 
-        mock_thread_instance = MagicMock()
-        mock_thread.return_value = mock_thread_instance
-
         news_msg = self.create_mock_message(
             FixMsgTypes.NEWS, {148: "Server restart scheduled in 10 minutes"}
         )
@@ -106,31 +111,49 @@ class TestFixSessionRestart(unittest.TestCase):
             second_timer = self.session.restart_timer
 
             self.assertIs(first_timer, second_timer)
-            self.assertEqual(mock_thread.call_count, 1)
+            self.session.restart_future.result(5)
+            self.assertEqual(mock_create_session.call_count, 1)
+            self.assertEqual(1, len(self.session.scheduler))
 
-    @patch("binance_fix_connector.fix_connector.time.sleep")
-    def test_reconnect_performs_proper_restart(self, mock_sleep):
-        """Test that reconnect properly restarts the session."""
-        mock_new_session = MagicMock()
-        mock_new_session.connect = MagicMock()
-        mock_new_session.is_connected = True
-        mock_new_session.msg_seq_num = 100
-        mock_new_session.sock = MagicMock()
-        mock_new_session.queue_msg_received = MagicMock()
-        mock_new_session.messages_sent = []
+    def test_reconnect_performs_proper_restart(self):
+        """Test that reconnect switches to the restart session without reconnecting it."""
+        new_session = BinanceFixConnector(
+            api_key=self.api_key,
+            private_key=self.private_key,
+            endpoint=self.endpoint,
+            sender_comp_id=self.sender_comp_id,
+        )
+        new_session.connect = MagicMock()
+        new_session.is_connected = True
+        new_session.msg_seq_num = 100
+        new_session.sock = MagicMock()
+        new_session.queue_msg_received = self.session.queue_msg_received
+        self.session.queue_msg_received.put("received before the restart")
+        new_session.standby = True
 
         self.session.restart_flag = True
-        self.session.restart_session = mock_new_session
+        self.session.restart_session = new_session
         self.session.msg_seq_num = 50
         self.session.disconnect = MagicMock()
         self.session.reconnect()
         self.session.disconnect.assert_called_once()
 
-        mock_new_session.connect.assert_called_once()
+        new_session.connect.assert_not_called()
 
         self.assertEqual(self.session.msg_seq_num, 100)
+        self.assertIs(self.session.sock, new_session.sock)
+        self.assertFalse(self.session.standby)
         self.assertFalse(self.session.restart_flag)
         self.assertIsNone(self.session.restart_time)
+        self.assertEqual(
+            "received before the restart", self.session.queue_msg_received.get_nowait()
+        )
+
+        # Messages sent or received through either object update the same session.
+        self.session.heartbeat()
+        new_session.heartbeat()
+        self.assertEqual(102, new_session.msg_seq_num)
+        self.assertEqual(102, self.session.msg_seq_num)
 
     @patch("binance_fix_connector.fix_connector._create_session")
     def test_restart_preserves_session_settings(self, mock_create_session):
@@ -152,6 +175,7 @@ class TestFixSessionRestart(unittest.TestCase):
             mock_datetime.now.return_value = mock_now
 
             self.session.on_message_received([news_msg])
+            self.session.restart_future.result(5)
 
             mock_create_session.assert_called_once()
 
@@ -167,45 +191,52 @@ class TestFixSessionRestart(unittest.TestCase):
             self.assertEqual(call_args.kwargs["drop_copy_flag"], "Y")
 
     @patch("binance_fix_connector.fix_connector._create_session")
-    @patch("binance_fix_connector.fix_connector.threading.Thread")
-    def test_timer_thread_is_daemon(self, mock_thread, mock_create_session):
-        """Test that the timer thread is created as a daemon."""
-        mock_new_session = MagicMock()
-        mock_create_session.return_value = mock_new_session
+    def test_restart_session_created_off_the_receive_thread(self, mock_create_session):
+        """Test that the restart session is connected by the scheduler, not the caller."""
+        created = threading.Event()
+        release = threading.Event()
+
+        def create_session(**kwargs):
+            created.set()
+            release.wait(5)
+            return MagicMock()
+
+        mock_create_session.side_effect = create_session
         news_msg = self.create_mock_message(
             FixMsgTypes.NEWS, {148: "Server restart scheduled in 10 minutes"}
         )
 
-        with patch("binance_fix_connector.fix_connector.datetime") as mock_datetime:
-            mock_now = datetime(2024, 1, 1, 12, 0, 0)
-            mock_datetime.now.return_value = mock_now
+        self.session.on_message_received([news_msg])
+        # The receive thread is not blocked by the connection of the restart session.
+        self.assertTrue(created.wait(5))
+        self.assertIsNone(self.session.restart_session)
+        release.set()
+        self.session.restart_future.result(5)
+        self.assertIsNotNone(self.session.restart_session)
 
-            self.session.on_message_received([news_msg])
+    @patch("binance_fix_connector.fix_connector._create_session")
+    def test_failed_restart_session_cancels_the_restart(self, mock_create_session):
+        """Test that the restart is cancelled when the restart session can not connect."""
+        mock_create_session.side_effect = OSError("Connection refused")
 
-            mock_thread.assert_called_once()
-            args, kwargs = mock_thread.call_args
-            self.assertTrue(kwargs.get("daemon", False))
+        self.session.schedule_restart()
+        with self.assertRaises(OSError):
+            self.session.restart_future.result(5)
+        self.assertFalse(self.session.restart_flag)
+        self.assertTrue(self.session.restart_timer.cancelled)
+        self.assertEqual(0, len(self.session.scheduler))
 
-    @patch("binance_fix_connector.fix_connector.time.sleep")
-    def test_restart_timer_triggers_reconnect(self, mock_sleep):
-        """Test that the timer thread calls reconnect after 10 minutes."""
+    def test_restart_timer_triggers_reconnect(self):
+        """Test that the scheduled call performs the restart."""
         self.session.restart_flag = True
-        base_time = datetime(2024, 1, 1, 12, 0, 0)
-        future_time = base_time + timedelta(minutes=10)
-        self.session.restart_time = future_time
-
         self.session.reconnect = MagicMock()
 
-        with patch("binance_fix_connector.fix_connector.datetime") as mock_datetime:
-            mock_datetime.now.side_effect = [
-                base_time,
-                future_time + timedelta(seconds=1),
-            ]
-
-            self.session._restart_timer_thread()
-            self.session.reconnect.assert_called_once()
+        self.session._restart()
+        self.session.reconnect.assert_called_once()
 
-            mock_sleep.assert_called()
+        self.session.restart_flag = False
+        self.session._restart()
+        self.session.reconnect.assert_called_once()
 
     @patch("binance_fix_connector.fix_connector._create_session")
     def test_news_message_does_not_trigger_restart_when_disabled(
@@ -279,5 +310,55 @@ class TestFixSessionRestart(unittest.TestCase):
         session_no_restart.disconnect.assert_called_once()
 
 
+class TestWireLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.session = BinanceFixConnector(
+            api_key="test_api_key",
+            private_key=MagicMock(),
+            endpoint="test.endpoint.com",
+            sender_comp_id="TEST123",
+        )
+        self.session.sock = MagicMock()
+        self.wire_logger = logging.getLogger(WIRE_LOGGER_NAME)
+        self.addCleanup(self.wire_logger.setLevel, self.wire_logger.level)
+
+    def new_message(self):
+        msg = self.session.create_fix_message_with_basic_header("0")
+        msg.append_pair(112, "TEST")
+        return msg
+
+    def test_message_encoded_once_and_logged(self):
+        msg = self.new_message()
+        with (
+            patch.object(
+                type(msg), "encode", autospec=True, side_effect=type(msg).encode
+            ) as encode_mock,
+            self.assertLogs(WIRE_LOGGER_NAME, logging.INFO) as logs,
+        ):
+            self.session.send_message(msg)
+
+        data = self.session.sock.sendall.call_args[0][0]
+        encode_mock.assert_not_called()
+        self.assertEqual(1, len(logs.records))
+        text = data[:-1].decode("utf-8").replace("\x01", "|")
+        self.assertIn(f"Client=>Server: {text}", logs.output[0])
+
+    def test_no_formatting_when_wire_logging_is_disabled(self):
+        self.wire_logger.setLevel(logging.WARNING)
+        msg = self.new_message()
+        with (
+            patch("binance_fix_connector.fix_connector.WireFrame") as wire_frame_mock,
+            patch.object(
+                type(msg), "encode", autospec=True, side_effect=type(msg).encode
+            ) as encode_mock,
+        ):
+            self.session.send_message(msg)
+
+        self.session.sock.sendall.assert_called_once()
+        wire_frame_mock.assert_not_called()
+        encode_mock.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
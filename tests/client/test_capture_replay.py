@@ -0,0 +1,116 @@
+import logging
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from simplefix import FixMessage
+
+from binance_fix_connector.capture import INBOUND, OUTBOUND, CaptureRecord
+from binance_fix_connector.fix_connector import WIRE_LOGGER_NAME, BinanceFixConnector
+from binance_fix_connector.replay import CaptureReplay
+
+
+def depth_update(seq_num, price):
+    msg = FixMessage()
+    msg.append_pair(8, "FIX.4.4", header=True)
+    msg.append_pair(35, "X", header=True)
+    msg.append_pair(49, "SPOT", header=True)
+    msg.append_pair(56, "BMDWATCH", header=True)
+    msg.append_pair(34, seq_num, header=True)
+    msg.append_pair(262, "DEPTH_STREAM")
+    msg.append_pair(268, 1)
+    msg.append_pair(279, 1)
+    msg.append_pair(269, 0)
+    msg.append_pair(270, price)
+    msg.append_pair(271, "1.5")
+    msg.append_pair(55, "BNBUSDT")
+    return msg.encode()
+
+
+def build_test_request(seq_num):
+    return server_message("1", seq_num, (112, "TEST"))
+
+
+def server_message(msg_type, seq_num, *pairs):
+    msg = FixMessage()
+    msg.append_pair(8, "FIX.4.4", header=True)
+    msg.append_pair(35, msg_type, header=True)
+    msg.append_pair(34, seq_num, header=True)
+    for tag, value in pairs:
+        msg.append_pair(tag, value)
+    return msg.encode()
+
+
+class TestCaptureReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = [depth_update(i, 600 + i) for i in range(2, 52)]
+        self.frames.insert(10, build_test_request(100))
+        self.records = [
+            CaptureRecord(INBOUND, i * 1_000_000, "A", frame)
+            for i, frame in enumerate(self.frames)
+        ]
+        self.records.insert(5, CaptureRecord(OUTBOUND, 1, "A", b"sent"))
+        self.records.append(CaptureRecord(INBOUND, 1, "B", self.frames[0]))
+        self.client = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BMDWATCH",
+            socket_buffer_size=64,
+        )
+        self.client.logger = MagicMock()
+        wire_logger = logging.getLogger(WIRE_LOGGER_NAME)
+        self.addCleanup(wire_logger.setLevel, wire_logger.level)
+        wire_logger.setLevel(logging.WARNING)
+        self.client.sock = MagicMock()
+
+    def test_every_fragmentation_gives_the_same_messages(self):
+        replay = CaptureReplay(self.records, session_id="A")
+        self.assertEqual(len(self.frames), len(replay.records))
+        for chunk_size in (None, 1, 7, 64, 100000, (1, 300)):
+            report = replay.run(self.client, chunk_size=chunk_size, keep_messages=True)
+            messages = self.client.get_all_new_messages_received()
+            self.assertEqual(self.frames, [msg.frame for msg in messages], chunk_size)
+            self.assertEqual(len(self.frames), report.messages)
+            self.assertEqual(sum(map(len, self.frames)), report.bytes)
+            self.assertEqual(set(report.stages), {"read", "parse", "dispatch"})
+            self.assertGreater(report.messages_per_second, 0)
+            self.assertEqual(0, len(self.client.framer))
+
+    def test_connector_is_restored_and_answers_test_requests(self):
+        sock = self.client.sock
+        CaptureReplay(self.records).run(self.client, chunk_size=5)
+        self.assertIs(sock, self.client.sock)
+        self.assertFalse(self.client.is_connected)
+        self.assertTrue(self.client.restart)
+        self.assertEqual(0, self.client.queue_msg_received.qsize())
+        sock.sendall.assert_not_called()
+        self.assertEqual(b"TEST", self.client.messages_sent[-1].get(112))
+
+    def test_session_messages_of_the_capture_are_not_acted_on(self):
+        frames = [server_message("B", 2, (148, "Restart")), server_message("5", 3)]
+        records = [CaptureRecord(INBOUND, i, "A", f) for i, f in enumerate(frames)]
+        sock = self.client.sock
+        for restart in (True, False):
+            self.client.restart = restart
+            report = CaptureReplay(records).run(self.client)
+            self.assertEqual(2, report.messages)
+            self.assertFalse(self.client.restart_flag)
+            self.assertFalse(self.client.replaying)
+            self.assertEqual(restart, self.client.restart)
+            self.assertEqual([], self.client.messages_sent)
+            self.assertIs(sock, self.client.sock)
+            sock.close.assert_not_called()
+
+    def test_paced_replay(self):
+        records = self.records[:4]
+        start = time.perf_counter()
+        report = CaptureReplay(records).run(self.client, paced=True, speed=2)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.0015)
+        self.assertEqual(4, report.messages)
+        self.assertIn("messages/s", str(report))
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            CaptureReplay(self.records).chunks((10, 5))
@@ -0,0 +1,124 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from binance_fix_connector.correlation import CorrelationEngine
+from binance_fix_connector.fix_connector import BinanceFixConnector
+from binance_fix_connector.message import FixMessageView
+from binance_fix_connector.timer_wheel import TimerWheel
+
+NEW = FixMessageView(
+    b"8=FIX.4.4\x019=40\x0135=8\x0134=2\x0111=ORDER1\x0139=0\x01150=0\x0155=BNBUSDT\x0110=000\x01"
+)
+CANCELED = FixMessageView(
+    b"8=FIX.4.4\x019=40\x0135=8\x0134=3\x0111=CANCEL1\x0141=ORDER1\x0139=4\x0110=000\x01"
+)
+SNAPSHOT = FixMessageView(
+    b"8=FIX.4.4\x019=30\x0135=W\x0134=4\x01262=BOOK_TICKER\x01268=0\x0110=000\x01"
+)
+
+
+class TestCorrelationEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = CorrelationEngine()
+
+    def test_futures_completed_by_matching_message(self):
+        order = self.engine.expect(11, "ORDER1")
+        order_again = self.engine.expect("11", b"ORDER1")
+        cancel = self.engine.expect(41, "ORDER1")
+        report = self.engine.expect(35, "8")
+        book = self.engine.expect(262, "BOOK_TICKER")
+        self.assertEqual(5, len(self.engine))
+
+        self.assertEqual(0, self.engine.dispatch(FixMessageView(b"35=0\x01")))
+        self.assertEqual(3, self.engine.dispatch(NEW))
+        self.assertIs(NEW, order.result(0))
+        self.assertIs(NEW, order_again.result(0))
+        self.assertIs(NEW, report.result(0))
+        self.assertFalse(cancel.done())
+
+        self.assertEqual(1, self.engine.dispatch(CANCELED))
+        self.assertIs(CANCELED, cancel.result(0))
+        self.assertEqual(1, self.engine.dispatch(SNAPSHOT))
+        self.assertIs(SNAPSHOT, book.result(0))
+        self.assertEqual(0, len(self.engine))
+        self.assertEqual(0, self.engine.dispatch(NEW))
+
+    def test_cancelled_and_timed_out_futures_are_removed(self):
+        future = self.engine.expect(11, "ORDER1")
+        self.assertTrue(future.cancel())
+        self.assertIsNone(self.engine.wait(11, "ORDER1", timeout=0.001))
+        self.assertEqual(0, len(self.engine))
+        self.assertEqual(0, self.engine.dispatch(NEW))
+
+        pending = [self.engine.expect(35, "8"), self.engine.expect(262, "X")]
+        self.engine.cancel_all()
+        self.assertTrue(all(f.cancelled() for f in pending))
+        self.assertEqual(0, len(self.engine))
+
+    def test_pending_request_timeout(self):
+        engine = CorrelationEngine(TimerWheel(tick=0.01))
+        answered = engine.expect(11, "ORDER1", timeout=5)
+        expired = engine.expect(11, "ORDER2", timeout=0.02)
+        with self.assertRaises(TimeoutError):
+            expired.result(5)
+        self.assertEqual(1, len(engine))
+        self.assertEqual(1, engine.dispatch(NEW))
+        self.assertIs(NEW, answered.result(0))
+        self.assertEqual(0, len(engine.timer_wheel))
+
+    def test_waiter_woken_by_receive_thread(self):
+        future = self.engine.expect(11, "ORDER1")
+        sent = []
+
+        def receive():
+            time.sleep(0.01)
+            sent.append(time.perf_counter())
+            self.engine.dispatch(NEW)
+
+        thread = threading.Thread(target=receive)
+        thread.start()
+        self.assertIs(NEW, future.result(timeout=5))
+        woken = time.perf_counter()
+        thread.join()
+        self.assertLess(woken - sent[0], 0.05)
+
+
+class TestConnectorCorrelation(unittest.TestCase):
+
+    def setUp(self):
+        self.client = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BOETRADE",
+        )
+        self.client.logger = MagicMock()
+
+    def test_expect_response(self):
+        order = self.client.expect_response(cl_ord_id="ORDER1")
+        cancel = self.client.expect_response(orig_cl_ord_id="ORDER1")
+        self.client.on_message_received([SNAPSHOT, NEW, CANCELED])
+        self.assertIs(NEW, order.result(0))
+        self.assertIs(CANCELED, cancel.result(0))
+        with self.assertRaises(ValueError):
+            self.client.expect_response()
+        with self.assertRaises(ValueError):
+            self.client.expect_response(cl_ord_id="A", md_req_id="B")
+
+    def test_retrieve_messages_until_wakes_on_message(self):
+        timer = threading.Timer(0.02, self.client.on_message_received, [[NEW]])
+        timer.start()
+        start = time.monotonic()
+        messages = self.client.retrieve_messages_until("8", timeout_seconds=5)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual([NEW], messages)
+
+    def test_retrieve_messages_until_timeout(self):
+        self.client.on_message_received([SNAPSHOT])
+        start = time.monotonic()
+        messages = self.client.retrieve_messages_until("8", timeout_seconds=0.05)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual([SNAPSHOT], messages)
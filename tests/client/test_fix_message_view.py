@@ -0,0 +1,70 @@
+import unittest
+
+from simplefix import FixMessage
+
+from binance_fix_connector.message import FixMessageView
+
+DEPTH = b"8=FIX.4.4\x019=0000216\x0135=X\x0149=SPOT\x0156=BMDWATCH\x0134=3\x0152=20250301-01:00:00.001000\x01262=DEPTH_STREAM\x01268=2\x01279=1\x01269=0\x01270=638.54000000\x01271=11.76700000\x0155=BNBUSDT\x0125043=7517775\x0125044=7517775\x01279=2\x01269=1\x01270=638.55000000\x0110=021\x01"
+
+
+def simplefix_message(frame):
+    msg = FixMessage()
+    for field in frame.split(b"\x01")[:-1]:
+        tag, _, value = field.partition(b"=")
+        msg.append_pair(tag, value)
+    return msg
+
+
+class TestFixMessageView(unittest.TestCase):
+
+    def setUp(self):
+        self.msg = FixMessageView(DEPTH)
+        self.expected = simplefix_message(DEPTH)
+
+    def test_header_fields(self):
+        self.assertEqual(b"X", self.msg.message_type)
+        self.assertEqual(b"FIX.4.4", self.msg.begin_string)
+        self.assertEqual(b"0000216", self.msg.get(9))
+        self.assertEqual(b"021", self.msg.get("10"))
+
+    def test_same_values_as_simplefix(self):
+        for tag in (8, 35, 262, 268, 279, 269, 270, 271, 55, 25043, 25044, 10, 999):
+            for nth in (1, 2, 3):
+                self.assertEqual(
+                    self.expected.get(tag, nth), self.msg.get(tag, nth), (tag, nth)
+                )
+                self.assertEqual(
+                    self.expected.get(str(tag), nth),
+                    self.msg.get(str(tag), nth),
+                    (tag, nth),
+                )
+
+    def test_first_value_does_not_build_the_index(self):
+        self.assertEqual(b"DEPTH_STREAM", self.msg.get(262))
+        self.assertEqual(b"1", self.msg.get(279))
+        self.assertIsNone(self.msg._index)
+        self.assertEqual(b"2", self.msg.get(279, 2))
+        self.assertIsNotNone(self.msg._index)
+        self.assertEqual(b"1", self.msg.get(279))
+
+    def test_tag_is_not_matched_as_value_suffix(self):
+        self.assertIsNone(self.msg.get(43))
+        self.assertIsNone(self.msg.get(5))
+
+    def test_get_all(self):
+        self.assertEqual([b"638.54000000", b"638.55000000"], self.msg.get_all(270))
+        self.assertEqual([], self.msg.get_all(999))
+
+    def test_simplefix_compatible_api(self):
+        self.assertEqual(self.expected.pairs, self.msg.pairs)
+        self.assertEqual(self.expected.count(), self.msg.count())
+        self.assertEqual(list(self.expected), list(self.msg))
+        self.assertEqual(str(self.expected), str(self.msg))
+        self.assertEqual(DEPTH, self.msg.encode())
+        self.assertEqual(self.msg, self.expected)
+        self.assertIn(262, self.msg)
+        self.assertNotIn(999, self.msg)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import patch
+
+from binance_fix_connector.framer import FixFramer
+
+HEARTBEAT = b"8=FIX.4.4\x019=58\x0135=0\x0149=SPOT\x0156=BMDWATCH\x0134=2\x0152=20250301-01:00:00.001000\x0110=217\x01"
+LOGOUT = b"8=FIX.4.4\x019=84\x0135=5\x0134=4\x0149=SPOT\x0152=20250301-01:00:00.002000\x0156=GhQHzrLR\x0158=Logout acknowledgment.\x0110=212\x01"
+
+
+class TestFixFramer(unittest.TestCase):
+
+    def setUp(self):
+        self.framer = FixFramer()
+
+    def test_single_frame(self):
+        self.framer.feed(HEARTBEAT)
+        self.assertEqual([HEARTBEAT], self.framer.frames())
+        self.assertEqual(0, len(self.framer))
+
+    def test_several_frames_in_one_read(self):
+        self.framer.feed(HEARTBEAT + LOGOUT + HEARTBEAT)
+        self.assertEqual([HEARTBEAT, LOGOUT, HEARTBEAT], self.framer.frames())
+
+    def test_frame_split_across_reads(self):
+        data = HEARTBEAT + LOGOUT
+        for i in range(len(data)):
+            framer = FixFramer()
+            framer.feed(data[:i])
+            first = framer.frames()
+            framer.feed(data[i:])
+            second = framer.frames()
+            self.assertEqual([HEARTBEAT, LOGOUT], first + second, f"split at {i}")
+            self.assertEqual(0, len(framer))
+
+    def test_partial_frame_is_kept(self):
+        self.framer.feed(LOGOUT + HEARTBEAT[:20])
+        self.assertEqual([LOGOUT], self.framer.frames())
+        self.assertEqual(HEARTBEAT[:20], self.framer.pending())
+
+    def test_garbage_before_begin_string_is_discarded(self):
+        self.framer.feed(b"garbage\x01" + HEARTBEAT)
+        self.assertEqual([HEARTBEAT], self.framer.frames())
+        self.assertEqual(8, self.framer.discarded_bytes)
+
+    def test_wrong_body_length_falls_back_to_trailer(self):
+        wrong = HEARTBEAT.replace(b"9=58", b"9=40")
+        self.framer.feed(wrong + LOGOUT)
+        self.assertEqual([wrong, LOGOUT], self.framer.frames())
+        self.assertEqual(1, self.framer.body_length_mismatches)
+
+
+class FakeSocket:
+    def __init__(self, data, chunk_size):
+        self.chunks = [
+            data[i : i + chunk_size] for i in range(0, len(data), chunk_size)
+        ]
+
+    def recv_into(self, buffer):
+        if not self.chunks:
+            return 0
+        chunk = self.chunks[0][: len(buffer)]
+        self.chunks[0] = self.chunks[0][len(chunk) :]
+        if not self.chunks[0]:
+            self.chunks.pop(0)
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+class TestFixFramerReceiveBuffer(unittest.TestCase):
+
+    def test_recv_into_reuses_the_buffer(self):
+        sock = FakeSocket((HEARTBEAT + LOGOUT) * 100, 64)
+        framer = FixFramer(initial_size=1024)
+        frames = []
+        while framer.recv_into(sock):
+            frames += framer.frames()
+        self.assertEqual([HEARTBEAT, LOGOUT] * 100, frames)
+        stats = framer.stats()
+        self.assertEqual(1024, stats["buffer_size"])
+        self.assertEqual(0, stats["grows"])
+        self.assertEqual(200, stats["frames"])
+        self.assertLess(stats["bytes_copied"], stats["bytes_received"])
+
+    def test_large_frame_grows_the_buffer(self):
+        body = b"35=W\x01" + b"269=0\x01270=1.0\x01271=2.0\x01" * 2000
+        frame = b"8=FIX.4.4\x019=%d\x01" % len(body) + body + b"10=000\x01"
+        sock = FakeSocket(frame, 4096)
+        framer = FixFramer(initial_size=256)
+        frames = []
+        while framer.recv_into(sock):
+            frames += framer.frames()
+        self.assertEqual([frame], frames)
+        self.assertGreaterEqual(len(framer.buffer), len(frame))
+        self.assertGreater(framer.grows, 0)
+        self.assertLess(framer.bytes_copied, 2 * len(frame))
+
+    def test_incomplete_frame_scanned_once(self):
+        body = b"35=W\x01" + b"269=0\x01270=1.0\x01271=2.0\x01" * 20000
+        frame = b"8=FIX.4.4\x019=%d\x01" % len(body) + body + b"10=000\x01"
+        sock = FakeSocket(frame + HEARTBEAT, 16384)
+        framer = FixFramer()
+        scanned = []
+        scan_trailer = FixFramer._scan_trailer
+
+        def count_scan(buf, pos, end):
+            scanned.append(end - pos)
+            return scan_trailer(buf, pos, end)
+
+        frames = []
+        with patch.object(FixFramer, "_scan_trailer", staticmethod(count_scan)):
+            while framer.recv_into(sock):
+                frames += framer.frames()
+        self.assertEqual([frame, HEARTBEAT], frames)
+        self.assertLess(sum(scanned), len(frame) + 16 * len(scanned))
+
+    def test_too_large_body_length_recovered_across_reads(self):
+        wrong = LOGOUT.replace(b"9=84", b"9=999")
+        data = wrong + HEARTBEAT
+        framer = FixFramer()
+        frames = []
+        for i in range(0, len(data), 5):
+            framer.feed(data[i : i + 5])
+            frames += framer.frames()
+        self.assertEqual([wrong, HEARTBEAT], frames)
+        self.assertEqual(1, framer.body_length_mismatches)
+
+    def test_frame_larger_than_max_size(self):
+        framer = FixFramer(initial_size=64, max_size=128)
+        with self.assertRaises(BufferError):
+            framer.feed(LOGOUT)
+            framer.feed(LOGOUT)
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            FixFramer(initial_size=1024, max_size=512)
+
+
+if __name__ == "__main__":
+    unittest.main()
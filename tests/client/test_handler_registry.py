@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from binance_fix_connector.dispatch import HandlerRegistry
+from binance_fix_connector.fix_connector import (
+    BinanceFixConnector,
+    create_drop_copy_session,
+    create_market_data_session,
+    create_order_entry_session,
+)
+from binance_fix_connector.message import FixMessageView
+
+BOOK_TICKER = FixMessageView(
+    b"8=FIX.4.4\x019=1\x0135=X\x0134=2\x01262=BOOK_TICKER\x01268=1\x01279=1\x01269=0\x01270=1\x0155=BNBUSDT\x0110=000\x01"
+)
+DEPTH = FixMessageView(
+    b"8=FIX.4.4\x019=1\x0135=X\x0134=3\x01262=DEPTH\x01268=1\x01279=1\x01269=0\x01270=1\x0155=ETHUSDT\x0110=000\x01"
+)
+EXECUTION_REPORT = FixMessageView(
+    b"8=FIX.4.4\x019=1\x0135=8\x0134=4\x0111=ORDER1\x0155=BNBUSDT\x0110=000\x01"
+)
+
+
+class TestHandlerRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = HandlerRegistry()
+        self.calls = []
+
+    def handler(self, name):
+        return lambda msg: self.calls.append((name, msg.get(34)))
+
+    def test_handlers_selected_by_type_md_req_id_and_symbol(self):
+        self.registry.add("X", self.handler("all"))
+        self.registry.add(b"X", self.handler("book"), md_req_id="BOOK_TICKER")
+        self.registry.add("X", self.handler("eth"), symbol="ETHUSDT")
+        self.registry.add("X", self.handler("none"), md_req_id="DEPTH", symbol="BNB")
+        self.registry.add("8", self.handler("report"), symbol=b"BNBUSDT")
+        self.assertEqual(5, len(self.registry))
+
+        for msg in (BOOK_TICKER, DEPTH, EXECUTION_REPORT):
+            self.registry.dispatch(msg)
+        self.assertEqual(
+            [
+                ("all", b"2"),
+                ("book", b"2"),
+                ("all", b"3"),
+                ("eth", b"3"),
+                ("report", b"4"),
+            ],
+            self.calls,
+        )
+        self.assertEqual(0, self.registry.dispatch(FixMessageView(b"35=0\x01")))
+
+    def test_symbol_of_any_entry(self):
+        self.registry.add("X", self.handler("eth"), symbol="ETHUSDT")
+        self.registry.add("X", self.handler("btc"), symbol="BTCUSDT")
+        self.registry.dispatch(
+            FixMessageView(
+                b"8=FIX.4.4\x019=1\x0135=X\x0134=5\x01262=TRADES\x01268=2\x01"
+                b"279=0\x01269=2\x01270=1\x0155=BNBUSDT\x01"
+                b"279=0\x01269=2\x01270=2\x0155=ETHUSDT\x0110=000\x01"
+            )
+        )
+        self.assertEqual([("eth", b"5")], self.calls)
+
+    def test_remove(self):
+        registration = self.registry.add("X", self.handler("all"))
+        other = self.registry.add("X", self.handler("other"))
+        self.assertTrue(self.registry.remove(registration))
+        self.assertFalse(self.registry.remove(registration))
+        self.registry.dispatch(DEPTH)
+        self.assertEqual([("other", b"3")], self.calls)
+        self.assertTrue(self.registry.remove(other))
+        self.assertFalse(self.registry.has_handlers("X"))
+
+    def test_failing_handler_does_not_stop_dispatch(self):
+        def fail(msg):
+            raise RuntimeError("handler error")
+
+        self.registry.add("X", fail)
+        self.registry.add("X", self.handler("all"))
+        with self.assertLogs("BinanceFixConnector", "ERROR"):
+            self.assertEqual(2, self.registry.dispatch(DEPTH))
+        self.assertEqual([("all", b"3")], self.calls)
+
+
+class TestConnectorHandlers(unittest.TestCase):
+
+    def create_client(self, **kwargs):
+        client = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BMDWATCH",
+            **kwargs,
+        )
+        client.logger = MagicMock()
+        return client
+
+    def test_handlers_called_and_messages_queued(self):
+        client = self.create_client()
+        received = []
+        client.add_handler("X", received.append, symbol="BNBUSDT")
+        client.on_message_received([BOOK_TICKER, DEPTH, EXECUTION_REPORT])
+        self.assertEqual([BOOK_TICKER], received)
+        self.assertEqual(3, len(client.get_all_new_messages_received()))
+
+    def test_messages_not_queued(self):
+        client = self.create_client(queue_messages=False)
+        received = []
+        registration = client.add_handler("X", received.append)
+        response = client.expect_response(cl_ord_id="ORDER1")
+        client.on_message_received([BOOK_TICKER, DEPTH, EXECUTION_REPORT])
+        self.assertEqual([BOOK_TICKER, DEPTH], received)
+        self.assertIs(EXECUTION_REPORT, response.result(0))
+        self.assertEqual(0, client.queue_msg_received.qsize())
+
+        self.assertTrue(client.remove_handler(registration))
+        client.on_message_received([DEPTH])
+        self.assertEqual(2, len(received))
+
+    def test_session_helpers_pass_queue_messages(self):
+        for create_session in (
+            create_market_data_session,
+            create_order_entry_session,
+            create_drop_copy_session,
+        ):
+            with patch(
+                "binance_fix_connector.fix_connector._create_session"
+            ) as create_mock:
+                create_session("API_KEY", MagicMock(), queue_messages=False)
+            self.assertFalse(create_mock.call_args.kwargs["queue_messages"])
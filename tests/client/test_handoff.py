@@ -0,0 +1,251 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from simplefix import FixParser
+
+from binance_fix_connector.fix_connector import BinanceFixConnector, _create_session
+from binance_fix_connector.handoff import (
+    HandoffDeduplicator,
+    active_subscriptions,
+    message_key,
+)
+from binance_fix_connector.market_data import decode_md_entries
+
+from tests.helpers import create_client, frame
+
+TRADE = frame(
+    b"35=X\x0134=3\x01262=TRADE_STREAM\x01268=1\x01279=0\x01269=2\x01270=640.09\x01"
+    b"271=3.132\x0155=BNBUSDT\x011003=760268\x01"
+)
+DEPTH = frame(
+    b"35=X\x0134=4\x01262=DEPTH_STREAM\x01268=1\x01279=1\x01269=0\x01270=638.54\x01"
+    b"271=11.767\x0155=BNBUSDT\x0125043=7517775\x0125044=7517775\x01"
+)
+EXECUTION_REPORT = frame(b"35=8\x0134=5\x0111=ORDER\x0117=EXEC_1\x01150=0\x01")
+
+
+class TestHandoffDeduplicator(unittest.TestCase):
+
+    def test_message_key(self):
+        self.assertEqual((b"8", b"EXEC_1"), message_key(EXECUTION_REPORT))
+        self.assertEqual(
+            (b"X", b"TRADE_STREAM", (b"BNBUSDT",), (b"760268",), ()),
+            message_key(TRADE),
+        )
+        heartbeat = frame(b"35=0\x0134=6\x01")
+        self.assertIsNone(message_key(heartbeat))
+
+    def test_duplicates_are_dropped_whichever_session_received_them(self):
+        handoff = HandoffDeduplicator()
+        old = [TRADE, EXECUTION_REPORT]
+        new = [TRADE, DEPTH]
+        heartbeat = frame(b"35=0\x0134=6\x01")
+
+        self.assertEqual(old + [heartbeat], handoff.filter(old + [heartbeat]))
+        self.assertEqual([new[1], heartbeat], handoff.filter(new + [heartbeat]))
+        self.assertEqual(1, handoff.duplicates)
+        self.assertEqual(3, len(handoff))
+
+    def test_entries_batched_differently_are_deduplicated_one_by_one(self):
+        def trades(*trade_ids):
+            entries = b"".join(
+                b"279=0\x01269=2\x01270=640.09\x01271=1\x01"
+                + (b"55=BNBUSDT\x01" if i == 0 else b"")
+                + b"1003=%d\x01" % trade_id
+                for i, trade_id in enumerate(trade_ids)
+            )
+            return frame(
+                b"35=X\x0134=3\x01262=TRADE_STREAM\x01268=%d\x01" % len(trade_ids)
+                + entries
+            )
+
+        handoff = HandoffDeduplicator()
+        self.assertEqual([trades(1, 2)], handoff.filter([trades(1, 2)]))
+        [remaining] = handoff.filter([trades(2, 3)])
+        self.assertEqual([], handoff.filter([trades(1, 3)]))
+        self.assertEqual(3, handoff.duplicates)
+
+        parser = FixParser()
+        parser.append_buffer(remaining.frame)
+        parsed = parser.get_message()
+        self.assertIsNotNone(parsed)
+        self.assertEqual(remaining.frame, parsed.encode(raw=True))
+        entries = decode_md_entries(remaining)
+        self.assertEqual(["BNBUSDT"], entries.symbol)
+        self.assertEqual([3], list(entries.trade_id))
+
+    def test_entries_of_a_book_update_are_kept_together(self):
+        def depth(*update_ids):
+            entries = b"".join(
+                b"279=1\x01269=0\x01270=638.54\x01271=1\x0155=BNBUSDT\x01"
+                b"25043=%d\x0125044=%d\x01279=1\x01269=1\x01270=638.6\x01271=2\x01"
+                % (update_id, update_id)
+                for update_id in update_ids
+            )
+            return frame(
+                b"35=X\x0134=4\x01262=DEPTH_STREAM\x01268=%d\x01"
+                % (2 * len(update_ids))
+                + entries
+            )
+
+        handoff = HandoffDeduplicator()
+        handoff.filter([depth(1)])
+        [remaining] = handoff.filter([depth(1, 2)])
+        entries = decode_md_entries(remaining)
+        self.assertEqual([2, 2], list(entries.last_book_id))
+        self.assertEqual([0, 1], list(entries.side))
+        without_ids = frame(b"35=X\x0134=5\x01262=DEPTH_STREAM\x01268=0\x01")
+        self.assertEqual([without_ids], handoff.filter([without_ids]))
+        self.assertEqual([without_ids], handoff.filter([without_ids]))
+
+    def test_capacity_bounds_the_keys_kept(self):
+        handoff = HandoffDeduplicator(capacity=1)
+        handoff.seen(TRADE)
+        handoff.seen(DEPTH)
+        self.assertEqual(1, len(handoff))
+        self.assertFalse(handoff.seen(TRADE))
+
+
+class TestSessionHandoff(unittest.TestCase):
+
+    def setUp(self):
+        self.session = create_client()
+        self.restart_session = create_client()
+        self.restart_session.send_message = MagicMock()
+
+    def subscribe(self, md_req_id, request_type, send=False):
+        message = self.session.create_fix_message_with_basic_header("V")
+        message.append_pair(262, md_req_id)
+        message.append_pair(263, request_type)
+        message.append_pair(264, 1)
+        message.append_pair(146, 1)
+        message.append_pair(55, "BNBUSDT")
+        if send:
+            self.session.send_message(message)
+        else:
+            self.session.messages_sent.append(message)
+
+    def test_active_subscriptions(self):
+        self.subscribe("TRADE_STREAM", 1)
+        self.subscribe("DEPTH_STREAM", 1)
+        self.subscribe("TRADE_STREAM", 2)
+        subscriptions = active_subscriptions(self.session.messages_sent)
+        self.assertEqual([b"DEPTH_STREAM"], [m.get(262) for m in subscriptions])
+
+    def test_start_handoff_replays_the_subscriptions(self):
+        self.subscribe("DEPTH_STREAM", 1)
+        self.restart_session.msg_seq_num = 7
+        self.session.start_handoff(self.restart_session)
+
+        self.assertIsNotNone(self.session.handoff)
+        self.assertIs(self.session.handoff, self.restart_session.handoff)
+        self.restart_session.send_message.assert_called_once()
+        replayed = self.restart_session.send_message.call_args.args[0]
+        self.assertEqual(b"V", replayed.message_type)
+        self.assertEqual(b"DEPTH_STREAM", replayed.get(262))
+        self.assertEqual(b"1", replayed.get(263))
+        self.assertEqual(b"BNBUSDT", replayed.get(55))
+        self.assertEqual(8, self.restart_session.msg_seq_num)
+
+    def test_subscriptions_sent_during_the_handoff_are_mirrored(self):
+        self.session.sock = MagicMock()
+        self.subscribe("DEPTH_STREAM", 1)
+        self.session.restart_session = self.restart_session
+        self.subscribe("TRADE_STREAM", 1, send=True)
+        self.session.start_handoff(self.restart_session)
+        self.subscribe("BOOK_TICKER_STREAM", 1, send=True)
+        self.subscribe("DEPTH_STREAM", 2, send=True)
+        self.session.heartbeat()
+
+        sent = [c.args[0] for c in self.restart_session.send_message.call_args_list]
+        self.assertEqual(
+            [
+                (b"DEPTH_STREAM", b"1"),
+                (b"TRADE_STREAM", b"1"),
+                (b"BOOK_TICKER_STREAM", b"1"),
+                (b"DEPTH_STREAM", b"2"),
+            ],
+            [(msg.get(262), msg.get(263)) for msg in sent],
+        )
+        self.assertEqual([b"BMDWATCH"] * 4, [msg.get(49) for msg in sent])
+
+        self.session.handoff = None
+        self.subscribe("TRADE_STREAM", 2, send=True)
+        self.assertEqual(4, self.restart_session.send_message.call_count)
+
+    def test_standby_session_messages_not_delivered(self):
+        handled = []
+        self.session.add_handler("A", handled.append)
+        self.session.add_handler("X", handled.append)
+        with (
+            patch.object(BinanceFixConnector, "connect"),
+            patch.object(BinanceFixConnector, "logon"),
+        ):
+            standby = _create_session(
+                api_key="API_KEY",
+                private_key=MagicMock(),
+                endpoint="tcp+tls://localhost:9000",
+                sender_comp_id="BMDWATCH",
+                shared_with=self.session,
+            )
+        self.assertTrue(standby.standby)
+        standby.on_message_received(
+            [
+                frame(b"35=A\x0134=1\x0198=0\x01108=30\x01"),
+                frame(b"35=Y\x0134=2\x01262=DEPTH_STREAM\x01281=1\x01"),
+                TRADE,
+            ]
+        )
+        self.assertEqual([TRADE], self.session.get_all_new_messages_received())
+        self.assertEqual([TRADE], handled)
+
+    def test_conflated_streams_stay_out_of_the_queue_across_a_restart(self):
+        conflation = self.session.add_conflation("DEPTH_STREAM", mode="depth")
+        with (
+            patch.object(BinanceFixConnector, "connect"),
+            patch.object(BinanceFixConnector, "logon"),
+        ):
+            standby = _create_session(
+                api_key="API_KEY",
+                private_key=MagicMock(),
+                endpoint="tcp+tls://localhost:9000",
+                sender_comp_id="BMDWATCH",
+                shared_with=self.session,
+            )
+        self.session.start_handoff(standby)
+        standby.on_message_received([DEPTH])
+
+        self.session.restart_flag = True
+        self.session.restart_session = standby
+        self.session.disconnect = MagicMock()
+        self.session.reconnect()
+        self.session.on_message_received(
+            [
+                frame(
+                    b"35=X\x0134=5\x01262=DEPTH_STREAM\x01268=1\x01279=1\x01"
+                    b"269=0\x01270=638.55\x01271=1\x0155=BNBUSDT\x01"
+                    b"25043=7517776\x0125044=7517776\x01"
+                ),
+                TRADE,
+            ]
+        )
+        self.assertEqual([TRADE], self.session.get_all_new_messages_received())
+        self.assertEqual(2, conflation.updates)
+
+    def test_overlapping_sessions_deliver_one_stream(self):
+        self.restart_session.queue_msg_received = self.session.queue_msg_received
+        self.session.start_handoff(self.restart_session)
+
+        self.session.on_message_received([TRADE])
+        self.restart_session.on_message_received([TRADE, DEPTH])
+        self.session.on_message_received([DEPTH])
+
+        received = []
+        while not self.session.queue_msg_received.empty():
+            received.append(self.session.queue_msg_received.get_nowait())
+        self.assertEqual([TRADE, DEPTH], received)
+        self.assertEqual(2, self.session.handoff.duplicates)
+
+
+if __name__ == "__main__":
+    unittest.main()
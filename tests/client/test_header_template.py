@@ -0,0 +1,68 @@
+import unittest
+
+from simplefix import FixMessage
+
+from binance_fix_connector.encoder import FixOutboundMessage, HeaderTemplate
+
+SENDING_TIME = "20250301-01:00:00.001000"
+
+
+def simplefix_message(msg_type, seq_num, recv_window=None):
+    msg = FixMessage()
+    msg.append_pair(8, "FIX.4.4", header=True)
+    msg.append_pair(35, msg_type, header=True)
+    msg.append_pair(49, "BOETRADE", header=True)
+    msg.append_pair(56, "SPOT", header=True)
+    msg.append_pair(34, seq_num, header=True)
+    msg.append_pair(52, SENDING_TIME, header=True)
+    msg.append_pair(25000, recv_window, header=True)
+    return msg
+
+
+def add_body(msg):
+    msg.append_pair(38, 1)
+    msg.append_pair(40, 2)
+    msg.append_pair("11", "1740758400000001000")
+    msg.append_pair(44, 730.5)
+    msg.append_pair(b"54", b"2")
+    msg.append_pair(55, "BNBUSDT")
+    msg.append_pair(59, None)
+
+
+class TestHeaderTemplate(unittest.TestCase):
+
+    def test_same_bytes_as_simplefix(self):
+        for msg_type, recv_window in (("D", None), ("D", 100), ("A", "5000")):
+            template = HeaderTemplate(
+                "FIX.4.4", msg_type, "BOETRADE", "SPOT", recv_window
+            )
+            for seq_num in (1, 99, 100000):
+                expected = simplefix_message(msg_type, seq_num, recv_window)
+                msg = template.create_message(str(seq_num), SENDING_TIME)
+                self.assertIsInstance(msg, FixOutboundMessage)
+                self.assertEqual(expected.encode(), template.encode(msg))
+
+                add_body(expected)
+                add_body(msg)
+                self.assertEqual(expected.pairs, msg.pairs)
+                self.assertEqual(expected.encode(), template.encode(msg))
+                self.assertEqual(expected.encode(), msg.encode())
+
+    def test_changed_message_falls_back_to_simplefix(self):
+        template = HeaderTemplate("FIX.4.4", "D", "BOETRADE", "SPOT", 100)
+        changes = (
+            lambda msg: msg.append_pair(50, "SUB", header=True),
+            lambda msg: msg.remove(38),
+            lambda msg: msg.pairs.append((b"99", b"1")),
+            lambda msg: msg.append_pair(10, "000"),
+        )
+        for change in changes:
+            msg = template.create_message("7", SENDING_TIME)
+            add_body(msg)
+            change(msg)
+            self.assertEqual(FixMessage.encode(msg), template.encode(msg))
+
+    def test_invalid_tag(self):
+        msg = FixOutboundMessage()
+        with self.assertRaises(ValueError):
+            msg.append_pair("abc", 1)
@@ -0,0 +1,184 @@
+import logging
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from binance_fix_connector.fix_connector import BinanceFixConnector
+from binance_fix_connector.framer import FixFramer
+from binance_fix_connector.message import FixMessageView
+from binance_fix_connector.reactor import FixReactor
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+def server_message(msg_type, seq_num, *pairs):
+    body = f"35={msg_type}\x0149=SPOT\x0156=BMDWATCH\x0134={seq_num}\x01"
+    body += "".join(f"{tag}={value}\x01" for tag, value in pairs)
+    data = f"8=FIX.4.4\x019={len(body)}\x01{body}".encode()
+    return data + b"10=%03d\x01" % (sum(data) % 256)
+
+
+def read_messages(sock, count, timeout=5):
+    framer = FixFramer()
+    messages = []
+    sock.settimeout(timeout)
+    while len(messages) < count:
+        framer.feed(sock.recv(65536))
+        messages.extend(FixMessageView(frame) for frame in framer.frames())
+    return messages
+
+
+class TestFixReactor(unittest.TestCase):
+
+    def setUp(self):
+        self.reactor = FixReactor()
+        self.reactor.start()
+        self.addCleanup(self.reactor.close, 5)
+
+    def create_session(self, **kwargs):
+        session = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BMDWATCH",
+            reactor=self.reactor,
+            **kwargs,
+        )
+        client, server = socket.socketpair()
+        self.addCleanup(server.close)
+        self.addCleanup(client.close)
+        session.sock = client
+        session.is_connected = True
+        self.reactor.register(session)
+        return session, server
+
+    def wait_until(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("condition not met in time")
+            time.sleep(0.001)
+
+    def test_sessions_are_read_and_dispatched_from_one_thread(self):
+        received = []
+        sessions = []
+        for _ in range(5):
+            session, server = self.create_session(queue_messages=False)
+            session.add_handler(
+                "X", lambda msg, s=session: received.append((s, threading.get_ident()))
+            )
+            sessions.append((session, server))
+
+        for session, server in sessions:
+            data = b"".join(server_message("X", n, (262, "BOOK")) for n in range(2, 12))
+            # Split a frame across two writes.
+            server.sendall(data[:25])
+            server.sendall(data[25:])
+
+        self.wait_until(lambda: len(received) == 50)
+        self.assertEqual({self.reactor.thread.ident}, {t for _, t in received})
+        for session, _ in sessions:
+            self.assertEqual(10, sum(1 for s, _ in received if s is session))
+        self.assertEqual(5, self.reactor.stats()["sessions"])
+        self.assertEqual(50, self.reactor.stats()["messages"])
+
+    def test_test_request_is_answered_and_messages_queued(self):
+        session, server = self.create_session()
+        server.sendall(server_message("1", 2, (112, "PING")))
+        (heartbeat,) = read_messages(server, 1)
+        self.assertEqual(b"0", heartbeat.message_type)
+        self.assertEqual(b"PING", heartbeat.get(112))
+        messages = session.retrieve_messages_until("1", timeout_seconds=5)
+        self.assertEqual([b"1"], [m.message_type for m in messages])
+
+    def test_heartbeat_sent_when_idle(self):
+        session, server = self.create_session(heart_bt_int=1)
+        start = time.monotonic()
+        (heartbeat,) = read_messages(server, 1)
+        self.assertEqual(b"0", heartbeat.message_type)
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+
+    def test_large_send_is_completed_by_the_reactor(self):
+        session, server = self.create_session()
+        client = session.sock
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        msg = session.create_fix_message_with_basic_header("V")
+        msg.append_pair(58, "x" * 100_000)
+        session.send_message(msg)
+        session.test_request("AFTER")
+        messages = read_messages(server, 2)
+        self.assertEqual([b"V", b"1"], [m.message_type for m in messages])
+        self.assertEqual(100_000, len(messages[0].get(58)))
+        self.assertEqual(1, self.reactor.stats()["deferred_writes"])
+
+    def test_connection_closed_by_the_server(self):
+        session, server = self.create_session()
+        server.sendall(server_message("5", 2, (58, "Logout acknowledgment.")))
+        server.close()
+        self.wait_until(lambda: not session.is_connected)
+        self.assertEqual(0, len(self.reactor))
+        messages = session.get_all_new_messages_received()
+        self.assertEqual([b"5"], [m.message_type for m in messages])
+
+    def test_burst_larger_than_the_receive_buffer(self):
+        session, server = self.create_session(
+            queue_messages=False, socket_buffer_size=1024, max_buffer_size=4096
+        )
+        received = []
+        session.add_handler("X", received.append)
+        data = b"".join(server_message("X", n, (262, "BOOK")) for n in range(2, 202))
+        self.assertGreater(len(data), 2 * session.max_buffer_size)
+        server.sendall(data)
+        self.wait_until(lambda: len(received) == 200)
+        self.assertTrue(session.is_connected)
+
+    def test_oversized_frame_disconnects_only_its_session(self):
+        session, server = self.create_session(
+            socket_buffer_size=1024, max_buffer_size=4096
+        )
+        other_session, other_server = self.create_session()
+        server.sendall(b"8=FIX.4.4\x019=100000\x0135=X\x01" + b"x" * 8192)
+        self.wait_until(lambda: not session.is_connected)
+        self.assertTrue(self.reactor.thread.is_alive())
+        self.assertEqual(1, len(self.reactor))
+
+        other_server.sendall(server_message("1", 2, (112, "PING")))
+        (heartbeat,) = read_messages(other_server, 1)
+        self.assertEqual(b"PING", heartbeat.get(112))
+
+    def test_disconnect_unregisters(self):
+        session, _ = self.create_session()
+        session.disconnect()
+        self.assertEqual(0, len(self.reactor))
+
+    def test_call_later_and_cancel(self):
+        calls = []
+        self.reactor.call_later(0.02, calls.append, "second")
+        self.reactor.call_later(0.01, calls.append, "first")
+        self.reactor.call_later(0.01, calls.append, "cancelled").cancel()
+        self.reactor.call_soon(calls.append, "soon")
+        self.wait_until(lambda: len(calls) == 3)
+        time.sleep(0.05)
+        self.assertEqual(["soon", "first", "second"], calls)
+
+    def test_restart_takes_over_the_connection(self):
+        session, _ = self.create_session()
+        restart_session, server = self.create_session()
+        restart_session.msg_seq_num = 5
+        session.restart_session = restart_session
+        session.restart_flag = True
+        session.reconnect()
+        self.assertFalse(session.restart_flag)
+        self.assertIs(restart_session.sock, session.sock)
+        self.assertEqual(1, len(self.reactor))
+
+        server.sendall(server_message("1", 2, (112, "PING")))
+        (heartbeat,) = read_messages(server, 1)
+        self.assertEqual(b"6", heartbeat.get(34))
+        self.assertEqual(6, session.msg_seq_num)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import threading
+import time
+import unittest
+
+from binance_fix_connector.scheduler import SessionScheduler, get_scheduler
+
+
+class TestSessionScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = SessionScheduler(max_workers=4)
+        self.addCleanup(self.scheduler.shutdown)
+
+    def test_calls_run_in_deadline_order(self):
+        calls = []
+        done = threading.Event()
+        self.scheduler.call_later(0.3, lambda: (calls.append("last"), done.set()))
+        self.scheduler.call_later(0.2, calls.append, "second")
+        self.scheduler.call_later(0.1, calls.append, "first")
+        self.scheduler.call_later(0.1, calls.append, "cancelled").cancel()
+        self.assertEqual(3, len(self.scheduler))
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(["first", "second", "last"], calls)
+        self.assertEqual(0, len(self.scheduler))
+
+    def test_earlier_call_wakes_the_timer(self):
+        done = threading.Event()
+        self.scheduler.call_later(60, done.set)
+        start = time.monotonic()
+        self.scheduler.call_later(0.01, done.set)
+        self.assertTrue(done.wait(5))
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_submitted_work_runs_in_parallel(self):
+        barrier = threading.Barrier(3, timeout=5)
+        futures = [self.scheduler.submit(barrier.wait) for _ in range(3)]
+        self.assertEqual([0, 1, 2], sorted(f.result(5) for f in futures))
+
+    def test_errors_are_logged(self):
+        done = threading.Event()
+
+        def fail():
+            done.set()
+            raise RuntimeError("scheduled call error")
+
+        with self.assertLogs("BinanceFixConnector", "ERROR"):
+            self.scheduler.call_later(0, fail)
+            self.assertTrue(done.wait(5))
+            time.sleep(0.05)
+
+    def test_shutdown_cancels_the_calls(self):
+        call = self.scheduler.call_later(60, print)
+        self.scheduler.shutdown()
+        self.assertTrue(call.cancelled)
+        self.assertEqual(0, len(self.scheduler))
+
+    def test_shared_scheduler(self):
+        self.assertIs(get_scheduler(), get_scheduler())
+
+
+if __name__ == "__main__":
+    unittest.main()
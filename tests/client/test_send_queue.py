@@ -0,0 +1,254 @@
+import logging
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from binance_fix_connector.fix_connector import BinanceFixConnector
+from binance_fix_connector.message import FixMessageView
+from binance_fix_connector.send_queue import (
+    PRIORITY_CANCEL,
+    PRIORITY_NORMAL,
+    PRIORITY_SESSION,
+    SendQueue,
+    message_priority,
+    order_keys,
+)
+
+
+class BlockingWriter:
+    """Records the writes, the first one blocks until `release` is called."""
+
+    def __init__(self):
+        self.writes = []
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self, data):
+        self.started.set()
+        self.released.wait(5)
+        self.writes.append(data)
+
+    def release(self):
+        self.released.set()
+
+
+class TestSendQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.writer = BlockingWriter()
+        self.queue = SendQueue(self.writer, max_batch_size=32)
+        self.queue.start()
+        self.addCleanup(self.queue.stop, 5)
+
+    def test_priority_and_coalescing(self):
+        self.queue.put(b"D1|", PRIORITY_NORMAL)
+        self.assertTrue(self.writer.started.wait(5))
+        # Queued while the first write blocks.
+        self.queue.put(b"D2|", PRIORITY_NORMAL)
+        self.queue.put(b"F1|", PRIORITY_CANCEL)
+        self.queue.put(b"D3|", PRIORITY_NORMAL)
+        self.queue.put(b"0|", PRIORITY_SESSION)
+        self.assertEqual(4, len(self.queue))
+        self.writer.release()
+        self.assertTrue(self.queue.flush(5))
+
+        self.assertEqual([b"D1|", b"0|F1|D2|D3|"], self.writer.writes)
+        self.assertEqual(
+            {"frames": 5, "writes": 2, "bytes": 14, "errors": 0, "pending": 0},
+            self.queue.stats(),
+        )
+
+    def test_batches_are_limited_in_size(self):
+        self.queue.put(b"x" * 10)
+        self.assertTrue(self.writer.started.wait(5))
+        for _ in range(4):
+            self.queue.put(b"y" * 10)
+        self.queue.put(b"z" * 40)
+        self.writer.release()
+        self.assertTrue(self.queue.flush(5))
+        self.assertEqual(
+            [b"x" * 10, b"y" * 30, b"y" * 10, b"z" * 40], self.writer.writes
+        )
+
+    def test_write_errors_are_logged(self):
+        self.writer.release()
+        self.queue.write = MagicMock(side_effect=[OSError("broken pipe"), None])
+        with self.assertLogs("BinanceFixConnector", "ERROR"):
+            self.queue.put(b"0|")
+            self.assertTrue(self.queue.flush(5))
+        self.queue.put(b"0|")
+        self.assertTrue(self.queue.flush(5))
+        self.assertEqual(1, self.queue.stats()["errors"])
+        self.assertEqual(2, self.queue.stats()["writes"])
+
+    def test_stop_writes_the_messages_queued(self):
+        self.queue.put(b"D1|")
+        self.assertTrue(self.writer.started.wait(5))
+        self.queue.put(b"5|", PRIORITY_SESSION)
+        self.writer.release()
+        self.queue.stop(5)
+        self.assertFalse(self.queue.thread.is_alive())
+        self.assertEqual([b"D1|", b"5|"], self.writer.writes)
+
+    def test_messages_encoded_in_the_order_written(self):
+        encoded = []
+
+        def encode(item):
+            encoded.append(item)
+            return b"%s%d|" % (item, len(encoded))
+
+        written = []
+        self.queue.encode = encode
+        self.queue.on_written = written.extend
+        self.queue.max_batch_size = 9
+        self.queue.put(b"D", PRIORITY_NORMAL)
+        self.assertTrue(self.writer.started.wait(5))
+        self.queue.put(b"D", PRIORITY_NORMAL)
+        self.queue.put(b"F", PRIORITY_CANCEL)
+        self.queue.put(b"0", PRIORITY_SESSION)
+        self.queue.put(b"D", PRIORITY_NORMAL)
+        self.writer.release()
+        self.assertTrue(self.queue.flush(5))
+
+        self.assertEqual([b"D", b"0", b"F", b"D", b"D"], encoded)
+        self.assertEqual([b"D1|", b"02|F3|D4|", b"D5|"], self.writer.writes)
+        self.assertEqual([b"D1|", b"02|", b"F3|", b"D4|", b"D5|"], written)
+
+    def test_cancels_stay_behind_the_orders_they_target(self):
+        order = ((b"11", b"ORDER1"), (b"55", b"BNBUSDT"))
+        self.queue.put(b"D0|", PRIORITY_NORMAL)
+        self.assertTrue(self.writer.started.wait(5))
+        self.queue.put(b"D1|", PRIORITY_NORMAL, order)
+        self.queue.put(b"D2|", PRIORITY_NORMAL, ((b"11", b"ORDER2"),))
+        self.queue.put(b"F1|", PRIORITY_CANCEL, ((b"11", b"ORDER1"),))
+        self.queue.put(b"F3|", PRIORITY_CANCEL, ((b"11", b"ORDER3"),))
+        self.queue.put(b"q|", PRIORITY_CANCEL, ((b"55", b"BNBUSDT"),))
+        self.writer.release()
+        self.assertTrue(self.queue.flush(5))
+
+        self.assertEqual([b"D0|", b"F3|D1|D2|F1|q|"], self.writer.writes)
+        self.queue.put(b"F1|", PRIORITY_CANCEL, ((b"11", b"ORDER1"),))
+        self.queue.put(b"D4|", PRIORITY_NORMAL)
+        self.assertTrue(self.queue.flush(5))
+        self.assertEqual(b"F1|D4|", b"".join(self.writer.writes[2:]))
+
+    def test_order_keys(self):
+        order_list = FixMessageView(
+            b"35=E\x0173=2\x0111=LIMIT\x0155=BNBUSDT\x0111=STOP\x0155=BNBUSDT\x01"
+        )
+        self.assertEqual(
+            (
+                (b"11", b"LIMIT"),
+                (b"11", b"STOP"),
+                (b"55", b"BNBUSDT"),
+                (b"55", b"BNBUSDT"),
+            ),
+            order_keys(order_list),
+        )
+        cancel = FixMessageView(b"35=F\x0111=CANCEL\x0141=LIMIT\x0155=BNBUSDT\x01")
+        self.assertEqual(((b"11", b"LIMIT"),), order_keys(cancel))
+        mass_cancel = FixMessageView(b"35=q\x0111=CANCEL\x0155=BNBUSDT\x01")
+        self.assertEqual(((b"55", b"BNBUSDT"),), order_keys(mass_cancel))
+        self.assertEqual((), order_keys(FixMessageView(b"35=V\x01262=A\x0155=BNB\x01")))
+        self.assertEqual((), order_keys(FixMessageView(b"35=0\x01")))
+
+    def test_message_priority(self):
+        self.assertEqual(PRIORITY_SESSION, message_priority(b"0"))
+        self.assertEqual(PRIORITY_SESSION, message_priority(b"5"))
+        self.assertEqual(PRIORITY_CANCEL, message_priority(b"F"))
+        self.assertEqual(PRIORITY_CANCEL, message_priority(b"q"))
+        self.assertEqual(PRIORITY_NORMAL, message_priority(b"D"))
+        self.assertEqual(PRIORITY_NORMAL, message_priority(None))
+
+
+class TestConnectorSendQueue(unittest.TestCase):
+
+    def test_messages_sent_from_the_writer_thread(self):
+        client = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BOETRADE",
+            send_queue=True,
+        )
+        writer = BlockingWriter()
+        client.sock = MagicMock()
+        client.sock.sendall.side_effect = writer
+        client.send_queue.start()
+
+        order = client.create_fix_message_with_basic_header("D")
+        order.append_pair(11, "ORDER1")
+        client.send_message(order)
+        self.assertTrue(writer.started.wait(5))
+        for cl_ord_id in ("ORDER2", "ORDER3"):
+            order = client.create_fix_message_with_basic_header("D")
+            order.append_pair(11, cl_ord_id)
+            client.send_message(order)
+        cancel = client.create_fix_message_with_basic_header("F")
+        cancel.append_pair(41, "ORDER1")
+        client.send_message(cancel)
+        # Does not wait for the write in progress.
+        client.heartbeat("PING")
+        with self.assertLogs("BinanceFixConnector.wire", logging.INFO) as logs:
+            writer.release()
+            client.disconnect()
+
+        self.assertEqual(2, len(writer.writes))
+        wire = [
+            FixMessageView(b"8=FIX.4.4\x01" + data)
+            for data in b"".join(writer.writes).split(b"8=FIX.4.4\x01")[1:]
+        ]
+        self.assertEqual(
+            [b"D", b"0", b"F", b"D", b"D"], [msg.message_type for msg in wire]
+        )
+        self.assertEqual([2, 3, 4, 5, 6], [int(msg.get(34)) for msg in wire])
+        self.assertEqual(
+            [b"ORDER1", None, None, b"ORDER2", b"ORDER3"],
+            [msg.get(11) for msg in wire],
+        )
+        # Logged in the order written, with the MsgSeqNum sent.
+        self.assertEqual(
+            ["34=2", "34=3", "34=4", "34=5", "34=6"],
+            [
+                next(f for f in log.split("|") if f.startswith("34="))
+                for log in logs.output
+            ],
+        )
+        self.assertEqual(6, client.msg_seq_num)
+        self.assertEqual(5, client.get_metrics()["send_queue"]["frames"])
+
+    def test_cancel_written_after_the_queued_order(self):
+        client = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BOETRADE",
+            send_queue=True,
+        )
+        client.logger = MagicMock()
+        writer = BlockingWriter()
+        client.sock = MagicMock()
+        client.sock.sendall.side_effect = writer
+        client.send_queue.start()
+        for msg_type, tag, cl_ord_id in (
+            ("D", 11, "ORDER1"),
+            ("D", 11, "ORDER2"),
+            ("F", 41, "ORDER2"),
+        ):
+            message = client.create_fix_message_with_basic_header(msg_type)
+            message.append_pair(tag, cl_ord_id)
+            client.send_message(message)
+            self.assertTrue(writer.started.wait(5))
+        client.heartbeat("PING")
+        writer.release()
+        client.disconnect()
+
+        wire = [
+            FixMessageView(b"8=FIX.4.4\x01" + data)
+            for data in b"".join(writer.writes).split(b"8=FIX.4.4\x01")[1:]
+        ]
+        self.assertEqual([b"D", b"0", b"D", b"F"], [msg.message_type for msg in wire])
+
+
+if __name__ == "__main__":
+    unittest.main()
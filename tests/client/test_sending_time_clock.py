@@ -0,0 +1,41 @@
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from binance_fix_connector.clock import SendingTimeClock
+
+
+def expected(timestamp_ns):
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    value = epoch + timedelta(microseconds=timestamp_ns // 1000)
+    return value.strftime("%Y%m%d-%H:%M:%S.%f")
+
+
+class TestSendingTimeClock(unittest.TestCase):
+
+    def test_same_format_as_datetime(self):
+        clock = SendingTimeClock()
+        second = 1740790800 * 10**9
+        timestamps = [
+            0,
+            second,
+            second + 1_000,
+            second + 999_999_999,
+            second + 10**9,
+            second - 1,
+            (1740787199 * 10**6 + 999_999) * 1000,  # 23:59:59.999999
+            (1740787200 * 10**6) * 1000,  # next day
+        ]
+        timestamps += [random.randrange(0, 4102444800 * 10**9) for _ in range(1000)]
+        for timestamp in timestamps:
+            self.assertEqual(expected(timestamp), clock.format(timestamp), timestamp)
+
+    def test_now(self):
+        clock = SendingTimeClock()
+        before = datetime.now(timezone.utc).replace(tzinfo=None)
+        value = clock.now()
+        after = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.assertRegex(value, r"^\d{8}-\d{2}:\d{2}:\d{2}\.\d{6}$")
+        self.assertTrue(
+            before <= datetime.strptime(value, "%Y%m%d-%H:%M:%S.%f") <= after
+        )
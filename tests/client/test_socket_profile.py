@@ -0,0 +1,90 @@
+import socket
+import unittest
+from unittest.mock import MagicMock, patch
+
+from binance_fix_connector.fix_connector import BinanceFixConnector
+from binance_fix_connector.socket_profile import (
+    SOCKET_PROFILES,
+    SocketProfile,
+    get_socket_profile,
+)
+from binance_fix_connector.tls import get_tls_cache
+
+
+class TestSocketProfile(unittest.TestCase):
+
+    def setUp(self):
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.addCleanup(self.server.close)
+        self.sock = socket.create_connection(self.server.getsockname())
+        self.addCleanup(self.sock.close)
+        # The patched SSL context must not stay in the cache shared by the process.
+        get_tls_cache().clear()
+        self.addCleanup(get_tls_cache().clear)
+
+    def test_apply_reports_the_values_read_back(self):
+        profile = SocketProfile(
+            "test", tcp_nodelay=True, rcvbuf=256 * 1024, sndbuf=128 * 1024
+        )
+        applied = profile.apply(self.sock)
+        self.assertEqual("test", applied["profile"])
+        self.assertEqual(
+            1, self.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        )
+        self.assertEqual(
+            self.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY),
+            applied["TCP_NODELAY"],
+        )
+        self.assertEqual(
+            self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF),
+            applied["SO_RCVBUF"],
+        )
+        self.assertIn("SO_SNDBUF", applied)
+        self.assertNotIn("SO_BUSY_POLL", applied)
+
+    def test_options_that_can_not_be_set_are_reported(self):
+        sock = MagicMock()
+        sock.setsockopt.side_effect = [
+            None,
+            PermissionError(1, "Operation not permitted"),
+            None,
+        ]
+        sock.getsockopt.return_value = 1
+        with patch("binance_fix_connector.socket_profile.TCP_QUICKACK", None):
+            applied = SocketProfile(
+                tcp_nodelay=True, quickack=True, busy_poll=50, rcvbuf=1024
+            ).apply(sock)
+        self.assertEqual(1, applied["TCP_NODELAY"])
+        self.assertEqual("error: Operation not permitted", applied["SO_RCVBUF"])
+        self.assertEqual("unsupported", applied["TCP_QUICKACK"])
+        self.assertEqual(3, sock.setsockopt.call_count)
+
+    def test_presets(self):
+        self.assertIs(SOCKET_PROFILES["low-latency"], get_socket_profile("low-latency"))
+        self.assertTrue(get_socket_profile("high-throughput").rcvbuf)
+        profile = SocketProfile()
+        self.assertIs(profile, get_socket_profile(profile))
+        self.assertIsNone(get_socket_profile(None))
+        with self.assertRaises(ValueError):
+            get_socket_profile("fastest")
+
+    @patch("ssl.create_default_context")
+    @patch("binance_fix_connector.fix_connector.socket.create_connection")
+    def test_connect_applies_the_profile(self, create_connection, _):
+        create_connection.return_value = self.sock
+        client = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BOETRADE",
+            socket_profile=SocketProfile("test", tcp_nodelay=True),
+        )
+        with patch.object(client, "_BinanceFixConnector__receive_messages"):
+            client.connect()
+        self.assertEqual(
+            {"profile": "test", "TCP_NODELAY": 1}, client.get_metrics()["socket"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
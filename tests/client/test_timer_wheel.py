@@ -0,0 +1,163 @@
+import logging
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from binance_fix_connector.fix_connector import BinanceFixConnector
+from binance_fix_connector.framer import FixFramer
+from binance_fix_connector.message import FixMessageView
+from binance_fix_connector.scheduler import SessionScheduler
+from binance_fix_connector.timer_wheel import TimerWheel, get_timer_wheel
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+def read_message(sock, timeout=5):
+    framer = FixFramer()
+    sock.settimeout(timeout)
+    while True:
+        framer.feed(sock.recv(65536))
+        for frame in framer.frames():
+            return FixMessageView(frame)
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def setUp(self):
+        self.wheel = TimerWheel(tick=0.01, slots=8)
+        self.addCleanup(self.wheel.stop)
+
+    def test_timers_run_in_deadline_order(self):
+        calls = []
+        done = threading.Event()
+        # Longer than a turn of the wheel (8 slots of 10ms): expire after some rounds.
+        self.wheel.call_later(0.25, lambda: (calls.append("last"), done.set()))
+        self.wheel.call_later(0.15, calls.append, "second")
+        self.wheel.call_later(0.02, calls.append, "first")
+        self.wheel.call_later(0.02, calls.append, "cancelled").cancel()
+        self.assertEqual(3, len(self.wheel))
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(["first", "second", "last"], calls)
+        self.assertEqual(0, len(self.wheel))
+
+    def test_deadline_is_not_early(self):
+        done = threading.Event()
+        start = time.monotonic()
+        self.wheel.call_later(0.1, done.set)
+        self.assertTrue(done.wait(5))
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_timer_added_after_idle_period(self):
+        done = threading.Event()
+        self.wheel.call_later(0, done.set)
+        self.assertTrue(done.wait(5))
+        time.sleep(0.2)  # more than a turn without timers
+        done.clear()
+        start = time.monotonic()
+        self.wheel.call_later(0.03, done.set)
+        self.assertTrue(done.wait(5))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_errors_are_logged(self):
+        done = threading.Event()
+
+        def fail():
+            done.set()
+            raise RuntimeError("timer error")
+
+        with self.assertLogs("BinanceFixConnector", "ERROR"):
+            self.wheel.call_later(0, fail)
+            self.assertTrue(done.wait(5))
+            time.sleep(0.05)
+
+    def test_stop_cancels_the_timers(self):
+        timer = self.wheel.call_later(60, print)
+        self.wheel.stop()
+        self.assertTrue(timer.cancelled)
+        self.assertEqual(0, len(self.wheel))
+
+    def test_invalid_wheel(self):
+        with self.assertRaises(ValueError):
+            TimerWheel(tick=0)
+        with self.assertRaises(ValueError):
+            TimerWheel(slots=0)
+
+    def test_shared_timer_wheel(self):
+        self.assertIs(get_timer_wheel(), get_timer_wheel())
+
+
+class TestSessionLiveness(unittest.TestCase):
+
+    def setUp(self):
+        scheduler = SessionScheduler(timer_wheel=TimerWheel(tick=0.01))
+        self.addCleanup(scheduler.shutdown)
+        self.session = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BMDWATCH",
+            heart_bt_int=1,
+            scheduler=scheduler,
+        )
+        client, self.server = socket.socketpair()
+        self.addCleanup(self.server.close)
+        self.addCleanup(client.close)
+        self.session.sock = client
+        self.session.is_connected = True
+
+    def test_heartbeat_sent_when_idle(self):
+        self.session.start_liveness()
+        start = time.monotonic()
+        heartbeat = read_message(self.server)
+        self.assertEqual(b"0", heartbeat.message_type)
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+        self.assertTrue(self.session.is_connected)
+
+    def test_silent_server_is_tested_then_disconnected(self):
+        self.session.start_liveness()
+        messages = [read_message(self.server) for _ in range(2)]
+        test_request = next(m for m in messages if m.message_type == b"1")
+        self.assertEqual(b"TEST1", test_request.get(112))
+
+        deadline = time.monotonic() + 5
+        while self.session.is_connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.session.is_connected)
+        self.assertIsNone(self.session.liveness_timer)
+
+    def test_messages_received_keep_the_session_alive(self):
+        self.session.start_liveness()
+        for _ in range(20):
+            self.session._process_received([])
+            time.sleep(0.1)
+        self.assertIsNone(self.session.test_request_id)
+        self.assertTrue(self.session.is_connected)
+        self.session.disconnect()
+
+    def test_checks_do_not_block_the_timer_wheel(self):
+        sending = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def heartbeat(*args):
+            sending.set()
+            release.wait(5)
+
+        self.session.heartbeat = heartbeat
+        self.session.start_liveness()
+        self.assertTrue(sending.wait(5))
+        fired = threading.Event()
+        self.session.timer_wheel.call_later(0.01, fired.set)
+        self.assertTrue(fired.wait(2))
+
+    def test_disabled_with_zero_interval(self):
+        self.session.heart_bt_int = 0
+        self.session.start_liveness()
+        self.assertIsNone(self.session.liveness_timer)
+
+
+if __name__ == "__main__":
+    unittest.main()
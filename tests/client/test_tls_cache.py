@@ -0,0 +1,156 @@
+import contextlib
+import datetime
+import logging
+import os
+import socket
+import ssl
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from binance_fix_connector.fix_connector import BinanceFixConnector
+from binance_fix_connector.tls import TLSContextCache, get_tls_cache
+
+logging.basicConfig(level=logging.CRITICAL)
+
+BODY = b"35=A\x0149=SPOT\x0156=BOETRADE\x0134=1\x0198=0\x01108=30\x01"
+LOGON_RESPONSE = b"8=FIX.4.4\x019=%d\x01%s10=000\x01" % (len(BODY), BODY)
+
+
+def create_certificate(directory):
+    """Write a self-signed certificate for localhost, return (cert, key) paths."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+class TestTLSContextCache(unittest.TestCase):
+
+    def test_context_created_once_per_endpoint(self):
+        create_context = MagicMock(side_effect=lambda: MagicMock())
+        cache = TLSContextCache(create_context)
+        context = cache.get_context("tcp+tls://fix-oe.binance.com:9000")
+        self.assertIs(context, cache.get_context("tcp+tls://fix-oe.binance.com:9000"))
+        self.assertIsNot(
+            context, cache.get_context("tcp+tls://fix-md.binance.com:9000")
+        )
+        self.assertEqual(2, create_context.call_count)
+
+        cache.clear()
+        self.assertIsNot(
+            context, cache.get_context("tcp+tls://fix-oe.binance.com:9000")
+        )
+
+    def test_sessions_share_the_process_cache(self):
+        sessions = [
+            BinanceFixConnector(
+                endpoint="tcp+tls://localhost:9000",
+                api_key="API_KEY",
+                private_key=MagicMock(),
+                sender_comp_id=sender_comp_id,
+            )
+            for sender_comp_id in ("BOETRADE", "BMDWATCH")
+        ]
+        self.assertIs(get_tls_cache(), sessions[0].tls_cache)
+        self.assertIs(get_tls_cache(), sessions[1].tls_cache)
+
+    def test_save_session_ignores_connections_without_session(self):
+        cache = TLSContextCache()
+        self.assertFalse(cache.save_session("endpoint", None))
+        self.assertFalse(cache.save_session("endpoint", MagicMock()))
+        self.assertIsNone(cache.get_session("endpoint"))
+
+
+class TestTLSSessionResumption(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cert_path, key_path = create_certificate(directory.name)
+
+        self.server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.server_context.load_cert_chain(cert_path, key_path)
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.addCleanup(self.server.close)
+        self.port = self.server.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+        self.cache = TLSContextCache(
+            lambda: ssl.create_default_context(cafile=cert_path)
+        )
+
+    def serve(self):
+        for _ in range(2):
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            with self.server_context.wrap_socket(conn, server_side=True) as tls:
+                tls.sendall(LOGON_RESPONSE)
+                with contextlib.suppress(OSError):
+                    while tls.recv(4096):
+                        pass
+
+    def test_reconnect_resumes_the_tls_session(self):
+        client = BinanceFixConnector(
+            endpoint=f"tcp+tls://localhost:{self.port}",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BOETRADE",
+            tls_cache=self.cache,
+        )
+        with patch.object(client, "logon"):
+            client.connect()
+            messages = client.retrieve_messages_until("A", timeout_seconds=5)
+            self.assertEqual([b"A"], [m.message_type for m in messages])
+            first = client.get_metrics()["connect"]
+            self.assertFalse(first["session_reused"])
+            self.assertIsNotNone(self.cache.get_session(client.endpoint))
+
+            client.disconnect()
+            client.receive_thread.join(5)
+            client.connect()
+            second = client.get_metrics()["connect"]
+            self.assertTrue(second["session_reused"])
+            client.disconnect()
+        for key in ("tcp_connect", "tls_context", "tls_handshake", "total"):
+            self.assertGreaterEqual(second[key], 0)
+        self.assertLess(second["tls_context"], first["tls_context"])
+
+
+if __name__ == "__main__":
+    unittest.main()
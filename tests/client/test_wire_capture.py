@@ -0,0 +1,112 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from binance_fix_connector.capture import (
+    CAPTURE_MAGIC,
+    INBOUND,
+    OUTBOUND,
+    CaptureRecord,
+    WireCapture,
+    read_capture,
+)
+from binance_fix_connector.fix_connector import BinanceFixConnector
+
+FRAME = b"8=FIX.4.4\x019=5\x0135=0\x0110=163\x01"
+
+
+class TestWireCapture(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "session.cap")
+
+    def test_records_written_in_order(self):
+        with WireCapture(self.path, flush_interval=0.001) as capture:
+            capture.record(OUTBOUND, FRAME, "BOETRADE", 10)
+            capture.record(INBOUND, FRAME + FRAME, "BOETRADE", 20)
+            capture.record(INBOUND, b"", "other é", 30)
+            time.sleep(0.05)
+            capture.record(INBOUND, FRAME, "BOETRADE")
+
+        records = list(read_capture(self.path))
+        self.assertEqual(
+            [
+                CaptureRecord(OUTBOUND, 10, "BOETRADE", FRAME),
+                CaptureRecord(INBOUND, 20, "BOETRADE", FRAME + FRAME),
+                CaptureRecord(INBOUND, 30, "other é", b""),
+            ],
+            records[:3],
+        )
+        self.assertEqual(4, len(records))
+        self.assertGreater(records[3].timestamp_ns, 30)
+        self.assertEqual(4, capture.stats()["records_written"])
+        self.assertLessEqual(capture.stats()["flushes"], 2)
+
+    def test_append_to_existing_file(self):
+        with WireCapture(self.path) as capture:
+            capture.record(INBOUND, FRAME, "A", 1)
+        with WireCapture(self.path) as capture:
+            capture.record(INBOUND, FRAME, "B", 2)
+        self.assertEqual(["A", "B"], [r.session_id for r in read_capture(self.path)])
+
+    def test_full_queue_drops_frames(self):
+        with WireCapture(self.path, max_pending=2, flush_interval=60) as capture:
+            self.assertTrue(capture.record(INBOUND, FRAME, "A", 1))
+            self.assertTrue(capture.record(INBOUND, FRAME, "A", 2))
+            self.assertFalse(capture.record(INBOUND, FRAME, "A", 3))
+            self.assertEqual(1, capture.stats()["records_dropped"])
+        self.assertEqual([1, 2], [r.timestamp_ns for r in read_capture(self.path)])
+
+    def test_truncated_record_is_ignored(self):
+        with WireCapture(self.path) as capture:
+            capture.record(INBOUND, FRAME, "A", 1)
+            capture.record(INBOUND, FRAME, "A", 2)
+        with open(self.path, "rb+") as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        self.assertEqual([1], [r.timestamp_ns for r in read_capture(self.path)])
+
+    def test_not_a_capture_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"8=FIX.4.4\x01")
+        with self.assertRaises(ValueError):
+            WireCapture(self.path)
+        with self.assertRaises(ValueError):
+            list(read_capture(self.path))
+
+    def test_connector_records_frames_sent_and_received(self):
+        capture = WireCapture(self.path)
+        client = BinanceFixConnector(
+            endpoint="tcp+tls://localhost:9000",
+            api_key="API_KEY",
+            private_key=MagicMock(),
+            sender_comp_id="BOETRADE",
+            wire_capture=capture,
+        )
+        client.sock = MagicMock()
+        chunks = [FRAME + FRAME, b""]
+
+        def recv_into(view):
+            data = chunks.pop(0)
+            view[: len(data)] = data
+            return len(data)
+
+        client.sock.recv_into.side_effect = recv_into
+        client.is_connected = True
+
+        client.send_message(client.create_fix_message_with_basic_header("0"))
+        client._BinanceFixConnector__receive_messages()
+        capture.close()
+
+        records = list(read_capture(self.path))
+        with open(self.path, "rb") as f:
+            self.assertEqual(CAPTURE_MAGIC, f.read(len(CAPTURE_MAGIC)))
+        self.assertEqual([OUTBOUND, INBOUND, INBOUND], [r.direction for r in records])
+        self.assertEqual(client.sock.sendall.call_args[0][0], records[0].frame)
+        self.assertEqual([FRAME, FRAME], [r.frame for r in records[1:]])
+        self.assertEqual(records[1].timestamp_ns, records[2].timestamp_ns)
+        self.assertEqual({client.session_id}, {r.session_id for r in records})
+        self.assertEqual(3, client.get_metrics()["wire_capture"]["records_written"])
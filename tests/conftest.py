@@ -0,0 +1,2 @@
+# Importing this conftest as part of the `tests` package puts the root of the
+# repository on sys.path, so the tests can import `tests.helpers`.
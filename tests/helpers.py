@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import MagicMock
+
+from binance_fix_connector.fix_connector import BinanceFixConnector
+from binance_fix_connector.message import FixMessageView
+from binance_fix_connector.tls import get_tls_cache
+
+
+def frame(body):
+    """Return a FixMessageView of the body, framed with BeginString, BodyLength and CheckSum."""
+    return FixMessageView(b"8=FIX.4.4\x019=%d\x01" % len(body) + body + b"10=000\x01")
+
+
+def snapshot(last_book_id, *levels, md_req_id=b"DEPTH_STREAM", symbol=b"BNBUSDT"):
+    """Return a MarketDataSnapshot (W) of (side, price, qty) levels."""
+    entries = b"".join(
+        b"269=%d\x01270=%s\x01271=%s\x01" % (side, price, qty)
+        for side, price, qty in levels
+    )
+    return frame(
+        b"35=W\x01262=%s\x0155=%s\x0125044=%d\x01268=%d\x01"
+        % (md_req_id, symbol, last_book_id, len(levels))
+        + entries
+    )
+
+
+def diff(
+    first_book_id,
+    last_book_id,
+    *updates,
+    md_req_id=b"DEPTH_STREAM",
+    symbol=b"BNBUSDT",
+):
+    """Return a MarketDataIncrementalRefresh (X) of (action, side, price, qty) updates."""
+    entries = b""
+    for i, (action, side, price, qty) in enumerate(updates):
+        entries += b"279=%d\x01269=%d\x01270=%s\x01" % (action, side, price)
+        if qty is not None:
+            entries += b"271=%s\x01" % qty
+        if i == 0:
+            entries += b"55=%s\x0125043=%d\x0125044=%d\x01" % (
+                symbol,
+                first_book_id,
+                last_book_id,
+            )
+    return frame(b"35=X\x01262=%s\x01268=%d\x01" % (md_req_id, len(updates)) + entries)
+
+
+def create_client(**kwargs):
+    """Return a market data session that is not connected."""
+    kwargs.setdefault("endpoint", "tcp+tls://localhost:9000")
+    return BinanceFixConnector(
+        api_key="API_KEY",
+        private_key=MagicMock(),
+        sender_comp_id="BMDWATCH",
+        **kwargs,
+    )
+
+
+class MockedSocketTestCase(unittest.TestCase):
+    """Session tests on a patched socket, receiving the data returned by their `recv_side_effect`."""
+
+    def setUp(self):
+        # The patched SSL context must not stay in the cache shared by the process.
+        get_tls_cache().clear()
+        self.addCleanup(get_tls_cache().clear)
+
+    def recv_into_side_effect(self, buffer, *args, **kwargs):
+        data = self.recv_side_effect()
+        buffer[: len(data)] = data
+        return len(data)
@@ -0,0 +1,192 @@
+import math
+import threading
+import time
+import unittest
+
+from binance_fix_connector.bars import BarBuilder
+from binance_fix_connector.clock import SendingTimeClock
+from binance_fix_connector.market_data import (
+    InstrumentScale,
+    decode_md_entries,
+    parse_utc_timestamp,
+)
+from binance_fix_connector.scheduler import SessionScheduler
+from binance_fix_connector.timer_wheel import TimerWheel
+
+from tests.helpers import create_client, frame
+
+# 2024-01-01 00:00:00 UTC
+DAY = 1704067200 * 1_000_000
+
+
+def trades(*entries, md_req_id=b"TRADE_STREAM"):
+    """Return a trade stream X message of (symbol, time, price, qty, side, trade_id)."""
+    body = b""
+    for symbol, transact_time, price, qty, side, trade_id in entries:
+        body += (
+            b"279=0\x01269=2\x01270=%s\x01271=%s\x0155=%s\x011003=%d\x0160=%s\x01"
+            b"2446=%d\x01" % (price, qty, symbol, trade_id, transact_time, side)
+        )
+    return frame(b"35=X\x01262=%s\x01268=%d\x01" % (md_req_id, len(entries)) + body)
+
+
+class TestTransactTime(unittest.TestCase):
+
+    def test_parse_utc_timestamp(self):
+        self.assertEqual(DAY, parse_utc_timestamp(b"20240101-00:00:00"))
+        self.assertEqual(
+            DAY + 3_723_456_789, parse_utc_timestamp("20240101-01:02:03.456789")
+        )
+        self.assertEqual(DAY + 3_000, parse_utc_timestamp(b"20240101-00:00:00.003"))
+        self.assertEqual(
+            DAY + 86_400_000_001, parse_utc_timestamp(b"20240102-00:00:00.000001999")
+        )
+
+    def test_decode_trade_columns(self):
+        entries = decode_md_entries(
+            trades(
+                (b"BNBUSDT", b"20240101-00:00:00.5", b"10.0", b"1", 1, 7),
+                (b"BNBUSDT", b"20240101-00:00:01", b"10.1", b"2", 2, 8),
+            )
+        )
+        self.assertEqual([DAY + 500_000, DAY + 1_000_000], list(entries.transact_time))
+        self.assertEqual([1, 2], list(entries.aggressor_side))
+        self.assertEqual([7, 8], list(entries.trade_id))
+
+
+class TestBarBuilder(unittest.TestCase):
+
+    def setUp(self):
+        self.bars = []
+        self.builder = BarBuilder((1, 60), on_bar=self.bars.append, close_delay=None)
+
+    def test_bars_of_an_interval(self):
+        self.builder.on_message(
+            trades(
+                (b"BNBUSDT", b"20240101-00:00:00.100", b"10.0", b"1", 1, 1),
+                (b"BNBUSDT", b"20240101-00:00:00.200", b"10.5", b"2", 2, 2),
+                (b"BNBUSDT", b"20240101-00:00:00.300", b"9.5", b"1", 1, 3),
+                (b"BNBUSDT", b"20240101-00:00:00.900", b"10.2", b"4", 2, 4),
+            )
+        )
+        self.assertEqual([], self.bars)
+        bar = self.builder.current("BNBUSDT", 1)
+        self.assertEqual((DAY, DAY + 1_000_000), (bar.start, bar.end))
+        self.assertEqual(
+            (10.0, 10.5, 9.5, 10.2), (bar.open, bar.high, bar.low, bar.close)
+        )
+        self.assertEqual((8.0, 2.0, 6.0), (bar.volume, bar.buy_volume, bar.sell_volume))
+        self.assertAlmostEqual((10.0 + 21.0 + 9.5 + 40.8) / 8, bar.vwap)
+        self.assertEqual((4, 1, 4), (bar.trades, bar.first_trade_id, bar.last_trade_id))
+
+        self.builder.on_message(
+            trades((b"BNBUSDT", b"20240101-00:00:02.5", b"11.0", b"1", 1, 5))
+        )
+        (closed,) = self.bars
+        self.assertEqual(4, closed.trades)
+        self.assertIs(closed, self.builder.last("BNBUSDT", 1))
+        self.assertEqual(DAY + 2_000_000, self.builder.current("BNBUSDT", 1).start)
+
+        minute = self.builder.current("BNBUSDT", 60)
+        self.assertEqual((5, 11.0, 9.0), (minute.trades, minute.high, minute.volume))
+
+    def test_symbols_and_late_trades(self):
+        self.builder.on_message(
+            trades(
+                (b"BNBUSDT", b"20240101-00:00:01.100", b"10.0", b"1", 1, 1),
+                (b"BTCUSDT", b"20240101-00:00:00.100", b"60000", b"1", 1, 1),
+            )
+        )
+        self.builder.on_message(
+            trades((b"BNBUSDT", b"20240101-00:00:00.900", b"9.0", b"1", 1, 0))
+        )
+        self.assertEqual(1, self.builder.late_trades)
+        self.assertEqual(1, self.builder.current("BNBUSDT", 1).trades)
+        self.assertEqual(2, self.builder.current("BNBUSDT", 60).trades)
+        self.assertEqual(60000.0, self.builder.current("BTCUSDT", 1).close)
+
+        closed = self.builder.flush(DAY / 1_000_000 + 1.5)
+        self.assertEqual(["BTCUSDT"], [bar.symbol for bar in closed])
+        self.assertEqual(closed, self.bars)
+        self.builder.on_message(
+            trades((b"BTCUSDT", b"20240101-00:00:00.999", b"60001", b"1", 2, 2))
+        )
+        self.assertEqual(2, self.builder.late_trades)
+        self.assertIsNone(self.builder.current("BTCUSDT", 1))
+        self.assertEqual(
+            {"open_bars": 3, "trades": 4, "late_trades": 2, "bars_closed": 1},
+            self.builder.stats(),
+        )
+
+    def test_fixed_point(self):
+        builder = BarBuilder((1,), scales=InstrumentScale(2, 1), close_delay=None)
+        builder.on_message(
+            trades(
+                (b"BNBUSDT", b"20240101-00:00:00.1", b"10.00", b"1.0", 1, 1),
+                (b"BNBUSDT", b"20240101-00:00:00.2", b"10.50", b"3.0", 2, 2),
+            )
+        )
+        bar = builder.current("BNBUSDT", 1)
+        self.assertEqual((1000, 1050, 40), (bar.open, bar.high, bar.volume))
+        self.assertEqual(1000 * 10 + 1050 * 30, bar.notional)
+        self.assertEqual(1037.5, bar.vwap)
+
+    def test_invalid_intervals(self):
+        with self.assertRaises(ValueError):
+            BarBuilder((1, 0))
+        with self.assertRaises(ValueError):
+            BarBuilder(())
+
+    def test_empty_bar(self):
+        bar = BarBuilder((1,), close_delay=None).current("BNBUSDT", 1)
+        self.assertIsNone(bar)
+
+    def test_bars_closed_by_the_timer(self):
+        scheduler = SessionScheduler(
+            max_workers=1, timer_wheel=TimerWheel(tick=0.01, name="TestBarWheel")
+        )
+        closed = threading.Event()
+        threads = []
+
+        def on_bar(_bar):
+            threads.append(threading.current_thread().name)
+            closed.set()
+
+        builder = BarBuilder((0.1,), on_bar=on_bar, scheduler=scheduler, close_delay=0)
+        now = SendingTimeClock().now().encode("ASCII")
+        try:
+            builder.on_message(trades((b"BNBUSDT", now, b"10.0", b"1", 1, 1)))
+            self.assertTrue(closed.wait(2))
+        finally:
+            scheduler.shutdown()
+        # Not on the wheel thread, which runs the timers of every session.
+        self.assertTrue(threads[0].startswith("FixSessionScheduler"))
+        bar = builder.last("BNBUSDT", 0.1)
+        self.assertEqual(1, bar.trades)
+        self.assertFalse(math.isnan(bar.vwap))
+        self.assertLessEqual(bar.end, time.time_ns() // 1000)
+
+
+class TestConnectorBars(unittest.TestCase):
+
+    def test_bars_built_from_the_receive_thread(self):
+        client = create_client()
+        bars = []
+        builder = client.add_bar_builder("TRADE_STREAM", (1,), on_bar=bars.append)
+        builder.close_delay = None
+        client.on_message_received(
+            [
+                trades((b"BNBUSDT", b"20240101-00:00:00.1", b"10.0", b"1", 1, 1)),
+                trades(
+                    (b"BNBUSDT", b"20240101-00:00:00.2", b"12.0", b"1", 1, 1),
+                    md_req_id=b"OTHER_STREAM",
+                ),
+                trades((b"BNBUSDT", b"20240101-00:00:01.1", b"11.0", b"1", 2, 2)),
+            ]
+        )
+        self.assertEqual([10.0], [bar.close for bar in bars])
+        self.assertEqual(2, builder.trades)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import math
+import threading
+import unittest
+
+from binance_fix_connector.book_ticker import BookTicker, BookTickerCache
+from binance_fix_connector.market_data import InstrumentScale
+
+from tests.helpers import create_client, frame
+
+
+def snapshot(update_id, bid, ask, symbol=b"BNBUSDT"):
+    return frame(
+        b"35=W\x01262=BOOK_TICKER_STREAM\x0155=%s\x0125044=%d\x01268=2\x01"
+        b"269=0\x01270=%s\x01271=%s\x01269=1\x01270=%s\x01271=%s\x01"
+        % (symbol, update_id, *bid, *ask)
+    )
+
+
+def update(update_id, *entries, symbol=b"BNBUSDT"):
+    body = b""
+    for i, (action, side, price, qty) in enumerate(entries):
+        body += b"279=%d\x01269=%d\x01270=%s\x01" % (action, side, price)
+        if qty is not None:
+            body += b"271=%s\x01" % qty
+        if i == 0:
+            body += b"55=%s\x0125044=%d\x01" % (symbol, update_id)
+    return frame(b"35=X\x01262=BOOK_TICKER_STREAM\x01268=%d\x01" % len(entries) + body)
+
+
+class TestBookTickerCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = BookTickerCache()
+
+    def test_snapshot_and_updates(self):
+        self.assertIsNone(self.cache.get("BNBUSDT"))
+        self.cache.on_message(snapshot(10, (b"640.1", b"2"), (b"640.2", b"3")))
+        self.assertEqual(
+            BookTicker("BNBUSDT", 640.1, 2.0, 640.2, 3.0, 10),
+            self.cache.get("BNBUSDT"),
+        )
+        self.assertEqual(2, self.cache.version("BNBUSDT"))
+
+        self.cache.on_message(update(11, (1, 1, b"640.15", b"1.5")))
+        ticker = self.cache.get("BNBUSDT")
+        self.assertEqual((640.1, 2.0), (ticker.bid_price, ticker.bid_qty))
+        self.assertEqual(
+            (640.15, 1.5, 11), (ticker.ask_price, ticker.ask_qty, ticker.update_id)
+        )
+        self.assertEqual(4, self.cache.version("BNBUSDT"))
+
+        self.cache.on_message(update(12, (2, 0, b"640.1", None)))
+        ticker = self.cache.get("BNBUSDT")
+        self.assertTrue(math.isnan(ticker.bid_price))
+        self.assertTrue(math.isnan(ticker.bid_qty))
+        self.assertEqual(12, ticker.update_id)
+
+    def test_older_updates_are_ignored(self):
+        self.cache.on_message(update(20, (1, 0, b"640.1", b"2")))
+        self.cache.on_message(update(19, (1, 0, b"639.0", b"9")))
+        self.assertEqual(640.1, self.cache.get("BNBUSDT").bid_price)
+        self.assertEqual(1, self.cache.updates)
+
+    def test_several_symbols(self):
+        body = (
+            b"35=X\x01262=BOOK_TICKER_STREAM\x01268=2\x01"
+            b"279=1\x01269=0\x01270=640.1\x01271=2\x0155=BNBUSDT\x0125044=5\x01"
+            b"279=1\x01269=1\x01270=60000\x01271=1\x0155=BTCUSDT\x0125044=7\x01"
+        )
+        self.cache.on_message(frame(body))
+        self.assertEqual(["BNBUSDT", "BTCUSDT"], sorted(self.cache.symbols()))
+        self.assertEqual(60000.0, self.cache.get("BTCUSDT").ask_price)
+        self.assertEqual(7, self.cache.get("BTCUSDT").update_id)
+        self.assertIn("BNBUSDT", self.cache)
+        self.assertEqual(-1, self.cache.version("ETHUSDT"))
+
+    def test_fixed_point(self):
+        cache = BookTickerCache(InstrumentScale(2, 3))
+        cache.on_message(snapshot(10, (b"640.10", b"2"), (b"640.20", b"3")))
+        self.assertEqual(
+            BookTicker("BNBUSDT", 64010, 2000, 64020, 3000, 10), cache.get("BNBUSDT")
+        )
+        cache.on_message(update(11, (2, 1, b"640.20", None)))
+        self.assertEqual(-1, cache.get("BNBUSDT").ask_price)
+
+    def test_readers_see_consistent_values(self):
+        # Every update sets all the fields from the same n.
+        messages = [
+            snapshot(n, (b"%d" % n, b"%d" % n), (b"%d" % (n + 1), b"%d" % n))
+            for n in range(1, 2001)
+        ]
+        errors = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                ticker = self.cache.get("BNBUSDT")
+                if ticker is None:
+                    continue
+                n = ticker.update_id
+                if (ticker.bid_price, ticker.bid_qty, ticker.ask_price) != (
+                    n,
+                    n,
+                    n + 1,
+                ):
+                    errors.append(ticker)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for message in messages:
+            self.cache.on_message(message)
+        done.set()
+        for reader in readers:
+            reader.join(5)
+        self.assertEqual([], errors)
+        self.assertEqual(2000, self.cache.get("BNBUSDT").update_id)
+
+
+class TestConnectorBookTicker(unittest.TestCase):
+
+    def test_cache_updated_from_the_receive_thread(self):
+        client = create_client(queue_messages=False)
+        cache = client.add_book_ticker("BOOK_TICKER_STREAM")
+        client.on_message_received([snapshot(10, (b"640.1", b"2"), (b"640.2", b"3"))])
+        self.assertEqual(640.2, cache.get("BNBUSDT").ask_price)
+        self.assertTrue(client.queue_msg_received.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,8 @@ from binance_fix_connector.fix_connector import (
 )
 from binance_fix_connector.utils import get_private_key
 
+from tests.helpers import MockedSocketTestCase
+
 logging.basicConfig(level=logging.CRITICAL)
 
 PRIVATE_KEY = os.path.join(os.path.dirname(__file__), "../unit_test_key.pem")
@@ -20,7 +22,7 @@ FIX_MD_URL = "tcp+tls://localhost:1234"
 INSTRUMENT = "BNBUSDT"
 
 
-class TestBookTickerStream(unittest.TestCase):
+class TestBookTickerStream(MockedSocketTestCase):
     def __init__(self, methodName: str = "runTest"):
         super().__init__(methodName)
         self.sentMessage = 0
@@ -54,7 +56,7 @@ class TestBookTickerStream(unittest.TestCase):
         current_utc_time_mock.return_value = "20250301-01:00:00.000000"
 
         # Simulate receiving message from the socket
-        socket_mock.recv.side_effect = self.recv_side_effect
+        socket_mock.recv_into.side_effect = self.recv_into_side_effect
         context_mock.wrap_socket.return_value = socket_mock
         create_connection_mock.return_value = socket_mock
         create_default_context_mock.return_value = context_mock
@@ -0,0 +1,161 @@
+import threading
+import unittest
+
+from binance_fix_connector.conflation import ConflatingQueue
+from binance_fix_connector.market_data import InstrumentScale
+
+from tests.helpers import create_client, diff, frame, snapshot
+
+
+class TestLatestConflation(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = ConflatingQueue()
+
+    def test_updates_replace_the_pending_ones(self):
+        for i in range(1, 6):
+            self.queue.on_message(
+                diff(i, i, (1, 0, b"10.0%d" % i, b"%d" % i), md_req_id=b"TICKER")
+            )
+        self.queue.on_message(
+            diff(6, 6, (1, 0, b"60000", b"1"), symbol=b"BTCUSDT", md_req_id=b"TICKER")
+        )
+        self.queue.on_message(diff(7, 7, (1, 1, b"10.10", b"2"), md_req_id=b"TICKER"))
+        self.assertEqual(2, len(self.queue))
+
+        update = self.queue.get(timeout=0)
+        self.assertEqual(("BNBUSDT", "TICKER"), (update.symbol, update.md_req_id))
+        self.assertEqual({0: (1, 0, 10.05, 5.0), 1: (1, 1, 10.1, 2.0)}, update.entries)
+        self.assertEqual((1, 7), (update.first_book_id, update.last_book_id))
+        self.assertEqual(5, update.conflated)
+        self.assertEqual("BTCUSDT", self.queue.get(timeout=0).symbol)
+        self.assertIsNone(self.queue.get(timeout=0))
+        self.assertEqual(
+            {"pending": 0, "updates": 7, "conflated": 5, "delivered": 2},
+            self.queue.stats(),
+        )
+
+    def test_snapshot_replaces_the_pending_update(self):
+        self.queue.on_message(diff(1, 1, (1, 0, b"9.00", b"1"), md_req_id=b"TICKER"))
+        self.queue.on_message(
+            snapshot(5, (0, b"10.00", b"1"), (1, b"10.10", b"2"), md_req_id=b"TICKER")
+        )
+        self.queue.on_message(diff(6, 6, (2, 1, b"10.10", None), md_req_id=b"TICKER"))
+        (update,) = self.queue.poll()
+        self.assertTrue(update.snapshot)
+        self.assertEqual(-1, update.first_book_id)
+        self.assertEqual(6, update.last_book_id)
+        self.assertEqual([0], list(update.entries))
+        self.assertEqual([], self.queue.poll())
+
+    def test_fixed_point(self):
+        queue = ConflatingQueue(scales=InstrumentScale(2, 1))
+        queue.on_message(diff(1, 1, (1, 0, b"10.05", b"1.5"), md_req_id=b"TICKER"))
+        update = queue.get(timeout=0)
+        self.assertEqual({0: (1, 0, 1005, 15)}, update.entries)
+        self.assertEqual((2, 1), (update.price_decimals, update.qty_decimals))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            ConflatingQueue("oldest")
+
+    def test_get_waits_for_an_update(self):
+        timer = threading.Timer(
+            0.05,
+            self.queue.on_message,
+            [diff(1, 1, (1, 0, b"10.00", b"1"), md_req_id=b"TICKER")],
+        )
+        timer.start()
+        update = self.queue.get(timeout=5)
+        timer.join()
+        self.assertEqual("BNBUSDT", update.symbol)
+
+
+class TestDepthConflation(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = ConflatingQueue("depth")
+
+    def test_diffs_folded_by_level(self):
+        self.queue.on_message(
+            diff(
+                101,
+                102,
+                (0, 0, b"10.05", b"0.5"),
+                (1, 1, b"10.20", b"1"),
+            )
+        )
+        self.queue.on_message(
+            diff(
+                103,
+                104,
+                (1, 0, b"10.05", b"0.7"),
+                (2, 1, b"10.10", None),
+            )
+        )
+        self.queue.on_message(diff(105, 105, (2, 1, b"10.20", None)))
+        update = self.queue.get(timeout=0)
+        self.assertFalse(update.snapshot)
+        self.assertEqual((101, 105), (update.first_book_id, update.last_book_id))
+        self.assertEqual((1, 0, 10.05, 0.7), update.entries[(0, 10.05)])
+        self.assertEqual(2, update.entries[(1, 10.2)][0])
+        self.assertEqual(2, update.entries[(1, 10.1)][0])
+        self.assertEqual(3, len(update.entries))
+        self.assertEqual(2, self.queue.conflated)
+
+    def test_snapshot_folds_the_following_diffs(self):
+        self.queue.on_message(
+            snapshot(
+                100,
+                (0, b"10.00", b"1.0"),
+                (0, b"9.90", b"2.0"),
+                (1, b"10.10", b"1.5"),
+            )
+        )
+        self.queue.on_message(
+            diff(
+                101,
+                101,
+                (2, 0, b"9.90", None),
+                (0, 0, b"9.95", b"3"),
+            )
+        )
+        update = self.queue.get(timeout=0)
+        self.assertTrue(update.snapshot)
+        self.assertEqual(101, update.last_book_id)
+        self.assertEqual([(0, 10.0), (1, 10.1), (0, 9.95)], list(update.entries))
+
+    def test_empty_snapshot(self):
+        self.queue.on_message(diff(40, 49, (0, 1, b"60000", b"1")))
+        self.queue.on_message(
+            frame(b"35=W\x01262=DEPTH_STREAM\x0155=BNBUSDT\x0125044=50\x01268=0\x01")
+        )
+        update = self.queue.get(timeout=0)
+        self.assertTrue(update.snapshot)
+        self.assertEqual(50, update.last_book_id)
+        self.assertEqual({}, update.entries)
+
+
+class TestConnectorConflation(unittest.TestCase):
+
+    def test_conflated_messages_not_queued(self):
+        client = create_client()
+        queue = client.add_conflation("DEPTH_STREAM", mode="depth")
+        reject = frame(b"35=Y\x01262=DEPTH_STREAM\x01281=1\x01")
+        client.on_message_received(
+            [
+                diff(1, 1, (0, 0, b"10.00", b"1")),
+                diff(1, 1, (0, 2, b"10.00", b"1"), md_req_id=b"TRADES"),
+                diff(2, 2, (1, 0, b"10.00", b"2")),
+                reject,
+            ]
+        )
+        self.assertEqual(1, queue.conflated)
+        self.assertEqual((1, 0, 10.0, 2.0), queue.get(timeout=0).entries[(0, 10.0)])
+        queued = client.get_all_new_messages_received()
+        self.assertEqual([b"TRADES", b"DEPTH_STREAM"], [msg.get(262) for msg in queued])
+        self.assertEqual(b"Y", queued[1].message_type)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from binance_fix_connector.market_data import (
+    MISSING_FIXED,
+    InstrumentScale,
+    InstrumentScales,
+    decimals_of,
+    decode_md_entries,
+    format_fixed,
+    parse_fixed,
+)
+from binance_fix_connector.message import FixMessageView
+
+INSTRUMENT_LIST = b"8=FIX.4.4\x019=227\x0135=y\x0149=SPOT\x0156=BMDWATCH\x0134=2\x0152=20250301-01:00:00.001000\x01320=GetInstrumentList\x01146=2\x0155=BNBUSDT\x0115=USDT\x012551=0.01000000\x012552=100000.00000000\x01969=0.01000000\x01562=0.00100000\x011140=900000.00000000\x0125039=0.00100000\x0125040=0.00000001\x0125041=6629.33313692\x0125042=0.00000001\x01969=0.01000000\x0155=BTCUSDT\x0115=USDT\x01969=0.10000000\x0125039=0.00001000\x0110=110\x01"
+DEPTH = b"8=FIX.4.4\x019=1\x0135=X\x01262=DEPTH_STREAM\x01268=2\x01279=1\x01269=0\x01270=638.54000000\x01271=11.76700000\x0155=BNBUSDT\x0125043=7517775\x0125044=7517775\x01279=2\x01269=1\x01270=638.55000000\x0110=021\x01"
+
+
+class TestFixedPointDecoding(unittest.TestCase):
+
+    def test_decimals_of(self):
+        self.assertEqual(2, decimals_of(b"0.01000000"))
+        self.assertEqual(8, decimals_of("0.00000001"))
+        self.assertEqual(0, decimals_of(b"1.00000000"))
+        self.assertEqual(0, decimals_of(b"10"))
+
+    def test_parse_fixed(self):
+        self.assertEqual(63854, parse_fixed(b"638.54000000", 2))
+        self.assertEqual(11767, parse_fixed(b"11.76700000", 3))
+        self.assertEqual(730000, parse_fixed(b"730", 3))
+        self.assertEqual(-50, parse_fixed("-0.5", 2))
+        with self.assertRaises(ValueError):
+            parse_fixed(b"638.54100000", 2)
+
+    def test_format_fixed(self):
+        self.assertEqual("638.54", format_fixed(63854, 2))
+        self.assertEqual("-0.05", format_fixed(-5, 2))
+        self.assertEqual("12", format_fixed(12, 0))
+
+    def test_scales_from_instrument_list(self):
+        scales = InstrumentScales()
+        self.assertEqual(
+            ["BNBUSDT", "BTCUSDT"], scales.update(FixMessageView(INSTRUMENT_LIST))
+        )
+        self.assertEqual(InstrumentScale(2, 3), scales["BNBUSDT"])
+        self.assertEqual(InstrumentScale(1, 5), scales["BTCUSDT"])
+        with self.assertRaises(ValueError):
+            scales["ETHUSDT"]
+
+    def test_decode_md_entries_with_scales(self):
+        scales = InstrumentScales()
+        scales.update(INSTRUMENT_LIST)
+        entries = decode_md_entries(FixMessageView(DEPTH), scales)
+        self.assertEqual("q", entries.price.typecode)
+        self.assertEqual([63854, 63855], entries.price.tolist())
+        self.assertEqual([11767, MISSING_FIXED], entries.qty.tolist())
+        self.assertEqual(2, entries.price_decimals)
+        self.assertEqual(3, entries.qty_decimals)
+
+    def test_decode_md_entries_with_a_single_scale(self):
+        entries = decode_md_entries(DEPTH, InstrumentScale(4, 4))
+        self.assertEqual([6385400, 6385500], entries.price.tolist())
+
+    def test_decode_md_entries_with_several_symbols(self):
+        scales = InstrumentScales()
+        scales.update(INSTRUMENT_LIST)
+        frame = b"8=FIX.4.4\x019=1\x0135=X\x01268=2\x01279=0\x01269=2\x01270=640.09\x01271=3.132\x0155=BNBUSDT\x01279=0\x01269=2\x01270=97000.1\x01271=0.01\x0155=BTCUSDT\x0110=000\x01"
+        entries = decode_md_entries(frame, scales)
+        self.assertEqual([64009, 970001], entries.price.tolist())
+        self.assertEqual([3132, 1000], entries.qty.tolist())
+        self.assertIsNone(entries.price_decimals)
+
+    def test_decode_md_entries_without_scale_for_symbol(self):
+        with self.assertRaises(ValueError):
+            decode_md_entries(DEPTH, InstrumentScales())
+
+
+if __name__ == "__main__":
+    unittest.main()
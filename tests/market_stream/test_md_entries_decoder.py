@@ -0,0 +1,97 @@
+import math
+import unittest
+
+from binance_fix_connector.market_data import (
+    MDEntryType,
+    MDUpdateAction,
+    decode_md_entries,
+)
+from binance_fix_connector.message import FixMessageView
+
+DEPTH = b"8=FIX.4.4\x019=0000165\x0135=X\x0149=SPOT\x0156=BMDWATCH\x0134=3\x0152=20250301-01:00:00.001000\x01262=DEPTH_STREAM\x01268=1\x01279=1\x01269=0\x01270=638.54000000\x01271=11.76700000\x0155=BNBUSDT\x0125043=7517775\x0125044=7517775\x0110=021\x01"
+TRADE = b"8=FIX.4.4\x019=0000183\x0135=X\x0149=SPOT\x0156=BMDWATCH\x0134=3\x0152=20250224-11:31:20.047857\x01262=TRADE_STREAM\x01268=1\x01279=0\x01269=2\x01270=640.09000000\x01271=3.13200000\x0155=BNBUSDT\x011003=760268\x0160=20250101-01:00:01.000001\x012446=2\x0110=063\x01"
+
+
+def depth_update(levels):
+    entries = b""
+    for i in range(levels):
+        action = b"2" if i % 5 == 4 else b"1"
+        entries += b"279=" + action + b"\x01269=" + (b"0" if i % 2 else b"1")
+        entries += b"\x01270=%d.5\x01" % (600 + i)
+        if action != b"2":
+            entries += b"271=%d.25\x01" % i
+        if i == 0:
+            entries += b"55=BNBUSDT\x0125043=100\x0125044=150\x01"
+    body = b"35=X\x0134=3\x01262=DEPTH_STREAM\x01268=%d\x01" % levels + entries
+    return b"8=FIX.4.4\x019=%d\x01" % len(body) + body + b"10=000\x01"
+
+
+def snapshot(levels):
+    entries = b"".join(
+        b"269=%d\x01270=%d.1\x01271=1.5\x01" % (i % 2, 600 + i) for i in range(levels)
+    )
+    body = (
+        b"35=W\x0134=2\x01262=DEPTH_STREAM\x0155=BNBUSDT\x0125044=99\x01268=%d\x01"
+        % levels
+        + entries
+    )
+    return b"8=FIX.4.4\x019=%d\x01" % len(body) + body + b"10=000\x01"
+
+
+class TestMDEntriesDecoder(unittest.TestCase):
+
+    def test_depth_entry(self):
+        entries = decode_md_entries(FixMessageView(DEPTH))
+        self.assertEqual(1, len(entries))
+        self.assertEqual("DEPTH_STREAM", entries.md_req_id)
+        self.assertEqual([MDUpdateAction.CHANGE], entries.action.tolist())
+        self.assertEqual([MDEntryType.BID], entries.side.tolist())
+        self.assertEqual([638.54], entries.price.tolist())
+        self.assertEqual([11.767], entries.qty.tolist())
+        self.assertEqual(["BNBUSDT"], entries.symbol)
+        self.assertEqual([7517775], entries.first_book_id.tolist())
+        self.assertEqual([7517775], entries.last_book_id.tolist())
+        self.assertEqual([-1], entries.trade_id.tolist())
+
+    def test_trade_entry(self):
+        entries = decode_md_entries(TRADE)
+        self.assertEqual([MDEntryType.TRADE], entries.side.tolist())
+        self.assertEqual([760268], entries.trade_id.tolist())
+        self.assertEqual([3.132], entries.qty.tolist())
+
+    def test_50_levels_with_deletes(self):
+        entries = decode_md_entries(FixMessageView(depth_update(50)))
+        self.assertEqual(50, len(entries))
+        self.assertEqual(["BNBUSDT"] * 50, entries.symbol)
+        self.assertEqual([100] * 50, entries.first_book_id.tolist())
+        self.assertEqual([150] * 50, entries.last_book_id.tolist())
+        for i in range(50):
+            self.assertEqual(600 + i + 0.5, entries.price[i])
+            if i % 5 == 4:
+                self.assertEqual(MDUpdateAction.DELETE, entries.action[i])
+                self.assertTrue(math.isnan(entries.qty[i]))
+            else:
+                self.assertEqual(MDUpdateAction.CHANGE, entries.action[i])
+                self.assertEqual(i + 0.25, entries.qty[i])
+
+    def test_snapshot_inherits_message_fields(self):
+        entries = decode_md_entries(snapshot(10))
+        self.assertEqual(10, len(entries))
+        self.assertEqual([-1] * 10, entries.action.tolist())
+        self.assertEqual([0, 1] * 5, entries.side.tolist())
+        self.assertEqual(["BNBUSDT"] * 10, entries.symbol)
+        self.assertEqual([99] * 10, entries.last_book_id.tolist())
+
+    def test_symbol_changes_inside_the_group(self):
+        frame = b"8=FIX.4.4\x019=1\x0135=X\x01268=3\x01279=0\x01269=2\x01270=1\x0155=BNBUSDT\x01279=0\x01269=2\x01270=2\x01279=0\x01269=2\x01270=3\x0155=ETHUSDT\x0110=000\x01"
+        entries = decode_md_entries(frame)
+        self.assertEqual(["BNBUSDT", "BNBUSDT", "ETHUSDT"], entries.symbol)
+
+    def test_no_entries(self):
+        entries = decode_md_entries(b"8=FIX.4.4\x019=1\x0135=X\x01262=ID\x0110=000\x01")
+        self.assertEqual(0, len(entries))
+        self.assertEqual("ID", entries.md_req_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,246 @@
+import logging
+import unittest
+from unittest.mock import MagicMock
+
+from binance_fix_connector.market_data import InstrumentScale
+from binance_fix_connector.order_book import BookSide, DenseBookSide, OrderBookEngine
+
+from tests.helpers import create_client, diff, frame, snapshot
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+SNAPSHOT = snapshot(
+    100,
+    (0, b"10.00", b"1.0"),
+    (0, b"9.90", b"2.0"),
+    (1, b"10.10", b"1.5"),
+    (1, b"10.20", b"3.0"),
+)
+
+
+class TestBookSide(unittest.TestCase):
+
+    def test_levels_sorted_by_priority(self):
+        bids = BookSide(descending=True)
+        asks = BookSide(descending=False)
+        for price in (9.5, 10.0, 9.0, 9.8):
+            bids.set(price, 1.0)
+            asks.set(price, 2.0)
+        bids.set(10.0, 5.0)
+        bids.set(9.0, 0)
+        asks.delete(9.0)
+        asks.delete(8.0)
+
+        self.assertEqual((10.0, 5.0), bids.best())
+        self.assertEqual([(10.0, 5.0), (9.8, 1.0)], bids.top(2))
+        self.assertEqual([(9.5, 2.0), (9.8, 2.0), (10.0, 2.0)], asks.top(5))
+        self.assertEqual(3, len(bids))
+        bids.clear()
+        self.assertIsNone(bids.best())
+        self.assertEqual([], bids.top(1))
+
+
+class TestDenseBookSide(unittest.TestCase):
+
+    def test_levels_indexed_by_tick(self):
+        bids = DenseBookSide(descending=True, tick=5)
+        asks = DenseBookSide(descending=False, tick=5)
+        for price in (1000, 990, 1010, 950):
+            bids.set(price, 1)
+            asks.set(price, 2)
+        self.assertEqual((1010, 1), bids.best())
+        self.assertEqual((950, 2), asks.best())
+        self.assertEqual(950, asks.base)
+
+        bids.delete(1010)
+        bids.delete(995)  # no level
+        asks.set(950, 0)
+        self.assertEqual((1000, 1), bids.best())
+        self.assertEqual((990, 2), asks.best())
+        self.assertEqual([(1000, 1), (990, 1), (950, 1)], bids.top(5))
+        self.assertEqual([(990, 2), (1000, 2)], asks.top(2))
+        self.assertEqual(3, len(bids))
+
+        bids.delete(1000)
+        bids.delete(990)
+        bids.delete(950)
+        self.assertIsNone(bids.best())
+        self.assertEqual([], bids.top(5))
+
+    def test_invalid_prices(self):
+        side = DenseBookSide(descending=True, tick=5, max_levels=10)
+        side.set(1000, 1)
+        with self.assertRaises(ValueError):
+            side.set(1001, 1)
+        with self.assertRaises(ValueError):
+            side.set(1100, 1)
+        self.assertEqual([(1000, 1)], side.top(5))
+
+
+class TestOrderBookEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.resync = MagicMock()
+        self.books = OrderBookEngine(resync=self.resync)
+
+    def test_snapshot_then_diffs(self):
+        self.books.on_message(SNAPSHOT)
+        book = self.books["BNBUSDT"]
+        self.assertTrue(book.synced)
+        self.assertEqual(100, book.last_update_id)
+        self.assertEqual((10.0, 1.0), book.best_bid())
+        self.assertEqual((10.1, 1.5), book.best_ask())
+
+        self.books.on_message(
+            diff(
+                101,
+                102,
+                (0, 0, b"10.05", b"0.5"),
+                (1, 1, b"10.20", b"1.0"),
+                (2, 1, b"10.10", None),
+            )
+        )
+        self.assertEqual(102, book.last_update_id)
+        self.assertEqual((10.05, 0.5), book.best_bid())
+        self.assertEqual((10.2, 1.0), book.best_ask())
+        bids, asks = book.top(2)
+        self.assertEqual([(10.05, 0.5), (10.0, 1.0)], bids)
+        self.assertEqual([(10.2, 1.0)], asks)
+        self.resync.assert_not_called()
+
+    def test_diffs_before_the_snapshot_are_replayed(self):
+        self.books.on_message(diff(95, 99, (1, 0, b"10.00", b"9.0")))
+        self.books.on_message(diff(100, 101, (1, 0, b"10.00", b"7.0")))
+        self.assertFalse(self.books["BNBUSDT"].synced)
+
+        self.books.on_message(SNAPSHOT)
+        book = self.books["BNBUSDT"]
+        self.assertEqual(101, book.last_update_id)
+        self.assertEqual((10.0, 7.0), book.best_bid())
+        self.assertEqual(1, self.books.stale_updates)
+        self.assertEqual(0, len(book.pending))
+
+    def test_gap_requests_a_new_snapshot(self):
+        self.books.on_message(SNAPSHOT)
+        self.books.on_message(diff(105, 106, (0, 0, b"10.05", b"0.5")))
+        book = self.books["BNBUSDT"]
+        self.assertFalse(book.synced)
+        self.assertIsNone(book.best_bid())
+        self.assertEqual(1, self.books.gaps)
+        self.resync.assert_called_once_with("BNBUSDT", "DEPTH_STREAM")
+
+        # No other request until the snapshot arrives.
+        self.books.on_message(diff(107, 107, (0, 0, b"10.06", b"0.5")))
+        self.resync.assert_called_once()
+
+        self.books.on_message(
+            snapshot(105, (0, b"10.00", b"1.0"), (1, b"10.10", b"1.5"))
+        )
+        self.assertTrue(book.synced)
+        self.assertEqual(107, book.last_update_id)
+        self.assertEqual((10.06, 0.5), book.best_bid())
+
+    def test_empty_snapshot_and_several_symbols(self):
+        self.books.on_message(
+            frame(b"35=W\x01262=DEPTH_STREAM\x0155=BTCUSDT\x0125044=50\x01268=0\x01")
+        )
+        self.books.on_message(SNAPSHOT)
+        self.assertEqual(50, self.books["BTCUSDT"].last_update_id)
+        self.assertIsNone(self.books["BTCUSDT"].best_ask())
+
+        body = (
+            b"35=X\x01262=DEPTH_STREAM\x01268=2\x01"
+            b"279=0\x01269=1\x01270=10.15\x01271=1\x0155=BNBUSDT\x0125043=101\x0125044=101\x01"
+            b"279=0\x01269=1\x01270=60000\x01271=2\x0155=BTCUSDT\x0125043=51\x0125044=51\x01"
+        )
+        self.books.on_message(frame(body))
+        self.assertEqual((10.1, 1.5), self.books["BNBUSDT"].best_ask())
+        self.assertEqual((60000.0, 2.0), self.books["BTCUSDT"].best_ask())
+        self.assertEqual(2, len(self.books))
+        self.assertEqual(2, self.books.stats()["updates"])
+
+    def test_fixed_point_book(self):
+        books = OrderBookEngine(scales=InstrumentScale(2, 1))
+        books.on_message(SNAPSHOT)
+        book = books["BNBUSDT"]
+        self.assertIsInstance(book.bids, BookSide)
+        self.assertEqual("q", book.bids.keys.typecode)
+        self.assertEqual((1000, 10), book.best_bid())
+        self.assertEqual((2, 1), (book.price_decimals, book.qty_decimals))
+
+    def test_dense_ladder(self):
+        scale = InstrumentScale.from_increments("0.05000000", "0.10000000")
+        self.assertEqual(5, scale.price_tick)
+        books = OrderBookEngine(scales=scale, ladder="dense")
+        books.on_message(SNAPSHOT)
+        books.on_message(diff(101, 101, (2, 1, b"10.10", None)))
+        book = books["BNBUSDT"]
+        self.assertIsInstance(book.asks, DenseBookSide)
+        self.assertEqual([(1000, 10), (990, 20)], book.bids.top(5))
+        self.assertEqual((1020, 30), book.best_ask())
+
+        memory = books.memory_report()
+        self.assertEqual(["BNBUSDT"], list(memory))
+        self.assertGreater(memory["BNBUSDT"], 0)
+
+    def test_invalid_ladder(self):
+        with self.assertRaises(ValueError):
+            OrderBookEngine(ladder="tree")
+        with self.assertRaises(ValueError):
+            OrderBookEngine(ladder="dense")
+
+
+class TestConnectorOrderBook(unittest.TestCase):
+
+    def setUp(self):
+        self.client = create_client()
+        self.client.sock = MagicMock()
+        self.client.is_connected = True
+
+    def subscribe(self):
+        msg = self.client.create_fix_message_with_basic_header("V")
+        msg.append_pair(262, "DEPTH_STREAM")
+        msg.append_pair(263, 1)
+        msg.append_pair(264, 50)
+        msg.append_pair(146, 1)
+        msg.append_pair(55, "BNBUSDT")
+        self.client.send_message(msg)
+
+    def test_books_updated_from_the_receive_thread(self):
+        self.subscribe()
+        books = self.client.add_order_book("DEPTH_STREAM")
+        self.client.on_message_received(
+            [SNAPSHOT, diff(101, 101, (0, 0, b"10.05", b"0.5"))]
+        )
+        self.assertEqual((10.05, 0.5), books["BNBUSDT"].best_bid())
+
+    def test_dense_order_book(self):
+        self.client.instrument_scales.set(
+            "BNBUSDT", InstrumentScale.from_increments("0.01", "0.1")
+        )
+        books = self.client.add_order_book("DEPTH_STREAM", ladder="dense")
+        self.client.on_message_received([SNAPSHOT])
+        self.assertIsInstance(books["BNBUSDT"].bids, DenseBookSide)
+        self.assertEqual((1010, 15), books["BNBUSDT"].best_ask())
+
+    def test_gap_resubscribes(self):
+        self.subscribe()
+        books = self.client.add_order_book("DEPTH_STREAM")
+        self.client.on_message_received(
+            [SNAPSHOT, diff(110, 111, (0, 0, b"10.05", b"0.5"))]
+        )
+        self.assertEqual(1, books.gaps)
+        unsubscribe, subscribe = self.client.messages_sent[-2:]
+        self.assertEqual(b"2", unsubscribe.get(263))
+        self.assertEqual(b"1", subscribe.get(263))
+        self.assertEqual(b"DEPTH_STREAM", subscribe.get(262))
+        self.assertEqual(b"4", subscribe.get(34))
+
+    def test_resubscribe_unknown_subscription(self):
+        self.client.logger = MagicMock()
+        self.assertFalse(self.client.resubscribe("DEPTH_STREAM"))
+
+
+if __name__ == "__main__":
+    unittest.main()